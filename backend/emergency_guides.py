@@ -0,0 +1,105 @@
+"""
+Precomputed emergency training guides
+Curated, versioned AHA guidance for the common emergency types, loaded into
+memory at startup so /api/emergency/training never waits on the LLM for them.
+Run this module directly to validate the guide file after editing it.
+"""
+import json
+import logging
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+GUIDES_PATH = Path(__file__).parent / "emergency_guides.json"
+
+# The app targets babies - assume an infant when the age is unknown
+DEFAULT_AGE_BAND = "infant"
+
+REQUIRED_SECTIONS = ("steps", "important_notes", "when_to_call_911")
+
+
+class EmergencyGuideStore:
+    """In-memory guide lookup keyed by (emergency type, age band)"""
+
+    def __init__(self):
+        self.version: Optional[str] = None
+        self.disclaimer = ""
+        self.age_bands: Dict[str, Dict[str, int]] = {}
+        self.aliases: Dict[str, str] = {}
+        self._guides: Dict[tuple, Dict[str, Any]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def load(self, path: Path = GUIDES_PATH) -> "EmergencyGuideStore":
+        """Load and validate the guide file, replacing any previously loaded guides"""
+        with open(path, "r", encoding="utf-8") as file:
+            data = json.load(file)
+
+        guides = {}
+        for emergency_type, bands in data["guides"].items():
+            for band in data["age_bands"]:
+                guide = bands.get(band)
+                if guide is None:
+                    raise ValueError(f"Guide '{emergency_type}' is missing age band '{band}'")
+                for section in REQUIRED_SECTIONS:
+                    if not guide.get(section):
+                        raise ValueError(f"Guide '{emergency_type}/{band}' has no '{section}'")
+                guides[(emergency_type, band)] = {
+                    "steps": list(guide["steps"]),
+                    "important_notes": list(guide["important_notes"]),
+                    "when_to_call_911": list(guide["when_to_call_911"]),
+                    "disclaimer": data["disclaimer"],
+                }
+
+        self.version = data["version"]
+        self.disclaimer = data["disclaimer"]
+        self.age_bands = data["age_bands"]
+        self.aliases = data.get("aliases", {})
+        self._guides = guides
+        logging.info(f"Loaded {len(guides)} emergency guides (version {self.version})")
+        return self
+
+    @property
+    def emergency_types(self):
+        return sorted({emergency_type for emergency_type, _ in self._guides})
+
+    def normalize_type(self, emergency_type: str) -> str:
+        key = " ".join((emergency_type or "").lower().replace("_", " ").replace("-", " ").split())
+        return self.aliases.get(key, key)
+
+    def age_band(self, age_months: Optional[int]) -> str:
+        if age_months is None:
+            return DEFAULT_AGE_BAND
+        for band, limits in self.age_bands.items():
+            if limits["min_months"] <= age_months <= limits["max_months"]:
+                return band
+        if age_months < 0:
+            return DEFAULT_AGE_BAND
+        # Older than every band - use the oldest one
+        return max(self.age_bands, key=lambda band: self.age_bands[band]["max_months"])
+
+    def get(self, emergency_type: str, age_months: Optional[int]) -> Optional[Dict[str, Any]]:
+        """Return the guide for a known type, or None so the caller can fall back to the LLM"""
+        guide = self._guides.get((self.normalize_type(emergency_type), self.age_band(age_months)))
+        if guide is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return guide
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "version": self.version,
+            "emergency_types": self.emergency_types,
+            "age_bands": list(self.age_bands),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+if __name__ == "__main__":
+    store = EmergencyGuideStore().load()
+    print(f"✅ Emergency guides version {store.version}")
+    for emergency_type in store.emergency_types:
+        for band in store.age_bands:
+            guide = store._guides[(emergency_type, band)]
+            print(f"   {emergency_type}/{band}: {len(guide['steps'])} steps")
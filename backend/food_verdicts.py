@@ -0,0 +1,238 @@
+"""
+Structured food-safety verdicts
+One verdict (safe / caution / avoid) per normalized food item and age,
+seeded from food_research.json and from past LLM safety checks, so repeat
+/api/food/safety-check requests are answered from memory. New LLM verdicts
+are added immediately in memory and written to MongoDB in the background.
+
+Knowledge-base seeds cover whole age bands; LLM verdicts only cover the exact
+month they were given for, so an answer for a 12-month-old ("honey is fine
+now") is never served for a younger baby.
+"""
+import asyncio
+import json
+import logging
+import re
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from kb_router import KNOWLEDGE_BASE_DIR, parse_age_range, tokenize
+from llm_cache import AGE_BUCKETS, age_bucket
+from safety_verdicts import AVOID, CAUTION, SAFE, SEVERITY, is_safe, parse_verdict
+
+FOOD_RESEARCH_FILE = "food_research.json"
+
+# Knowledge-base "yes" answers assume the baby already eats solids
+SOLIDS_START_MONTHS = 6
+
+_MIN_AGE = re.compile(r"\b(?:after|from|over|once|at least)\s+(\d+)\s*months?|\b(\d+)\s*\+\s*months?")
+_UNTIL_AGE = re.compile(r"\b(?:until|before|under)\s+(\d+)\s*months?")
+_MONTH_BAND = re.compile(r"^(\d+)-\1$")
+
+_SEED_QUESTIONS = [
+    re.compile(r"^can (?:babies|toddlers|infants|my baby|my toddler) (?:eat|have|drink) (.+?)\??$"),
+    re.compile(r"^(?:is|are) (.+?) safe for (?:babies|toddlers|infants|my baby|my toddler)\??$"),
+]
+
+
+def normalize_food(food_item: str) -> str:
+    """'Fresh Strawberries!' -> 'fresh strawberry' (same tokens as the KB router)"""
+    return " ".join(tokenize(food_item))
+
+
+def _bands_for(verdict: str, age_range: Tuple[int, int], answer: str) -> List[str]:
+    """Age bands (from llm_cache.AGE_BUCKETS) a knowledge-base answer speaks for"""
+    low, high = age_range
+    lowered = answer.lower()
+    if verdict == AVOID:
+        until = _UNTIL_AGE.search(lowered)
+        if until:
+            high = min(high, int(until.group(1)) - 1)
+    else:
+        minimum = _MIN_AGE.search(lowered)
+        if minimum:
+            low = max(low, int(minimum.group(1) or minimum.group(2)))
+        low = max(low, SOLIDS_START_MONTHS)
+    return [f"{band_low}-{band_high}" for band_low, band_high in AGE_BUCKETS if low <= band_low and band_high <= high]
+
+
+class FoodVerdictStore:
+    """In-memory verdict table keyed by (normalized food, age band or single month), persisted to MongoDB"""
+
+    def __init__(self, collection=None):
+        self.collection = collection
+        self._verdicts: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self._writes: Set[asyncio.Task] = set()
+        self.hits = 0
+        self.misses = 0
+        self.stored = 0
+        self.seeded = {"knowledge_base": 0, "persisted": 0, "history": 0}
+
+    @staticmethod
+    def key(food_item: str, age_months: Optional[int], exact: bool = False) -> Optional[Tuple[str, str]]:
+        """(food, band) for knowledge-base seeds, or (food, "12-12") for the exact month with exact=True"""
+        food = normalize_food(food_item)
+        if not food or age_months is None or age_months < 0:
+            return None
+        band = f"{age_months}-{age_months}" if exact else age_bucket(age_months)
+        if band == "any":
+            return None
+        return food, band
+
+    def get(self, food_item: str, age_months: Optional[int]) -> Optional[Dict[str, Any]]:
+        """The verdict for this exact month or its seeded band, the more conservative if both exist"""
+        keys = (self.key(food_item, age_months, exact=True), self.key(food_item, age_months))
+        known = [self._verdicts[key] for key in keys if key in self._verdicts]
+        verdict = max(known, key=lambda entry: SEVERITY[entry["verdict"]]) if known else None
+        if verdict is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return verdict
+
+    def _merge(self, food: str, band: str, verdict: str, notes: str, source: str) -> bool:
+        """Add a seed verdict unless a more conservative one is already known"""
+        existing = self._verdicts.get((food, band))
+        if existing and SEVERITY[existing["verdict"]] >= SEVERITY[verdict]:
+            return False
+        self._verdicts[(food, band)] = self._entry(food, band, verdict, notes, source)
+        return True
+
+    @staticmethod
+    def _entry(food: str, band: str, verdict: str, notes: str, source: str) -> Dict[str, Any]:
+        return {
+            "food": food,
+            "age_band": band,
+            "verdict": verdict,
+            "is_safe": is_safe(verdict),
+            "notes": notes,
+            "source": source,
+            "updated_at": datetime.now(timezone.utc),
+        }
+
+    def seed_from_knowledge_base(self, directory: Path = KNOWLEDGE_BASE_DIR) -> int:
+        path = Path(directory) / FOOD_RESEARCH_FILE
+        try:
+            with open(path, "r", encoding="utf-8") as file:
+                entries = json.load(file)
+        except (FileNotFoundError, json.JSONDecodeError) as e:
+            logging.error(f"Food research knowledge base {path} unavailable: {str(e)}")
+            return 0
+
+        seeded = 0
+        for entry in entries:
+            question = " ".join(entry.get("question", "").lower().split())
+            match = next((m for m in (p.match(question) for p in _SEED_QUESTIONS) if m), None)
+            age_range = parse_age_range(entry.get("age_range", ""))
+            answer = entry.get("answer")
+            if not match or not age_range or not isinstance(answer, str):
+                continue
+            food = normalize_food(match.group(1))
+            verdict = parse_verdict(answer)
+            if not food or verdict is None:
+                continue
+            for band in _bands_for(verdict, age_range, answer):
+                seeded += self._merge(food, band, verdict, answer, "knowledge_base")
+        self.seeded["knowledge_base"] = seeded
+        return seeded
+
+    async def load_persisted(self) -> int:
+        """Load verdicts stored by earlier runs; knowledge-base seeds win"""
+        if self.collection is None:
+            return 0
+        loaded = 0
+        async for doc in self.collection.find({}):
+            key = (doc["food"], doc["age_band"])
+            # Only LLM verdicts are persisted; ones stored per age band by older
+            # releases could cover younger babies than they were given for
+            if not _MONTH_BAND.match(key[1] or ""):
+                continue
+            if key not in self._verdicts and doc.get("verdict") in SEVERITY:
+                self._verdicts[key] = {field: doc.get(field) for field in (
+                    "food", "age_band", "verdict", "is_safe", "notes", "source", "updated_at"
+                )}
+                loaded += 1
+        self.seeded["persisted"] = loaded
+        return loaded
+
+    async def backfill_from_history(self, history, limit: int = 10000) -> int:
+        """
+        Re-grade past LLM answers in food_safety_checks (their stored is_safe
+        came from the old substring test) and keep the latest per food and month.
+        """
+        added = 0
+        cursor = history.find(
+            {"source": {"$in": [None, "llm"]}},
+            {"food_item": 1, "age_months": 1, "safety_notes": 1},
+        ).sort("checked_at", -1).limit(limit)
+        async for doc in cursor:
+            notes = doc.get("safety_notes") or ""
+            # Skip canned and knowledge-base fallback notes
+            if notes.startswith(("Unable to assess", "**")):
+                continue
+            key = self.key(doc.get("food_item", ""), doc.get("age_months"), exact=True)
+            verdict = parse_verdict(notes)
+            if key is None or verdict is None or key in self._verdicts:
+                continue
+            self._verdicts[key] = self._entry(*key, verdict, notes, "llm")
+            self._persist(self._verdicts[key])
+            added += 1
+        self.seeded["history"] = added
+        return added
+
+    async def warm(self, history=None):
+        """Seed the table; run as a background task so startup is not blocked"""
+        try:
+            self.seed_from_knowledge_base()
+            await self.load_persisted()
+            if history is not None:
+                await self.backfill_from_history(history)
+            logging.info(f"Food verdict store ready with {len(self._verdicts)} verdicts ({self.seeded})")
+        except Exception as e:
+            logging.error(f"Food verdict store warm-up failed: {str(e)}")
+
+    def put(self, food_item: str, age_months: Optional[int], verdict: str, notes: str, source: str = "llm") -> Optional[Dict[str, Any]]:
+        """Record a new verdict for this exact month in memory now and persist it in the background"""
+        key = self.key(food_item, age_months, exact=True)
+        if key is None:
+            return None
+        entry = self._entry(*key, verdict, notes, source)
+        self._verdicts[key] = entry
+        self.stored += 1
+        self._persist(entry)
+        return entry
+
+    def _persist(self, entry: Dict[str, Any]):
+        if self.collection is None:
+            return
+        task = asyncio.ensure_future(self._write(entry))
+        self._writes.add(task)
+        task.add_done_callback(self._writes.discard)
+
+    async def _write(self, entry: Dict[str, Any]):
+        try:
+            await self.collection.update_one(
+                {"_id": f"{entry['food']}|{entry['age_band']}"},
+                {"$set": entry},
+                upsert=True,
+            )
+        except Exception as e:
+            logging.error(f"Food verdict write failed: {str(e)}")
+
+    async def flush(self):
+        """Wait for background writes (shutdown, tests)"""
+        if self._writes:
+            await asyncio.gather(*list(self._writes), return_exceptions=True)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "verdicts": len(self._verdicts),
+            "seeded": dict(self.seeded),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "stored_from_llm": self.stored,
+            "pending_writes": len(self._writes),
+        }
@@ -0,0 +1,23 @@
+"""
+Fixed-bucket histograms
+Counts observations into upper-bound buckets with a running count and sum,
+the shape Prometheus histograms are exported in. Shared by the LLM call
+metrics and, as a copy, by public-server's connection pool metrics.
+"""
+from typing import Tuple
+
+
+class Histogram:
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.count += 1
+        self.sum += value
+        for position, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[position] += 1
+                break
@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+Replay benchmark for knowledge-base-first chat routing
+Replays a query corpus through the KB router at several thresholds and reports
+the routing split, answer precision and the latency/cost impact versus sending
+every message to the LLM.
+
+Usage:
+    python kb_router_benchmark.py                      # synthetic corpus from the KBs
+    python kb_router_benchmark.py --corpus queries.jsonl
+
+A corpus file has one JSON object per line: {"message": ..., "baby_age_months": 6,
+"expected_id": 123, "expected_source": "food_research"}. Leave out expected_id
+for messages the knowledge base should NOT answer.
+"""
+import argparse
+import json
+import random
+import re
+import statistics
+import time
+
+from kb_router import KnowledgeBaseIndex, KnowledgeBaseRouter, is_urgent, tokenize
+
+OFF_TOPIC = [
+    "How do I reset my smartphone?",
+    "What's the best laptop for college?",
+    "Who won the football game last night?",
+    "How do I change a car tire?",
+    "What should I invest in this year?",
+    "Recommend a good movie for date night",
+    "How do I get a driving license?",
+    "What's the weather like tomorrow?",
+    "Write me a cover letter for a job",
+    "How do I cook a steak medium rare?",
+    "Is it normal that my baby's soft spot is bulging?",
+    "My toddler keeps hitting his head on purpose when angry at daycare pickup",
+    "Which stroller brand is best for jogging on trails?",
+    "How do I apply for paid parental leave in California?",
+]
+
+# Symptom and emergency descriptions, replayed at several ages: they must never get a
+# knowledge-base answer, whatever their match score ("fever of 104" at 4 months
+# scores 0.70 against "Do teething babies get fevers?")
+URGENT = [
+    "My baby has a fever of 104",
+    "My baby has a fever of 104 and is hard to wake up",
+    "my baby has a temperature of 38.5",
+    "My baby is not breathing",
+    "My baby stopped breathing for a few seconds while asleep",
+    "My toddler is choking on a grape",
+    "My 9 month old swallowed a button battery",
+    "My baby swallowed a coin",
+    "My baby is unresponsive and floppy",
+    "My baby had a seizure",
+    "There is blood in my baby's vomit",
+    "My toddler cut their lip and it won't stop bleeding",
+]
+CALIBRATION_AGES = [None, 4, 9, 14]
+
+PREFIXES = ["", "quick question: ", "hi! ", "my baby is {age} months old. ", "help - "]
+
+
+def topic(question: str) -> frozenset:
+    """
+    Content words of a question. The knowledge bases repeat questions with only
+    the subject changed ("Can babies/toddlers eat soup?"), so a match counts as
+    correct when its content words equal the expected question's.
+    """
+    return frozenset(tokenize(question))
+
+
+def _paraphrase(question: str, rng: random.Random) -> str:
+    text = question
+    text = re.sub(r"^Can babies eat (.+)\?$", r"is \1 safe for my baby?", text)
+    text = re.sub(r"^Can toddlers eat (.+)\?$", r"is it ok to give my toddler \1?", text)
+    if rng.random() < 0.5:
+        text = text.lower().rstrip("?")
+    return rng.choice(PREFIXES).format(age=rng.randint(4, 20)) + text
+
+
+def synthetic_corpus(index: KnowledgeBaseIndex, size: int, seed: int):
+    rng = random.Random(seed)
+    corpus = []
+    for entry in rng.sample(index.entries, min(size, len(index.entries))):
+        corpus.append({
+            "message": _paraphrase(entry["question"], rng),
+            "expected_topic": topic(entry["question"]),
+        })
+    corpus.extend({"message": message, "baby_age_months": age} for message in OFF_TOPIC for age in CALIBRATION_AGES)
+    corpus.extend({"message": message, "baby_age_months": age} for message in URGENT for age in CALIBRATION_AGES)
+    return corpus
+
+
+def load_corpus(path, index: KnowledgeBaseIndex):
+    by_id = {(e["source"], e.get("id")): e for e in index.entries}
+    corpus = []
+    with open(path, "r", encoding="utf-8") as file:
+        for line in file:
+            if not line.strip():
+                continue
+            item = json.loads(line)
+            if item.get("expected_id") is not None:
+                entry = by_id.get((item.get("expected_source", "ai_assistant"), item["expected_id"]))
+                if entry:
+                    item["expected_topic"] = topic(entry["question"])
+            corpus.append(item)
+    return corpus
+
+
+def max_off_topic_confidence(index, corpus):
+    """
+    Highest confidence the index gives any message it should not answer. Urgent
+    messages are left out: the router escalates them before the threshold applies.
+    """
+    scores = [
+        index.search(item["message"], item.get("baby_age_months"), limit=1)
+        for item in corpus if item.get("expected_topic") is None and not is_urgent(item["message"])
+    ]
+    return max((matches[0][0] for matches in scores if matches), default=0.0)
+
+
+def replay(index, corpus, threshold):
+    router = KnowledgeBaseRouter(index, threshold=threshold)
+    correct = wrong = off_topic_accepted = urgent_accepted = 0
+    latencies = []
+    for item in corpus:
+        started = time.perf_counter()
+        decision = router.route(item["message"], item.get("baby_age_months"))
+        latencies.append(time.perf_counter() - started)
+        if decision is None:
+            continue
+        expected = item.get("expected_topic")
+        if expected is None:
+            off_topic_accepted += 1
+            urgent_accepted += is_urgent(item["message"])
+            wrong += 1
+        elif topic(decision["entry"]["question"]) == expected:
+            correct += 1
+        else:
+            wrong += 1
+    answered = correct + wrong
+    return {
+        "threshold": threshold,
+        "kb_share": answered / len(corpus),
+        "precision": correct / answered if answered else 1.0,
+        "kb_answers": answered,
+        "wrong": wrong,
+        "off_topic_accepted": off_topic_accepted,
+        "urgent_accepted": urgent_accepted,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": sorted(latencies)[int(len(latencies) * 0.99) - 1] * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", help="JSONL query corpus (default: synthetic corpus from the KBs)")
+    parser.add_argument("--size", type=int, default=500, help="synthetic corpus size")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--target-precision", type=float, default=0.95)
+    parser.add_argument("--margin", type=float, default=0.1,
+                        help="required gap above the highest off-topic confidence")
+    parser.add_argument("--llm-seconds", type=float, default=4.0, help="average LLM latency per chat")
+    parser.add_argument("--llm-tokens", type=int, default=900, help="average tokens per chat")
+    parser.add_argument("--usd-per-1k-tokens", type=float, default=0.0004)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    index = KnowledgeBaseIndex.load()
+    print(f"📚 Indexed {len(index.entries)} entries in {(time.perf_counter() - started) * 1000:.0f} ms")
+
+    corpus = load_corpus(args.corpus, index) if args.corpus else synthetic_corpus(index, args.size, args.seed)
+    print(f"🔁 Replaying {len(corpus)} queries\n")
+
+    print(f"{'threshold':>9} {'kb share':>9} {'precision':>9} {'wrong':>6} {'off-topic':>9} {'p50 ms':>7} {'p99 ms':>7}")
+    results = []
+    for step in range(40, 100, 4):
+        result = replay(index, corpus, step / 100)
+        results.append(result)
+        print(f"{result['threshold']:>9.2f} {result['kb_share']:>9.1%} {result['precision']:>9.1%} "
+              f"{result['wrong']:>6} {result['off_topic_accepted']:>9} {result['p50_ms']:>7.3f} {result['p99_ms']:>7.3f}")
+
+    urgent = [item for item in corpus if item.get("expected_topic") is None and is_urgent(item["message"])]
+    answered_urgent = sum(result["urgent_accepted"] for result in results)
+    print(f"\n🚑 Urgent guard: {len(urgent)} symptom/emergency messages, {answered_urgent} answered from the KB at any threshold")
+    if answered_urgent:
+        raise SystemExit("urgent messages reached a knowledge-base answer")
+
+    floor = max_off_topic_confidence(index, corpus) + args.margin
+    eligible = [r for r in results if r["precision"] >= args.target_precision and r["threshold"] >= floor]
+    best = min(eligible, key=lambda r: r["threshold"]) if eligible else results[-1]
+    n = len(corpus)
+    saved_seconds = best["kb_answers"] * args.llm_seconds
+    saved_tokens = best["kb_answers"] * args.llm_tokens
+    print(f"\n🎯 Calibrated threshold: {best['threshold']:.2f} "
+          f"(precision {best['precision']:.1%} >= target {args.target_precision:.0%}, "
+          f"off-topic floor {floor:.2f})")
+    print(f"   Routing split: {best['kb_share']:.1%} knowledge base / {1 - best['kb_share']:.1%} LLM")
+    print(f"   Mean latency: {args.llm_seconds:.2f}s -> "
+          f"{(1 - best['kb_share']) * args.llm_seconds + best['kb_share'] * best['p50_ms'] / 1000:.2f}s per message")
+    print(f"   Saved per {n} messages: {saved_seconds:.0f} LLM seconds, {saved_tokens} tokens "
+          f"(~${saved_tokens / 1000 * args.usd_per_1k_tokens:.2f})")
+
+
+if __name__ == "__main__":
+    main()
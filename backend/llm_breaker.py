@@ -0,0 +1,211 @@
+"""
+Circuit breakers and hedged requests for the LLM provider path
+A breaker per (model, endpoint) watches a rolling window of calls and opens
+when the error rate or the p90 latency crosses its threshold. While open,
+calls fail fast with CircuitOpenError so endpoints can serve their
+knowledge-base or canned fallback instead of waiting on a slow provider.
+After a cool-down one probe call is let through (half-open) to test recovery.
+"""
+import asyncio
+import logging
+import os
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, Tuple
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling the provider while a breaker is open"""
+
+
+def _env_float(name: str, default: Optional[float]) -> Optional[float]:
+    value = os.environ.get(name)
+    if value is None or value == "":
+        return default
+    return float(value) if float(value) > 0 else None
+
+
+class CircuitBreaker:
+    def __init__(
+        self,
+        name: str,
+        window: int = 20,
+        min_calls: int = 5,
+        error_rate: float = 0.5,
+        p90_latency: Optional[float] = 20.0,
+        open_seconds: float = 30.0,
+        timeout: Optional[float] = 60.0,
+    ):
+        self.name = name
+        self.min_calls = min_calls
+        self.error_rate_threshold = error_rate
+        self.p90_latency_threshold = p90_latency
+        self.open_seconds = open_seconds
+        self.timeout = timeout
+        self.state = CLOSED
+        self.opened_at: Optional[float] = None
+        self.open_reason: Optional[str] = None
+        self._outcomes: Deque[Tuple[bool, float]] = deque(maxlen=window)
+        self._probe_in_flight = False
+        self.transitions: Dict[str, int] = {}
+        self.rejected = 0
+
+    def _transition(self, state: str, reason: str = None):
+        if state == self.state:
+            return
+        key = f"{self.state}->{state}"
+        self.transitions[key] = self.transitions.get(key, 0) + 1
+        logging.warning(f"LLM circuit {self.name}: {key}" + (f" ({reason})" if reason else ""))
+        self.state = state
+        if state == OPEN:
+            self.opened_at = time.monotonic()
+            self.open_reason = reason
+        elif state == CLOSED:
+            self.opened_at = None
+            self.open_reason = None
+            self._outcomes.clear()
+
+    def _p90(self) -> Optional[float]:
+        latencies = sorted(latency for _, latency in self._outcomes)
+        if not latencies:
+            return None
+        return latencies[min(len(latencies) - 1, int(len(latencies) * 0.9))]
+
+    def _error_rate(self) -> float:
+        if not self._outcomes:
+            return 0.0
+        return sum(1 for ok, _ in self._outcomes if not ok) / len(self._outcomes)
+
+    def allow(self) -> bool:
+        """Whether a call may go to the provider right now"""
+        if self.state == OPEN and time.monotonic() - self.opened_at >= self.open_seconds:
+            self._transition(HALF_OPEN)
+        if self.state == CLOSED:
+            return True
+        if self.state == HALF_OPEN and not self._probe_in_flight:
+            self._probe_in_flight = True
+            return True
+        return False
+
+    def record(self, ok: bool, latency: float):
+        if self.state == HALF_OPEN:
+            self._probe_in_flight = False
+            if ok:
+                self._transition(CLOSED, "probe succeeded")
+            else:
+                self._transition(OPEN, "probe failed")
+            return
+
+        self._outcomes.append((ok, latency))
+        if len(self._outcomes) < self.min_calls:
+            return
+        error_rate = self._error_rate()
+        if error_rate >= self.error_rate_threshold:
+            self._transition(OPEN, f"error rate {error_rate:.0%}")
+            return
+        p90 = self._p90()
+        if self.p90_latency_threshold and p90 is not None and p90 >= self.p90_latency_threshold:
+            self._transition(OPEN, f"p90 latency {p90:.1f}s")
+
+    async def call(self, fn: Callable[[], Awaitable[Any]]) -> Any:
+        if not self.allow():
+            self.rejected += 1
+            raise CircuitOpenError(f"LLM circuit {self.name} is open ({self.open_reason})")
+
+        started = time.monotonic()
+        try:
+            if self.timeout:
+                result = await asyncio.wait_for(fn(), self.timeout)
+            else:
+                result = await fn()
+        except asyncio.CancelledError:
+            # The caller went away - not a provider failure
+            if self.state == HALF_OPEN:
+                self._probe_in_flight = False
+            raise
+        except Exception:
+            self.record(False, time.monotonic() - started)
+            raise
+        self.record(True, time.monotonic() - started)
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        p90 = self._p90()
+        return {
+            "state": self.state,
+            "open_reason": self.open_reason,
+            "window_calls": len(self._outcomes),
+            "error_rate": round(self._error_rate(), 4),
+            "p90_latency_seconds": round(p90, 3) if p90 is not None else None,
+            "rejected": self.rejected,
+            "transitions": dict(self.transitions),
+        }
+
+
+class BreakerRegistry:
+    """One breaker per (model, endpoint), configured from the environment"""
+
+    def __init__(self):
+        self._breakers: Dict[Tuple[str, str], CircuitBreaker] = {}
+        self.settings = {
+            "window": int(os.environ.get("LLM_BREAKER_WINDOW", 20)),
+            "min_calls": int(os.environ.get("LLM_BREAKER_MIN_CALLS", 5)),
+            "error_rate": float(os.environ.get("LLM_BREAKER_ERROR_RATE", 0.5)),
+            "p90_latency": _env_float("LLM_BREAKER_P90_SECONDS", 20.0),
+            "open_seconds": float(os.environ.get("LLM_BREAKER_OPEN_SECONDS", 30)),
+            "timeout": _env_float("LLM_TIMEOUT_SECONDS", 60.0),
+        }
+        # Hedging doubles provider cost for slow calls, so it is off unless configured
+        self.hedge_after = _env_float("LLM_HEDGE_AFTER_SECONDS", None)
+
+    def get(self, model: str, endpoint: str) -> CircuitBreaker:
+        key = (model, endpoint)
+        if key not in self._breakers:
+            self._breakers[key] = CircuitBreaker(f"{model}/{endpoint}", **self.settings)
+        return self._breakers[key]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "hedge_after_seconds": self.hedge_after,
+            "breakers": {breaker.name: breaker.stats() for breaker in self._breakers.values()},
+        }
+
+
+async def hedged(fn: Callable[[], Awaitable[Any]], hedge_after: Optional[float]) -> Any:
+    """
+    Run ``fn``; if it has not finished after ``hedge_after`` seconds start a
+    second attempt and return whichever succeeds first. ``fn`` must be safe to
+    run twice concurrently (no shared chat session).
+    """
+    if not hedge_after:
+        return await fn()
+
+    first = asyncio.ensure_future(fn())
+    pending = {first}
+    error = None
+    # Whatever happens - including the caller being cancelled while waiting -
+    # attempts still running are cancelled so no provider call is leaked
+    try:
+        done, _ = await asyncio.wait(pending, timeout=hedge_after)
+        if done:
+            return first.result()
+
+        pending.add(asyncio.ensure_future(fn()))
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                # exception() raises CancelledError on a cancelled attempt
+                if task.cancelled():
+                    error = error or asyncio.CancelledError()
+                elif task.exception() is None:
+                    return task.result()
+                else:
+                    error = task.exception()
+        raise error
+    finally:
+        for task in pending:
+            task.cancel()
@@ -0,0 +1,303 @@
+"""
+LLM response cache
+In-memory LRU with per-endpoint TTLs and an optional MongoDB tier.
+Entries are keyed by endpoint, model, normalized prompt and baby age bucket
+so repeated questions ("is honey safe for 6 month old") skip the paid call.
+"""
+import hashlib
+import logging
+import math
+import os
+import re
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone, timedelta
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Tuple
+
+# Age buckets (inclusive month ranges) - advice rarely changes inside a bucket.
+# 6 and 12 months get buckets of their own: solids start at 6 and honey and
+# cow's milk at 12, so an answer for those ages must never reach a younger baby.
+AGE_BUCKETS = [(0, 3), (4, 5), (6, 6), (7, 9), (10, 11), (12, 12), (13, 18), (19, 24)]
+
+# Default time-to-live per endpoint, in seconds
+DEFAULT_TTLS = {
+    "ai_chat": 24 * 3600,
+    "meals_search": 7 * 24 * 3600,
+    "emergency_training": 30 * 24 * 3600,
+    "food_safety_check": 7 * 24 * 3600,
+}
+DEFAULT_TTL_SECONDS = 24 * 3600
+DEFAULT_MAX_ENTRIES = 1000
+
+_NON_WORD = re.compile(r"[^a-z0-9]+")
+
+
+def age_bucket(age_months: Optional[int]) -> str:
+    """Map an age in months to a coarse bucket label such as '7-9'"""
+    if age_months is None:
+        return "any"
+    for low, high in AGE_BUCKETS:
+        if low <= age_months <= high:
+            return f"{low}-{high}"
+    if age_months > AGE_BUCKETS[-1][1]:
+        return f"{AGE_BUCKETS[-1][1] + 1}+"
+    return "any"
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Lowercase, drop punctuation and collapse whitespace"""
+    return _NON_WORD.sub(" ", (prompt or "").lower()).strip()
+
+
+def make_cache_key(endpoint: str, model: str, prompt: str, age_months: Optional[int]) -> str:
+    raw = "|".join([endpoint, model, age_bucket(age_months), normalize_prompt(prompt)])
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def estimate_tokens(*texts: str) -> int:
+    """Rough token estimate (~4 characters per token) for providers without usage data"""
+    return sum(math.ceil(len(text or "") / 4) for text in texts)
+
+
+def _parse_csv(value: Optional[str]) -> Iterable[str]:
+    return [item.strip() for item in (value or "").split(",") if item.strip()]
+
+
+class LLMResponseCache:
+    """
+    Two-tier cache for LLM responses.
+
+    The memory tier is an LRU bounded by ``max_entries``; the optional
+    persistent tier is a Motor collection with a TTL index on ``expires_at``.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        ttls: Optional[Dict[str, int]] = None,
+        default_ttl: int = DEFAULT_TTL_SECONDS,
+        disabled_endpoints: Iterable[str] = (),
+        collection=None,
+    ):
+        self.max_entries = max_entries
+        self.ttls = dict(DEFAULT_TTLS)
+        self.ttls.update(ttls or {})
+        self.default_ttl = default_ttl
+        self.disabled_endpoints = set(disabled_endpoints)
+        self.collection = collection
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._stats: Dict[str, Dict[str, float]] = {}
+        self.evictions = 0
+
+    @classmethod
+    def from_env(cls, collection=None) -> "LLMResponseCache":
+        """
+        Build a cache from environment variables:
+        LLM_CACHE_MAX_ENTRIES, LLM_CACHE_TTL_SECONDS, LLM_CACHE_TTL_<ENDPOINT>,
+        LLM_CACHE_DISABLED (comma-separated endpoints) and LLM_CACHE_PERSIST.
+        """
+        ttls = {}
+        for endpoint in DEFAULT_TTLS:
+            value = os.environ.get(f"LLM_CACHE_TTL_{endpoint.upper()}")
+            if value:
+                ttls[endpoint] = int(value)
+        persist = os.environ.get("LLM_CACHE_PERSIST", "false").lower() in ("1", "true", "yes")
+        return cls(
+            max_entries=int(os.environ.get("LLM_CACHE_MAX_ENTRIES", DEFAULT_MAX_ENTRIES)),
+            ttls=ttls,
+            default_ttl=int(os.environ.get("LLM_CACHE_TTL_SECONDS", DEFAULT_TTL_SECONDS)),
+            disabled_endpoints=_parse_csv(os.environ.get("LLM_CACHE_DISABLED")),
+            collection=collection if persist else None,
+        )
+
+    def enabled_for(self, endpoint: str) -> bool:
+        return endpoint not in self.disabled_endpoints and self.ttl_for(endpoint) > 0
+
+    def ttl_for(self, endpoint: str) -> int:
+        return self.ttls.get(endpoint, self.default_ttl)
+
+    def _counter(self, endpoint: str) -> Dict[str, float]:
+        if endpoint not in self._stats:
+            self._stats[endpoint] = {
+                "hits_memory": 0,
+                "hits_persistent": 0,
+                "misses": 0,
+                "bypassed": 0,
+                "stores": 0,
+                "saved_llm_seconds": 0.0,
+                "saved_tokens": 0,
+            }
+        return self._stats[endpoint]
+
+    async def ensure_indexes(self):
+        """Create the TTL index for the persistent tier (no-op when disabled)"""
+        if self.collection is None:
+            return
+        try:
+            await self.collection.create_index("expires_at", expireAfterSeconds=0)
+            await self.collection.create_index([("endpoint", 1), ("model", 1)])
+        except Exception as e:
+            logging.error(f"LLM cache index creation failed: {str(e)}")
+
+    async def get(self, endpoint: str, model: str, prompt: str, age_months: Optional[int]) -> Optional[str]:
+        """Return a cached response or None, updating hit/miss counters"""
+        if not self.enabled_for(endpoint):
+            self._counter(endpoint)["bypassed"] += 1
+            return None
+
+        key = make_cache_key(endpoint, model, prompt, age_months)
+        counter = self._counter(endpoint)
+        now = time.time()
+
+        entry = self._entries.get(key)
+        if entry is not None:
+            if entry["expires_at"] > now:
+                self._entries.move_to_end(key)
+                counter["hits_memory"] += 1
+                counter["saved_llm_seconds"] += entry["llm_seconds"]
+                counter["saved_tokens"] += entry["tokens"]
+                return entry["response"]
+            del self._entries[key]
+
+        if self.collection is not None:
+            try:
+                doc = await self.collection.find_one(
+                    {"_id": key, "expires_at": {"$gt": datetime.now(timezone.utc)}}
+                )
+            except Exception as e:
+                logging.error(f"LLM cache persistent lookup failed: {str(e)}")
+                doc = None
+            if doc:
+                expires_at = doc["expires_at"]
+                if expires_at.tzinfo is None:
+                    expires_at = expires_at.replace(tzinfo=timezone.utc)
+                self._remember(key, doc["response"], expires_at.timestamp(),
+                               doc.get("llm_seconds", 0.0), doc.get("tokens", 0))
+                counter["hits_persistent"] += 1
+                counter["saved_llm_seconds"] += doc.get("llm_seconds", 0.0)
+                counter["saved_tokens"] += doc.get("tokens", 0)
+                return doc["response"]
+
+        counter["misses"] += 1
+        return None
+
+    async def set(
+        self,
+        endpoint: str,
+        model: str,
+        prompt: str,
+        age_months: Optional[int],
+        response: str,
+        llm_seconds: float = 0.0,
+        tokens: int = 0,
+    ):
+        """Store a response in both tiers"""
+        if not self.enabled_for(endpoint) or not response:
+            return
+
+        key = make_cache_key(endpoint, model, prompt, age_months)
+        ttl = self.ttl_for(endpoint)
+        self._remember(key, response, time.time() + ttl, llm_seconds, tokens)
+        self._counter(endpoint)["stores"] += 1
+
+        if self.collection is not None:
+            now = datetime.now(timezone.utc)
+            try:
+                await self.collection.update_one(
+                    {"_id": key},
+                    {"$set": {
+                        "endpoint": endpoint,
+                        "model": model,
+                        "age_bucket": age_bucket(age_months),
+                        "prompt": normalize_prompt(prompt),
+                        "response": response,
+                        "llm_seconds": llm_seconds,
+                        "tokens": tokens,
+                        "created_at": now,
+                        "expires_at": now + timedelta(seconds=ttl),
+                    }},
+                    upsert=True,
+                )
+            except Exception as e:
+                logging.error(f"LLM cache persistent write failed: {str(e)}")
+
+    def _remember(self, key: str, response: str, expires_at: float, llm_seconds: float, tokens: int):
+        self._entries[key] = {
+            "response": response,
+            "expires_at": expires_at,
+            "llm_seconds": llm_seconds,
+            "tokens": tokens,
+        }
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    async def get_or_call(
+        self,
+        endpoint: str,
+        model: str,
+        prompt: str,
+        age_months: Optional[int],
+        call: Callable[[], Awaitable[Tuple[str, int]]],
+    ) -> str:
+        """
+        Return the cached response, or run ``call`` and cache its result.
+        ``call`` must return ``(response_text, total_tokens)``; exceptions propagate
+        and nothing is cached.
+        """
+        cached = await self.get(endpoint, model, prompt, age_months)
+        if cached is not None:
+            return cached
+        return await self.call_and_store(endpoint, model, prompt, age_months, call)
+
+    async def call_and_store(
+        self,
+        endpoint: str,
+        model: str,
+        prompt: str,
+        age_months: Optional[int],
+        call: Callable[[], Awaitable[Tuple[str, int]]],
+    ) -> str:
+        """Run ``call`` unconditionally and cache its result"""
+        started = time.perf_counter()
+        response, tokens = await call()
+        elapsed = time.perf_counter() - started
+        await self.set(endpoint, model, prompt, age_months, response, elapsed, tokens)
+        return response
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit rates and the LLM seconds/tokens saved, overall and per endpoint"""
+        endpoints = {}
+        totals = {"hits": 0, "misses": 0, "saved_llm_seconds": 0.0, "saved_tokens": 0}
+        for endpoint, counter in self._stats.items():
+            hits = counter["hits_memory"] + counter["hits_persistent"]
+            lookups = hits + counter["misses"]
+            endpoints[endpoint] = {
+                **counter,
+                "saved_llm_seconds": round(counter["saved_llm_seconds"], 3),
+                "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+                "enabled": self.enabled_for(endpoint),
+                "ttl_seconds": self.ttl_for(endpoint),
+            }
+            totals["hits"] += hits
+            totals["misses"] += counter["misses"]
+            totals["saved_llm_seconds"] += counter["saved_llm_seconds"]
+            totals["saved_tokens"] += counter["saved_tokens"]
+
+        lookups = totals["hits"] + totals["misses"]
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "evictions": self.evictions,
+            "persistent_tier": self.collection is not None,
+            "hit_rate": round(totals["hits"] / lookups, 4) if lookups else 0.0,
+            "hits": totals["hits"],
+            "misses": totals["misses"],
+            "saved_llm_seconds": round(totals["saved_llm_seconds"], 3),
+            "saved_tokens": totals["saved_tokens"],
+            "endpoints": endpoints,
+        }
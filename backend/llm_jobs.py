@@ -0,0 +1,221 @@
+"""
+Asynchronous LLM job queue
+Long LLM calls are enqueued and run by an in-process asyncio worker pool so
+HTTP requests return a job ID immediately; clients poll or long-poll for the
+result. The queue is bounded, schedules users round-robin so one user's burst
+cannot starve everyone else, and keeps finished results for a short TTL.
+"""
+import asyncio
+import logging
+import os
+import time
+import uuid
+from collections import OrderedDict, deque
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional
+
+
+class JobQueueFull(Exception):
+    """Raised when the queue (or a user's share of it) is at capacity"""
+
+
+class Job:
+    def __init__(self, kind: str, user_id: str, run: Callable[[], Awaitable[Any]]):
+        self.id = str(uuid.uuid4())
+        self.kind = kind
+        self.user_id = user_id
+        self.status = "queued"  # queued, running, succeeded, failed
+        self.result: Any = None
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self._run = run
+        self._done = asyncio.Event()
+
+    @property
+    def done(self) -> bool:
+        return self.status in ("succeeded", "failed")
+
+    def to_dict(self) -> Dict[str, Any]:
+        def iso(ts):
+            return datetime.fromtimestamp(ts, timezone.utc).isoformat() if ts else None
+
+        return {
+            "job_id": self.id,
+            "endpoint": self.kind,
+            "status": self.status,
+            "result": self.result,
+            "error": self.error,
+            "created_at": iso(self.created_at),
+            "started_at": iso(self.started_at),
+            "finished_at": iso(self.finished_at),
+            "queue_seconds": round(self.started_at - self.created_at, 3) if self.started_at else None,
+            "run_seconds": round(self.finished_at - self.started_at, 3) if self.finished_at and self.started_at else None,
+        }
+
+
+def _percentile(values: List[float], pct: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return round(ordered[min(len(ordered) - 1, int(len(ordered) * pct))], 3)
+
+
+class LLMJobQueue:
+    """
+    Bounded, per-user fair job queue served by ``workers`` asyncio tasks.
+
+    Pending jobs live in one FIFO per user; workers take the next job from
+    the user at the head of a round-robin rotation.
+    """
+
+    def __init__(
+        self,
+        workers: int = 4,
+        max_depth: int = 200,
+        max_per_user: int = 10,
+        result_ttl: int = 600,
+    ):
+        self.workers = workers
+        self.max_depth = max_depth
+        self.max_per_user = max_per_user
+        self.result_ttl = result_ttl
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._pending: Dict[str, Deque[Job]] = {}
+        self._rotation: Deque[str] = deque()
+        self._available = asyncio.Semaphore(0)
+        self._tasks: List[asyncio.Task] = []
+        self.running = 0
+        self.submitted = 0
+        self.succeeded = 0
+        self.failed = 0
+        self.rejected = 0
+        self._queue_waits: Deque[float] = deque(maxlen=1000)
+        self._run_times: Deque[float] = deque(maxlen=1000)
+
+    @classmethod
+    def from_env(cls) -> "LLMJobQueue":
+        return cls(
+            workers=int(os.environ.get("LLM_JOB_WORKERS", 4)),
+            max_depth=int(os.environ.get("LLM_JOB_MAX_DEPTH", 200)),
+            max_per_user=int(os.environ.get("LLM_JOB_MAX_PER_USER", 10)),
+            result_ttl=int(os.environ.get("LLM_JOB_RESULT_TTL", 600)),
+        )
+
+    @property
+    def depth(self) -> int:
+        return sum(len(jobs) for jobs in self._pending.values())
+
+    def start(self):
+        if self._tasks:
+            return
+        self._tasks = [asyncio.ensure_future(self._worker(n)) for n in range(self.workers)]
+        logging.info(f"LLM job queue started with {self.workers} workers")
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def submit(self, kind: str, user_id: str, run: Callable[[], Awaitable[Any]]) -> Job:
+        """Enqueue ``run`` (an async callable returning a JSON-able result)"""
+        self._purge_expired()
+        user_jobs = self._pending.get(user_id)
+        if self.depth >= self.max_depth or (user_jobs and len(user_jobs) >= self.max_per_user):
+            self.rejected += 1
+            raise JobQueueFull("LLM job queue is full, please retry shortly")
+
+        job = Job(kind, user_id, run)
+        self._jobs[job.id] = job
+        if user_jobs is None:
+            self._pending[user_id] = user_jobs = deque()
+            self._rotation.append(user_id)
+        user_jobs.append(job)
+        self.submitted += 1
+        self._available.release()
+        return job
+
+    def get(self, job_id: str, user_id: str) -> Optional[Job]:
+        """Look up a job; other users' jobs are invisible"""
+        self._purge_expired()
+        job = self._jobs.get(job_id)
+        if job is None or job.user_id != user_id:
+            return None
+        return job
+
+    async def wait(self, job: Job, timeout: float) -> Job:
+        """Long-poll: return once the job finishes or ``timeout`` seconds pass"""
+        if not job.done and timeout > 0:
+            try:
+                await asyncio.wait_for(job._done.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+        return job
+
+    def _next_job(self) -> Job:
+        user_id = self._rotation.popleft()
+        user_jobs = self._pending[user_id]
+        job = user_jobs.popleft()
+        if user_jobs:
+            self._rotation.append(user_id)
+        else:
+            del self._pending[user_id]
+        return job
+
+    async def _worker(self, number: int):
+        while True:
+            await self._available.acquire()
+            job = self._next_job()
+            job.status = "running"
+            job.started_at = time.time()
+            self._queue_waits.append(job.started_at - job.created_at)
+            self.running += 1
+            try:
+                job.result = await job._run()
+                job.status = "succeeded"
+                self.succeeded += 1
+            except asyncio.CancelledError:
+                job.status = "failed"
+                job.error = "Job cancelled"
+                raise
+            except Exception as e:
+                job.status = "failed"
+                job.error = getattr(e, "detail", None) or str(e)
+                self.failed += 1
+                logging.error(f"LLM job {job.id} ({job.kind}) failed: {job.error}")
+            finally:
+                self.running -= 1
+                job.finished_at = time.time()
+                job._run = None
+                self._run_times.append(job.finished_at - job.started_at)
+                job._done.set()
+
+    def _purge_expired(self):
+        cutoff = time.time() - self.result_ttl
+        expired = [job_id for job_id, job in self._jobs.items() if job.done and job.finished_at < cutoff]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+    def stats(self) -> Dict[str, Any]:
+        queue_waits = list(self._queue_waits)
+        run_times = list(self._run_times)
+        return {
+            "workers": self.workers,
+            "depth": self.depth,
+            "max_depth": self.max_depth,
+            "max_per_user": self.max_per_user,
+            "users_waiting": len(self._pending),
+            "running": self.running,
+            "retained_jobs": len(self._jobs),
+            "result_ttl_seconds": self.result_ttl,
+            "submitted": self.submitted,
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "queue_seconds_p50": _percentile(queue_waits, 0.5),
+            "queue_seconds_p95": _percentile(queue_waits, 0.95),
+            "run_seconds_p50": _percentile(run_times, 0.5),
+            "run_seconds_p95": _percentile(run_times, 0.95),
+        }
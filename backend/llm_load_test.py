@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Load test for the LLM-heavy endpoints
+Fires concurrent requests at a running backend or public-server (normally with
+LLM_STUB_URL pointing at llm_stub_server.py) and reports throughput, latency
+percentiles and status codes, plus the server's LLM metrics summary.
+
+Usage:
+    python llm_load_test.py --base-url http://localhost:8001 --email demo@babysteps.com \\
+        --password demo123 --endpoint ai_chat --requests 200 --concurrency 20
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from collections import Counter
+
+import httpx
+
+ENDPOINTS = {
+    "ai_chat": ("/api/ai/chat", {"message": "How much should my baby sleep? ({n})", "baby_age_months": 8}),
+    "meals_search": ("/api/meals/search", {"query": "iron rich breakfast ideas {n}", "baby_age_months": 10}),
+    "emergency_training": ("/api/emergency/training", {"emergency_type": "febrile seizure {n}", "baby_age_months": 9}),
+    "food_research": ("/api/food/research", {"query": "kiwi {n}", "baby_age_months": 8}),
+    "research": ("/api/research", {"query": "teething remedies {n}"}),
+}
+
+
+def _body(template: dict, n: int, repeat: int) -> dict:
+    # --repeat > 1 sends identical prompts so caches and single-flight can kick in
+    key = n // repeat
+    return {k: v.format(n=key) if isinstance(v, str) else v for k, v in template.items()}
+
+
+async def run(args):
+    path, template = ENDPOINTS[args.endpoint]
+    if args.body:
+        template = json.loads(args.body)
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=args.timeout) as client:
+        token = args.token
+        if not token:
+            response = await client.post("/api/auth/login", json={"email": args.email, "password": args.password})
+            response.raise_for_status()
+            token = response.json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+
+        latencies, statuses = [], Counter()
+        semaphore = asyncio.Semaphore(args.concurrency)
+
+        async def one(n):
+            async with semaphore:
+                started = time.perf_counter()
+                try:
+                    response = await client.post(path, json=_body(template, n, args.repeat), headers=headers)
+                    statuses[response.status_code] += 1
+                except httpx.HTTPError as e:
+                    statuses[type(e).__name__] += 1
+                latencies.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(one(n) for n in range(args.requests)))
+        elapsed = time.perf_counter() - started
+
+        ordered = sorted(latencies)
+        print(f"🚀 {args.requests} x {path} at concurrency {args.concurrency} in {elapsed:.1f}s "
+              f"({args.requests / elapsed:.1f} req/s)")
+        print(f"   p50 {statistics.median(ordered):.3f}s  p95 {ordered[int(len(ordered) * 0.95) - 1]:.3f}s  "
+              f"p99 {ordered[int(len(ordered) * 0.99) - 1]:.3f}s  max {ordered[-1]:.3f}s")
+        print(f"   statuses: {dict(statuses)}")
+
+        summary = await client.get("/api/llm/metrics/summary")
+        if summary.status_code == 200:
+            print(f"📊 LLM summary: {json.dumps(summary.json(), indent=2)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8001")
+    parser.add_argument("--endpoint", choices=sorted(ENDPOINTS), default="ai_chat")
+    parser.add_argument("--body", help="JSON request body overriding the endpoint default")
+    parser.add_argument("--token", help="bearer token (otherwise log in with --email/--password)")
+    parser.add_argument("--email", default="demo@babysteps.com")
+    parser.add_argument("--password", default="demo123")
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=1, help="send each distinct prompt this many times")
+    parser.add_argument("--timeout", type=float, default=120)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
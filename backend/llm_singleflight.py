@@ -0,0 +1,84 @@
+"""
+Single-flight coalescing for LLM calls
+Concurrent identical requests share one upstream call instead of each
+opening their own. Waiters are shielded from each other: a leader whose
+client disconnects does not cancel the call the followers are waiting on.
+"""
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict
+
+
+class _Flight:
+    def __init__(self, task: "asyncio.Task"):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Group of in-flight calls keyed by a string (normally the LLM cache key).
+
+    When the last waiter goes away before the call finishes, the upstream
+    task is cancelled if ``cancel_orphans`` is set; otherwise it runs to
+    completion so its result can still populate the response cache.
+    """
+
+    def __init__(self, cancel_orphans: bool = False):
+        self.cancel_orphans = cancel_orphans
+        self._flights: Dict[str, _Flight] = {}
+        self.leaders = 0
+        self.coalesced = 0
+        self.abandoned = 0
+        self.orphans_cancelled = 0
+        self.max_waiters = 0
+
+    def _forget(self, key: str, flight: _Flight):
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Run ``fn`` once per key at a time and share its result with every concurrent caller"""
+        flight = self._flights.get(key)
+        if flight is None or flight.task.done():
+            task = asyncio.ensure_future(fn())
+            flight = _Flight(task)
+            self._flights[key] = flight
+            task.add_done_callback(lambda _t, k=key, f=flight: self._forget(k, f))
+            self.leaders += 1
+        else:
+            self.coalesced += 1
+
+        flight.waiters += 1
+        self.max_waiters = max(self.max_waiters, flight.waiters)
+        try:
+            # shield: cancelling this waiter must not cancel the shared call
+            return await asyncio.shield(flight.task)
+        except asyncio.CancelledError:
+            if not flight.task.done():
+                self.abandoned += 1
+            raise
+        finally:
+            flight.waiters -= 1
+            if flight.waiters == 0 and not flight.task.done():
+                if self.cancel_orphans:
+                    flight.task.cancel()
+                    self.orphans_cancelled += 1
+                    logging.info(f"Single-flight: cancelled orphaned LLM call {key[:12]}")
+                else:
+                    # Nobody is waiting any more; retrieve the eventual exception so
+                    # asyncio does not log "exception was never retrieved"
+                    flight.task.add_done_callback(
+                        lambda t: t.cancelled() or t.exception()
+                    )
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "in_flight": len(self._flights),
+            "leaders": self.leaders,
+            "coalesced": self.coalesced,
+            "abandoned_waiters": self.abandoned,
+            "orphans_cancelled": self.orphans_cancelled,
+            "max_waiters": self.max_waiters,
+            "cancel_orphans": self.cancel_orphans,
+        }
@@ -0,0 +1,345 @@
+#!/usr/bin/env python3
+"""
+Local stand-in LLM provider (OpenAI-compatible chat completions)
+Serves POST /v1/chat/completions with configurable latency distributions,
+streaming, error injection and token accounting, so the LLM-heavy endpoints
+can be load tested and pools/breakers tuned without real keys or network.
+
+Usage:
+    python llm_stub_server.py --port 8900 --ttft lognormal:median=0.8,sigma=0.5 --error-rate 0.02
+    LLM_STUB_URL=http://127.0.0.1:8900 uvicorn server:app      # backend
+    LLM_STUB_URL=http://127.0.0.1:8900 uvicorn app:app         # public-server
+
+Distributions: fixed:<s>, uniform:<low>,<high>, normal:mean=<m>,sd=<s>,
+lognormal:median=<m>,sigma=<s>. Settings can be changed at runtime with
+POST /config and counters read from GET /stats.
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import math
+import os
+import random
+import time
+import uuid
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+WORDS = (
+    "offer small soft pieces and watch closely for signs of choking or allergy while your baby "
+    "learns new textures most babies are ready for solids around six months keep portions "
+    "simple cook vegetables until tender mash fruit with breast milk or formula avoid added "
+    "salt sugar and honey before twelve months consult your pediatrician with any concerns"
+).split()
+
+VERDICT_LABELS = ("SAFE:", "SAFE WITH CAUTION:", "NOT SAFE:")
+
+
+def parse_distribution(spec: str) -> Callable[[random.Random], float]:
+    """'lognormal:median=0.8,sigma=0.5' -> sampler(rng) returning a non-negative float"""
+    kind, _, raw = spec.partition(":")
+    params: Dict[str, float] = {}
+    positional: List[float] = []
+    for part in filter(None, raw.split(",")):
+        if "=" in part:
+            name, value = part.split("=", 1)
+            params[name.strip()] = float(value)
+        else:
+            positional.append(float(part))
+
+    if kind == "fixed":
+        value = positional[0] if positional else params.get("value", 0.0)
+        return lambda rng: value
+    if kind == "uniform":
+        low, high = positional if len(positional) == 2 else (params["low"], params["high"])
+        return lambda rng: rng.uniform(low, high)
+    if kind == "normal":
+        mean, sd = params.get("mean", 1.0), params.get("sd", 0.0)
+        return lambda rng: max(rng.gauss(mean, sd), 0.0)
+    if kind == "lognormal":
+        mu, sigma = math.log(params.get("median", 1.0)), params.get("sigma", 0.5)
+        return lambda rng: rng.lognormvariate(mu, sigma)
+    raise ValueError(f"Unknown distribution '{spec}'")
+
+
+def count_tokens(text: str) -> int:
+    """~4 characters per token, matching llm_cache.estimate_tokens"""
+    return math.ceil(len(text or "") / 4)
+
+
+class StubConfig:
+    FIELDS = {
+        "ttft": str,
+        "completion_tokens": str,
+        "tokens_per_second": float,
+        "error_rate": float,
+        "error_statuses": list,
+        "slow_rate": float,
+        "slow_seconds": float,
+        "time_scale": float,
+    }
+
+    def __init__(self, **overrides):
+        self.ttft = "lognormal:median=0.8,sigma=0.5"
+        self.completion_tokens = "normal:mean=250,sd=80"
+        self.tokens_per_second = 60.0
+        self.error_rate = 0.0
+        self.error_statuses = [500, 503, 429]
+        self.slow_rate = 0.0
+        self.slow_seconds = 30.0
+        self.time_scale = 1.0  # 0 skips every sleep (unit tests)
+        self.update(overrides)
+
+    @classmethod
+    def from_env(cls) -> "StubConfig":
+        overrides = {}
+        for field, kind in cls.FIELDS.items():
+            value = os.environ.get(f"LLM_STUB_{field.upper()}")
+            if value:
+                overrides[field] = [int(s) for s in value.split(",")] if kind is list else kind(value)
+        return cls(**overrides)
+
+    def update(self, values: Dict[str, Any]):
+        for field, value in values.items():
+            if field not in self.FIELDS:
+                raise ValueError(f"Unknown setting '{field}'")
+            setattr(self, field, value)
+        # Validate distributions eagerly so a bad POST /config is rejected
+        self._ttft = parse_distribution(self.ttft)
+        self._completion_tokens = parse_distribution(self.completion_tokens)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {field: getattr(self, field) for field in self.FIELDS}
+
+
+class StubProvider:
+    def __init__(self, config: StubConfig, seed: int = 0):
+        self.config = config
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.reset()
+
+    def reset(self):
+        self.requests = 0
+        self.streamed = 0
+        self.errors: Dict[str, int] = {}
+        self.slow = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self._latencies = deque(maxlen=10000)
+
+    async def sleep(self, seconds: float):
+        if seconds > 0 and self.config.time_scale > 0:
+            await asyncio.sleep(seconds * self.config.time_scale)
+
+    def completion_text(self, model: str, messages: List[Dict[str, Any]], tokens: int) -> str:
+        """Deterministic text of roughly ``tokens`` tokens for a given prompt"""
+        prompt = json.dumps([model, messages], sort_keys=True)
+        digest = hashlib.sha256(f"{self.seed}|{prompt}".encode("utf-8")).digest()
+        rng = random.Random(digest)
+        words = []
+        if "SAFE WITH CAUTION" in prompt:
+            # Mirror the safety-check answer format so verdict parsing is exercised
+            words.append(rng.choice(VERDICT_LABELS))
+        while count_tokens(" ".join(words)) < tokens:
+            words.append(rng.choice(WORDS))
+        # Trim so max_completion_tokens is honoured exactly
+        return " ".join(words).capitalize()[:max(tokens * 4 - 1, 1)] + "."
+
+    def stats(self) -> Dict[str, Any]:
+        latencies = sorted(self._latencies)
+
+        def pct(p):
+            return round(latencies[min(len(latencies) - 1, int(len(latencies) * p))], 3) if latencies else None
+
+        return {
+            "requests": self.requests,
+            "streamed": self.streamed,
+            "errors_injected": dict(self.errors),
+            "slow_injected": self.slow,
+            "in_flight": self.in_flight,
+            "max_in_flight": self.max_in_flight,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "latency_p50": pct(0.5),
+            "latency_p95": pct(0.95),
+            "latency_p99": pct(0.99),
+            "config": self.config.to_dict(),
+        }
+
+
+def _chunk(completion_id: str, model: str, created: int, delta: Dict[str, Any], finish_reason=None, usage=None) -> str:
+    body = {
+        "id": completion_id,
+        "object": "chat.completion.chunk",
+        "created": created,
+        "model": model,
+        "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}] if usage is None else [],
+    }
+    if usage is not None:
+        body["usage"] = usage
+    return f"data: {json.dumps(body)}\n\n"
+
+
+def create_app(config: Optional[StubConfig] = None, seed: int = 0) -> FastAPI:
+    provider = StubProvider(config or StubConfig.from_env(), seed)
+    app = FastAPI(title="LLM stub provider")
+    app.state.provider = provider
+
+    @app.get("/v1/models")
+    async def list_models():
+        return {"object": "list", "data": [
+            {"id": model, "object": "model", "owned_by": "stub"} for model in ("gpt-5", "gpt-5-nano", "gpt-4o-mini")
+        ]}
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        config = provider.config
+        rng = provider.rng
+        model = body.get("model", "stub")
+        messages = body.get("messages", [])
+        stream = bool(body.get("stream"))
+
+        provider.requests += 1
+        provider.in_flight += 1
+        provider.max_in_flight = max(provider.max_in_flight, provider.in_flight)
+        started = time.perf_counter()
+        try:
+            if rng.random() < config.slow_rate:
+                provider.slow += 1
+                await provider.sleep(config.slow_seconds)
+
+            ttft = config._ttft(rng)
+            if rng.random() < config.error_rate:
+                status = rng.choice(config.error_statuses)
+                provider.errors[str(status)] = provider.errors.get(str(status), 0) + 1
+                await provider.sleep(ttft)
+                provider.in_flight -= 1
+                return JSONResponse(
+                    status_code=status,
+                    content={"error": {"message": f"Injected stub error {status}", "type": "stub_error", "code": status}},
+                )
+
+            prompt_tokens = count_tokens("".join(str(m.get("content", "")) for m in messages))
+            limit = body.get("max_completion_tokens") or body.get("max_tokens")
+            target = max(int(config._completion_tokens(rng)), 1)
+            if limit:
+                target = min(target, int(limit))
+            text = provider.completion_text(model, messages, target)
+            completion_tokens = count_tokens(text)
+            usage = {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            }
+            provider.prompt_tokens += prompt_tokens
+            provider.completion_tokens += completion_tokens
+            per_token = 1 / config.tokens_per_second if config.tokens_per_second > 0 else 0.0
+            completion_id = f"chatcmpl-stub-{uuid.uuid4().hex[:12]}"
+            created = int(time.time())
+        except BaseException:
+            provider.in_flight -= 1
+            raise
+
+        if not stream:
+            try:
+                await provider.sleep(ttft + completion_tokens * per_token)
+            finally:
+                provider.in_flight -= 1
+                provider._latencies.append(time.perf_counter() - started)
+            return {
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": created,
+                "model": model,
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": text},
+                    "finish_reason": "stop",
+                }],
+                "usage": usage,
+            }
+
+        provider.streamed += 1
+        include_usage = bool((body.get("stream_options") or {}).get("include_usage"))
+
+        async def events():
+            try:
+                await provider.sleep(ttft)
+                yield _chunk(completion_id, model, created, {"role": "assistant", "content": ""})
+                words = text.split(" ")
+                for position, word in enumerate(words):
+                    piece = word if position == 0 else " " + word
+                    yield _chunk(completion_id, model, created, {"content": piece})
+                    await provider.sleep(count_tokens(piece) * per_token)
+                yield _chunk(completion_id, model, created, {}, finish_reason="stop")
+                if include_usage:
+                    yield _chunk(completion_id, model, created, {}, usage=usage)
+                yield "data: [DONE]\n\n"
+            finally:
+                provider.in_flight -= 1
+                provider._latencies.append(time.perf_counter() - started)
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    @app.get("/stats")
+    async def stats():
+        return provider.stats()
+
+    @app.post("/config")
+    async def update_config(request: Request):
+        try:
+            provider.config.update(await request.json())
+        except (ValueError, KeyError) as e:
+            return JSONResponse(status_code=400, content={"detail": str(e)})
+        return provider.config.to_dict()
+
+    @app.post("/reset")
+    async def reset():
+        provider.reset()
+        return provider.stats()
+
+    return app
+
+
+app = create_app(seed=int(os.environ.get("LLM_STUB_SEED", 0)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--ttft", help="time-to-first-token distribution, seconds")
+    parser.add_argument("--completion-tokens", help="completion length distribution, tokens")
+    parser.add_argument("--tokens-per-second", type=float)
+    parser.add_argument("--error-rate", type=float)
+    parser.add_argument("--error-statuses", help="comma-separated HTTP statuses to inject")
+    parser.add_argument("--slow-rate", type=float, help="share of requests that hang for --slow-seconds")
+    parser.add_argument("--slow-seconds", type=float)
+    args = parser.parse_args()
+
+    config = StubConfig.from_env()
+    overrides = {
+        field: getattr(args, field) for field in StubConfig.FIELDS
+        if getattr(args, field, None) is not None
+    }
+    if isinstance(overrides.get("error_statuses"), str):
+        overrides["error_statuses"] = [int(s) for s in overrides["error_statuses"].split(",")]
+    config.update(overrides)
+
+    import uvicorn
+
+    print(f"🧪 LLM stub listening on http://{args.host}:{args.port} with {config.to_dict()}")
+    uvicorn.run(create_app(config, args.seed), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,369 @@
+"""
+Meal idea search over meal_planner.json
+Flattens the knowledge base into individual recipes at load time and indexes
+them by ingredient and name word, by category and by month of age, so
+/api/meals/search returns structured recipes in well under a millisecond
+without an LLM round trip. The LLM is only asked to enrich the answer when
+the caller opts in.
+
+Every index entry is a bitset over recipe positions (a Python int, bit i set
+when recipe i qualifies), so age, category, required-ingredient and
+allergen/ingredient exclusion filters are a handful of AND/OR/NOT operations
+across all recipes at once. Each recipe is also tagged with an allergen
+bitset from ALLERGEN_SYNONYMS. Benchmark with meal_search_benchmark.py.
+"""
+import json
+import logging
+import math
+import re
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from kb_router import KNOWLEDGE_BASE_DIR, parse_age_range, tokenize
+
+MEAL_PLANNER_FILE = "meal_planner.json"
+DEFAULT_LIMIT = 5
+MAX_LIMIT = 50
+# Age index runs to the end of the oldest range in the knowledge base; older toddlers use its last month
+MAX_AGE_MONTHS = 24
+# Babies younger than the youngest recipe range get milk feeds instead of an empty list
+MILK_FEEDS = {
+    "id": "milk-feeds",
+    "name": "Breast Milk or Formula",
+    "category": "Milk Feeds",
+    "age_range": "0+ months",
+    "ingredients": ["Breast milk or appropriate infant formula"],
+    "instructions": "Feed on demand or follow the schedule your pediatrician recommends. "
+                    "No solid foods yet: most babies start solids around 6 months, never before 4 months.",
+    "allergens": [],
+    "safety_tips": ["Consult your pediatrician for a feeding schedule", "No water, juice or solids yet"],
+}
+
+# Quantities and preparation words say nothing about what is in the dish
+PREPARATION_WORDS = {
+    "tbsp", "tsp", "cup", "oz", "g", "ml", "dash", "pinch", "piece", "slice", "half", "small", "large",
+    "mini", "ripe", "fresh", "plain", "whole", "mixed", "ground", "grated", "shredded", "diced", "chopped",
+    "mashed", "cooked", "steamed", "boiled", "baked", "soft", "finely", "water", "optional",
+}
+# Query words that ask for meals in general rather than a particular dish
+MEAL_WORDS = {"meal", "idea", "recipe", "food", "dish", "make", "healthy", "easy", "quick", "simple", "need"}
+
+# Query words that select a category (the categories themselves also match by name)
+CATEGORY_ALIASES = {
+    "breakfast": "Breakfast",
+    "lunch": "Lunch",
+    "dinner": "Dinner",
+    "supper": "Dinner",
+    "snack": "Snack",
+    "blw": "Baby-Led Weaning",
+    "weaning": "Baby-Led Weaning",
+    "finger": "Baby-Led Weaning",
+    "family": "Family Meals",
+}
+
+# Ingredient and recipe-name words that carry each allergen. Prepared foods are
+# tagged with everything they usually contain (a pancake is egg, dairy and
+# wheat): a missed allergen is worse than a recipe filtered out needlessly.
+# Breast milk, nut butters and plant milks are not dairy (_NOT_DAIRY); infant
+# formula is left untagged, since babies with a milk allergy use a special one.
+ALLERGEN_SYNONYMS = {
+    "dairy": (
+        "milk", "cheese", "cheesy", "butter", "yogurt", "cream", "ricotta", "cottage", "mozzarella", "cheddar",
+        "parmesan", "ghee", "kefir", "custard", "paneer", "lasagna", "pancake", "waffle", "muffin", "cake",
+        "creamy", "quesadilla", "pizza", "french toast",
+    ),
+    "egg": ("egg", "yolk", "omelet", "omelette", "frittata", "mayonnaise", "mayo", "custard", "pancake", "waffle",
+            "muffin", "cake", "french toast", "chicken salad", "egg salad", "tuna salad"),
+    "wheat": (
+        "wheat", "flour", "bread", "breadcrumb", "toast", "pasta", "macaroni", "noodle", "spaghetti", "couscous",
+        "cracker", "bagel", "bun", "pita", "tortilla", "pretzel", "crust", "dough", "pie", "lasagna", "barley",
+        "semolina", "pancake", "waffle", "muffin", "cake", "dinner roll", "bread roll", "slider", "sandwich",
+        "sandwiches", "pizza", "burrito", "quesadilla", "nugget",
+        "puff",  # baby puffs are usually wheat-based; over-excluding is the safe side
+    ),
+    "peanut": ("peanut",),
+    "tree_nut": ("almond", "cashew", "walnut", "pecan", "hazelnut", "pistachio", "macadamia", "nut"),
+    "fish": ("fish", "salmon", "cod", "tuna", "tilapia", "sardine", "haddock", "trout"),
+    "shellfish": ("shrimp", "prawn", "crab", "lobster", "scallop"),
+    "soy": ("soy", "tofu", "edamame", "tempeh", "miso"),
+    "sesame": ("sesame", "tahini", "hummus"),
+}
+ALLERGENS = tuple(ALLERGEN_SYNONYMS)
+ALLERGEN_BITS = {allergen: 1 << bit for bit, allergen in enumerate(ALLERGENS)}
+# Other names parents use for the same allergens
+ALLERGEN_ALIASES = {
+    "milk": ("dairy",), "lactose": ("dairy",), "eggs": ("egg",), "gluten": ("wheat",),
+    "peanuts": ("peanut",), "tree_nuts": ("tree_nut",), "nut": ("peanut", "tree_nut"), "nuts": ("peanut", "tree_nut"),
+    "seafood": ("fish", "shellfish"), "soya": ("soy",),
+}
+
+_MEASURE = re.compile(r"^[\d/.\s]+")
+_NOT_DAIRY = re.compile(
+    r"\b(?:breast\s*milk|(peanut|nut|almond|cashew|seed|sunflower|apple|cocoa)\s+butter|"
+    r"(coconut|almond|cashew|oat|soy|rice)\s+milk)\b",
+    re.IGNORECASE,
+)
+
+
+def ingredient_words(text: str) -> List[str]:
+    """Content words of an ingredient or query: '1/2 small sweet potatoes' -> ['sweet', 'potato']"""
+    words = []
+    for token in tokenize(_MEASURE.sub("", text or "")):
+        # tokenize() folds "potatoes" to "potatoe"
+        token = token[:-1] if token.endswith("oe") else token
+        if token not in PREPARATION_WORDS:
+            words.append(token)
+    return words
+
+
+# Synonyms go through the same normalisation as ingredients ("hummus" is stemmed like one).
+# Multi-word synonyms only match as a phrase: "dinner rolls" is wheat, "Roll-Ups" is not.
+_ALLERGEN_BY_WORD: Dict[str, int] = defaultdict(int)
+_ALLERGEN_BY_PHRASE: Dict[Tuple[str, ...], int] = defaultdict(int)
+for _allergen, _synonyms in ALLERGEN_SYNONYMS.items():
+    for _synonym in _synonyms:
+        _words = tuple(ingredient_words(_synonym))
+        if len(_words) == 1:
+            _ALLERGEN_BY_WORD[_words[0]] |= ALLERGEN_BITS[_allergen]
+        elif _words:
+            _ALLERGEN_BY_PHRASE[_words] |= ALLERGEN_BITS[_allergen]
+
+
+def allergen_mask(texts: Iterable[str]) -> int:
+    """Allergen bitset for a recipe's name and ingredient lines"""
+    mask = 0
+    for text in texts:
+        text = _NOT_DAIRY.sub(lambda match: match.group(1) or match.group(2) or "", text or "")
+        words = ingredient_words(text)
+        for word in words:
+            mask |= _ALLERGEN_BY_WORD.get(word, 0)
+        for phrase, bits in _ALLERGEN_BY_PHRASE.items():
+            if any(tuple(words[start:start + len(phrase)]) == phrase for start in range(len(words))):
+                mask |= bits
+    return mask
+
+
+def allergen_names(mask: int) -> List[str]:
+    return [allergen for allergen in ALLERGENS if mask & ALLERGEN_BITS[allergen]]
+
+
+def parse_allergens(values: Iterable[str]) -> int:
+    """Allergen bitset for user-supplied names ("Dairy", "tree nuts", "gluten"); ValueError on unknown names"""
+    mask = 0
+    for value in values:
+        name = re.sub(r"[\s-]+", "_", (value or "").strip().lower())
+        if not name:
+            continue
+        allergens = ALLERGEN_ALIASES.get(name) or ((name,) if name in ALLERGEN_BITS else None)
+        if allergens is None:
+            raise ValueError(f"Unknown allergen '{value}'. Known allergens: {', '.join(ALLERGENS)}")
+        for allergen in allergens:
+            mask |= ALLERGEN_BITS[allergen]
+    return mask
+
+
+def _positions(bits: int) -> Iterator[int]:
+    """Set bit positions of a recipe bitset, lowest first"""
+    while bits:
+        low = bits & -bits
+        yield low.bit_length() - 1
+        bits ^= low
+
+
+class MealSearchIndex:
+    """Recipes with word, category, per-month age and allergen bitset indexes"""
+
+    def __init__(self, entries: Optional[List[Dict[str, Any]]] = None):
+        self._build(entries or [])
+
+    def load(self, directory: Path = KNOWLEDGE_BASE_DIR) -> "MealSearchIndex":
+        path = Path(directory) / MEAL_PLANNER_FILE
+        try:
+            with open(path, "r", encoding="utf-8") as file:
+                entries = json.load(file)
+        except (FileNotFoundError, json.JSONDecodeError) as e:
+            logging.error(f"Meal planner knowledge base {path} unavailable: {str(e)}")
+            entries = []
+        self._build(entries)
+        logging.info(f"Indexed {len(self.recipes)} recipes from {len(entries)} meal planner entries")
+        return self
+
+    def _build(self, entries: List[Dict[str, Any]]):
+        self.recipes: List[Dict[str, Any]] = []
+        self._word_bits: Dict[str, int] = defaultdict(int)
+        self._category_bits: Dict[str, int] = defaultdict(int)
+        self._month_bits: List[int] = [0] * (MAX_AGE_MONTHS + 1)
+        self._allergen_bits: Dict[str, int] = {allergen: 0 for allergen in ALLERGENS}
+        self.allergen_masks: List[int] = []
+
+        seen = set()
+        for entry in entries:
+            category = entry.get("category") or "Meals"
+            age_range = entry.get("age_range", "")
+            low, high = parse_age_range(age_range) or (0, MAX_AGE_MONTHS)
+            for number, recipe in enumerate(entry.get("answer") or [], 1):
+                if not isinstance(recipe, dict) or not recipe.get("name"):
+                    continue
+                ingredients = list(recipe.get("ingredients") or [])
+                # The same recipe is repeated across questions for one category and age range
+                key = (recipe["name"].lower(), category, age_range, tuple(ingredients))
+                if key in seen:
+                    continue
+                seen.add(key)
+
+                position = len(self.recipes)
+                bit = 1 << position
+                mask = allergen_mask([recipe["name"], *ingredients])
+                self.recipes.append({
+                    "id": f"{entry.get('id')}-{number}",
+                    "name": recipe["name"],
+                    "category": category,
+                    "age_range": age_range,
+                    "min_age_months": low,
+                    "max_age_months": high,
+                    "ingredients": ingredients,
+                    "instructions": recipe.get("instructions", ""),
+                    "allergens": allergen_names(mask),
+                })
+                self.allergen_masks.append(mask)
+                for allergen in allergen_names(mask):
+                    self._allergen_bits[allergen] |= bit
+                words = set(ingredient_words(recipe["name"]))
+                for ingredient in ingredients:
+                    words.update(ingredient_words(ingredient))
+                for word in words:
+                    self._word_bits[word] |= bit
+                self._category_bits[category.lower()] |= bit
+                for month in range(max(low, 0), min(high, MAX_AGE_MONTHS) + 1):
+                    self._month_bits[month] |= bit
+
+        self._all_bits = (1 << len(self.recipes)) - 1
+        total = max(len(self.recipes), 1)
+        self._idf = {word: math.log(1 + total / bin(bits).count("1")) for word, bits in self._word_bits.items()}
+        self.youngest_age_months = min((recipe["min_age_months"] for recipe in self.recipes), default=0)
+        self.categories = sorted({recipe["category"] for recipe in self.recipes})
+        self._category_names = {name.lower(): name for name in self.categories}
+
+    def _category(self, words: Iterable[str], category: Optional[str]) -> Optional[str]:
+        if category:
+            return self._category_names.get(category.lower(), category)
+        for word in words:
+            if word in CATEGORY_ALIASES:
+                return CATEGORY_ALIASES[word]
+        return None
+
+    def _phrase_bits(self, phrase: str) -> int:
+        """Recipes containing every word of an ingredient phrase ("sweet potato")"""
+        words = ingredient_words(phrase)
+        if not words:
+            return 0
+        bits = self._all_bits
+        for word in words:
+            bits &= self._word_bits.get(word, 0)
+        return bits
+
+    def excluded_bits(self, allergens: int = 0, ingredients: Optional[List[str]] = None) -> int:
+        """Recipes carrying any of the allergens (an ALLERGEN_BITS mask) or any excluded ingredient"""
+        bits = 0
+        for allergen in allergen_names(allergens):
+            bits |= self._allergen_bits[allergen]
+        for phrase in ingredients or []:
+            bits |= self._phrase_bits(phrase)
+        return bits
+
+    def search(self, query: str = "", age_months: Optional[int] = None, category: Optional[str] = None,
+               ingredients: Optional[List[str]] = None, limit: int = DEFAULT_LIMIT,
+               offset: int = 0, exclude_allergens: int = 0,
+               exclude_ingredients: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        Recipes for a free-text query, ranked by IDF-weighted ingredient/name
+        overlap and filtered to the baby's age and the requested category.
+        Explicit `ingredients` must all be present; recipes with an excluded
+        allergen (a parse_allergens mask) or ingredient are left out.
+        `offset` pages through the ranking (the meal ideas widget asks for
+        the next few on refresh). Below the youngest recipe range the only
+        result is MILK_FEEDS.
+        """
+        if age_months is not None and int(age_months) < self.youngest_age_months:
+            # Too young for any recipe, whatever was asked for
+            return {
+                "recipes": [dict(MILK_FEEDS)][max(offset, 0):max(offset, 0) + max(limit, 1)],
+                "total": 1,
+                "category": None,
+                "matched_ingredients": [],
+                "unmatched_words": [],
+                "excluded_allergens": allergen_names(exclude_allergens),
+                "milk_feeds_only": True,
+            }
+        words = [word for word in ingredient_words(query) if word not in MEAL_WORDS]
+        category = self._category(words, category)
+        words = [word for word in words if word not in CATEGORY_ALIASES]
+
+        candidates = self._all_bits
+        if age_months is not None:
+            candidates &= self._month_bits[min(max(int(age_months), 0), MAX_AGE_MONTHS)]
+        if category:
+            candidates &= self._category_bits.get(category.lower(), 0)
+        for ingredient in ingredients or []:
+            candidates &= self._phrase_bits(ingredient)
+        if exclude_allergens or exclude_ingredients:
+            candidates &= ~self.excluded_bits(exclude_allergens, exclude_ingredients)
+
+        scores: Dict[int, float] = defaultdict(float)
+        matched_words = [word for word in words if word in self._idf]
+        for word in matched_words:
+            for position in _positions(self._word_bits[word] & candidates):
+                scores[position] += self._idf[word]
+        # Query words narrow the results to recipes containing them; a query of only
+        # meal/category words ("breakfast ideas") lists every candidate
+        pool = scores.keys() if words else _positions(candidates)
+
+        def rank(position):
+            recipe = self.recipes[position]
+            # Closest age range first: a 7 month old gets 6-8 month textures before 4-6 month purees
+            distance = 0 if age_months is None else abs(
+                (recipe["min_age_months"] + recipe["max_age_months"]) / 2 - age_months
+            )
+            return -scores.get(position, 0.0), distance, position
+
+        ranked = []
+        names = set()
+        for position in sorted(pool, key=rank):
+            # Variants of one dish (same name, other category or ingredients) are listed once
+            name = self.recipes[position]["name"].lower()
+            if name not in names:
+                names.add(name)
+                ranked.append(position)
+        if not words and not category:
+            ranked = _interleave_categories(ranked, self.recipes)
+
+        limit = min(max(limit, 1), MAX_LIMIT)
+        return {
+            "recipes": [self.recipes[position] for position in ranked[max(offset, 0):max(offset, 0) + limit]],
+            "total": len(ranked),
+            "category": category,
+            "matched_ingredients": matched_words,
+            "unmatched_words": [word for word in words if word not in self._idf],
+            "excluded_allergens": allergen_names(exclude_allergens),
+            "milk_feeds_only": False,
+        }
+
+
+def _interleave_categories(ranked: List[int], recipes: List[Dict[str, Any]]) -> List[int]:
+    """Round-robin across categories, keeping the rank order within each, so general queries get variety"""
+    by_category: Dict[str, List[int]] = defaultdict(list)
+    for position in ranked:
+        by_category[recipes[position]["category"]].append(position)
+    queues = list(by_category.values())
+    return [queue[turn] for turn in range(max(map(len, queues), default=0)) for queue in queues if turn < len(queue)]
+
+
+def format_recipes(recipes: List[Dict[str, Any]]) -> str:
+    """Plain-text rendering for clients that show results as a single string"""
+    return "\n\n".join(
+        f"**{recipe['name']}** ({recipe['category']}, {recipe['age_range']})\n"
+        f"Ingredients: {', '.join(recipe['ingredients'])}\n"
+        f"{recipe['instructions']}"
+        for recipe in recipes
+    )
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Latency benchmark for meal search exclusion filters
+Evaluates "no egg, no dairy, no nuts" style filters over every recipe in
+meal_planner.json three ways:
+
+  substring  scan each recipe's ingredient text for every synonym of the
+             excluded allergens (what an ad-hoc filter would do per request)
+  per-recipe test each recipe's precomputed allergen bitset in a Python loop
+  bitset     one OR of the allergen columns and one AND NOT across all
+             recipes at once (what MealSearchIndex.search does)
+
+and then times complete searches with the filters applied. Reports p50/p95
+microseconds per evaluation and checks that all three agree.
+
+Usage:
+    python meal_search_benchmark.py --iterations 2000
+"""
+import argparse
+import random
+import statistics
+import time
+
+from meal_search import (
+    ALLERGEN_SYNONYMS, MealSearchIndex, allergen_names, parse_allergens,
+)
+
+FILTERS = [
+    ["egg"],
+    ["dairy"],
+    ["egg", "dairy", "nuts"],
+    ["egg", "dairy", "wheat", "soy", "fish"],
+]
+QUERIES = ["", "breakfast ideas", "sweet potato", "chicken dinner", "banana oat", "finger foods"]
+
+
+def _timed(function, iterations):
+    samples = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        function()
+        samples.append((time.perf_counter() - started) * 1_000_000)
+    samples.sort()
+    return statistics.median(samples), samples[max(0, int(len(samples) * 0.95) - 1)]
+
+
+def substring_filter(index, allergens):
+    synonyms = [word for allergen in allergens for word in ALLERGEN_SYNONYMS[allergen]]
+    return [
+        position for position, recipe in enumerate(index.recipes)
+        if not any(word in text.lower() for text in (recipe["name"], *recipe["ingredients"]) for word in synonyms)
+    ]
+
+
+def per_recipe_filter(index, mask):
+    return [position for position, recipe_mask in enumerate(index.allergen_masks) if not recipe_mask & mask]
+
+
+def bitset_filter(index, mask):
+    return index._all_bits & ~index.excluded_bits(mask)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    index = MealSearchIndex().load()
+    print(f"📊 {len(index.recipes)} recipes, {args.iterations} iterations per measurement (µs, p50 / p95)\n")
+    print(f"{'exclude':32s} {'kept':>5s} {'substring':>17s} {'per-recipe':>17s} {'bitset':>17s}")
+    for names in FILTERS:
+        mask = parse_allergens(names)
+        allergens = allergen_names(mask)
+        bits = bitset_filter(index, mask)
+        kept = [position for position in range(len(index.recipes)) if bits >> position & 1]
+        assert kept == per_recipe_filter(index, mask)
+        # Substring matching over-excludes ("nut" in "butternut"), so it can only keep fewer
+        assert set(substring_filter(index, allergens)) <= set(kept)
+        timings = [
+            _timed(lambda: substring_filter(index, allergens), args.iterations),
+            _timed(lambda: per_recipe_filter(index, mask), args.iterations),
+            _timed(lambda: bitset_filter(index, mask), args.iterations),
+        ]
+        cells = " ".join(f"{p50:8.1f} / {p95:6.1f}" for p50, p95 in timings)
+        print(f"{', '.join(names):32s} {len(kept):5d} {cells}")
+
+    rng = random.Random(args.seed)
+    cases = [(rng.choice(QUERIES), rng.choice([None, 6, 9, 14, 20]), parse_allergens(rng.choice(FILTERS)))
+             for _ in range(64)]
+    position = iter(range(10 ** 9))
+
+    def search():
+        query, age, mask = cases[next(position) % len(cases)]
+        index.search(query, age, exclude_allergens=mask)
+
+    p50, p95 = _timed(search, args.iterations)
+    print(f"\n🔎 full search with exclusions: p50 {p50:.1f}µs, p95 {p95:.1f}µs")
+
+
+if __name__ == "__main__":
+    main()
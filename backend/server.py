@@ -1,5 +1,7 @@
 from fastapi import FastAPI, APIRouter, HTTPException, Depends, status, BackgroundTasks
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import PlainTextResponse
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
@@ -13,25 +15,63 @@ import uuid
 from datetime import datetime, timezone, timedelta
 from passlib.context import CryptContext
 from jose import JWTError, jwt
-from emergentintegrations.llm.chat import LlmChat, UserMessage
 import secrets
 import asyncio
+import time
 from openai import OpenAI
+from llm_cache import LLMResponseCache, estimate_tokens, make_cache_key
+from llm_singleflight import SingleFlight
+from emergency_guides import EmergencyGuideStore
+from kb_router import URGENT_CARE_ADVICE, KnowledgeBaseRouter, format_answer, is_urgent
+from meal_search import MealSearchIndex, allergen_names, format_recipes, parse_allergens
+from llm_jobs import LLMJobQueue, JobQueueFull
+from llm_breaker import BreakerRegistry, CircuitOpenError, hedged
+from llm_metrics import LLMMetrics, mark_enqueued, report_usage
+from food_verdicts import FoodVerdictStore, parse_verdict, SAFE, CAUTION
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
+if os.environ.get('LLM_STUB_URL'):
+    # Local stand-in provider for offline load and latency testing (llm_stub_server.py)
+    from llm_stub_client import LlmChat, UserMessage
+else:
+    from emergentintegrations.llm.chat import LlmChat, UserMessage
+
 # MongoDB connection
 mongo_url = os.environ['MONGO_URL']
 client = AsyncIOMotorClient(mongo_url)
 db = client[os.environ['DB_NAME']]
 
+# LLM response cache (memory tier, optional persistent tier in MongoDB)
+llm_cache = LLMResponseCache.from_env(collection=db.llm_response_cache)
+# Precomputed emergency guides, loaded at startup and served from memory
+emergency_guides = EmergencyGuideStore()
+# Knowledge-base-first routing for /api/ai/chat, indexed at startup
+kb_router = KnowledgeBaseRouter()
+# Recipe search over meal_planner.json for /api/meals/search, indexed at startup
+meal_index = MealSearchIndex()
+# In-process worker pool for asynchronous LLM jobs (/api/jobs)
+llm_jobs = LLMJobQueue.from_env()
+# Identical concurrent LLM requests share one upstream call
+llm_flights = SingleFlight(
+    cancel_orphans=os.environ.get('LLM_SINGLEFLIGHT_CANCEL_ORPHANS', 'false').lower() in ('1', 'true', 'yes')
+)
+# Circuit breakers per (model, endpoint) - fail fast while the provider is unhealthy
+llm_breakers = BreakerRegistry()
+# Per-call latency, token and cost instrumentation for every provider call
+llm_metrics = LLMMetrics.from_env()
+# Food safety verdicts by food and age band, seeded from the knowledge base and past checks
+food_verdicts = FoodVerdictStore(collection=db.food_safety_verdicts)
+
 # Security
 pwd_context = CryptContext(schemes=["pbkdf2_sha256"], deprecated="auto")
 security = HTTPBearer()
 SECRET_KEY = os.environ.get('JWT_SECRET_KEY', 'fallback-key')
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 480  # 8 hours for multiple device support
+# Bearer token for metrics scrapers; operational endpoints otherwise need a signed-in user
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
 
 # Email Configuration
 VERIFICATION_TOKEN_EXPIRE_HOURS = 24
@@ -276,6 +316,8 @@ class EmergencyResponse(BaseModel):
     important_notes: List[str]
     disclaimer: str
     when_to_call_911: List[str]
+    source: Optional[str] = None  # "precomputed" or "llm"
+    guide_version: Optional[str] = None
 
 class MealPlan(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
@@ -304,6 +346,8 @@ class FoodSafetyCheck(BaseModel):
     age_months: int
     is_safe: bool
     safety_notes: str
+    verdict: Optional[str] = None  # "safe", "caution" or "avoid"
+    source: Optional[str] = None  # "verdict_store", "knowledge_base", "llm" or "fallback"
     checked_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
 class FoodSafetyCheckCreate(BaseModel):
@@ -323,13 +367,63 @@ class ResearchResponse(BaseModel):
 class MealSearchQuery(BaseModel):
     query: str
     baby_age_months: Optional[int] = None
+    category: Optional[str] = None
+    ingredients: List[str] = []
+    limit: int = Field(default=5, ge=1, le=50)
+    offset: int = Field(default=0, ge=0)
+    exclude_allergens: List[str] = []  # dairy, egg, wheat, peanut, tree_nut, fish, shellfish, soy, sesame
+    exclude_ingredients: List[str] = []
+    enrich: bool = False  # also ask the LLM to build on the matched recipes
 
 class MealSearchResponse(BaseModel):
     results: str
     query: str
     age_months: Optional[int] = None
+    recipes: List[Dict[str, Any]] = []
+    total: int = 0
+    source: str = "meal_planner"  # meal_planner, llm (enriched) or knowledge_base
+    search_ms: Optional[float] = None
+    excluded_allergens: List[str] = []
 
 # Utility functions
+async def llm_call(endpoint: str, model: str, prompt: str, age_months: Optional[int], call):
+    """
+    Route an LLM call through the response cache, single-flight group and the
+    circuit breaker for (model, endpoint).
+    `call` is an async function returning (response_text, total_tokens); it may
+    be started twice when hedging is enabled, so it must not share chat state.
+    Raises CircuitOpenError without calling the provider while the breaker is open.
+    Provider calls are timed by llm_metrics; `call` reports token usage with report_usage().
+    """
+    requested_at = time.monotonic()
+    cached = await llm_cache.get(endpoint, model, prompt, age_months)
+    if cached is not None:
+        return cached
+    
+    breaker = llm_breakers.get(model, endpoint)
+    
+    async def guarded_call():
+        async with llm_metrics.track(endpoint, model, queued_at=requested_at) as metered:
+            try:
+                return await breaker.call(lambda: hedged(call, llm_breakers.hedge_after))
+            except CircuitOpenError:
+                metered.outcome = "rejected"
+                raise
+    
+    key = make_cache_key(endpoint, model, prompt, age_months)
+    return await llm_flights.do(
+        key, lambda: llm_cache.call_and_store(endpoint, model, prompt, age_months, guarded_call)
+    )
+
+def knowledge_base_fallback(question: str, age_months: Optional[int]) -> Optional[str]:
+    """Best confident knowledge-base answer for a question, used when the LLM is unavailable"""
+    if is_urgent(question):
+        return None
+    match = kb_router.index.search(question, age_months, limit=1) if kb_router.index else []
+    if match and match[0][0] >= kb_router.threshold:
+        return format_answer(match[0][1])
+    return None
+
 def verify_password(plain_password, hashed_password):
     return pwd_context.verify(plain_password, hashed_password)
 
@@ -368,6 +462,12 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
         raise credentials_exception
     return User(**user)
 
+async def require_metrics_access(credentials: HTTPAuthorizationCredentials = Depends(security)):
+    """Gate for operational stats: the METRICS_TOKEN or a valid user token"""
+    if METRICS_TOKEN and secrets.compare_digest(credentials.credentials, METRICS_TOKEN):
+        return
+    await get_current_user(credentials)
+
 def prepare_for_mongo(data):
     """Convert datetime objects to ISO strings for MongoDB storage"""
     if isinstance(data, dict):
@@ -473,20 +573,35 @@ class ChatRequest(BaseModel):
 class ChatResponse(BaseModel):
     response: str
     timestamp: str
+    source: str = "llm"  # "knowledge_base", "llm" or "urgent_care"
+    confidence: Optional[float] = None  # knowledge-base match confidence
 
 @api_router.post("/ai/chat", response_model=ChatResponse)
 async def ai_chat(request: ChatRequest, current_user: User = Depends(get_current_user)):
     """
     Simple OpenAI Chat Completions API endpoint
     Works with basic API key - no special permissions needed
+    Confident knowledge-base matches are answered directly without the LLM
     """
+    kb_match = kb_router.route(request.message, request.baby_age_months)
+    if kb_match:
+        logging.info(f"AI Chat - User: {current_user.id}, answered from knowledge base "
+                     f"({kb_match['entry']['source']} #{kb_match['entry'].get('id')}, confidence {kb_match['confidence']})")
+        return ChatResponse(
+            response=kb_match["answer"],
+            timestamp=datetime.now(timezone.utc).isoformat(),
+            source="knowledge_base",
+            confidence=kb_match["confidence"]
+        )
+    
     try:
-        api_key = os.environ.get("OPENAI_API_KEY")
+        stub_url = os.environ.get("LLM_STUB_URL")
+        api_key = os.environ.get("OPENAI_API_KEY") or ("stub" if stub_url else None)
         if not api_key:
             raise HTTPException(status_code=500, detail="OpenAI API key not configured")
         
-        # Create OpenAI client
-        client = OpenAI(api_key=api_key)
+        # Create OpenAI client (pointed at the local stand-in provider when LLM_STUB_URL is set)
+        client = OpenAI(api_key=api_key, base_url=f"{stub_url}/v1" if stub_url else None)
         
         # Build system message with baby care context
         system_message = """You are an expert AI Parenting Assistant specializing in evidence-based baby care for ages 0-24 months.
@@ -513,19 +628,43 @@ Response format:
         if request.baby_age_months is not None:
             system_message += f"\n\nCurrent baby's age: {request.baby_age_months} months. Tailor your response to this age."
         
-        # Call OpenAI Chat Completions API with gpt-5-nano for cost-effectiveness
-        response = client.chat.completions.create(
-            model="gpt-5-nano",  # Using cost-effective gpt-5-nano model
-            messages=[
-                {"role": "system", "content": system_message},
-                {"role": "user", "content": user_message}
-            ],
-            # gpt-5-nano specific configuration to avoid empty responses
-            max_completion_tokens=2000,  # Increased to ensure enough tokens for both reasoning and output
-            reasoning_effort="low"  # Use minimal reasoning to preserve tokens for response content
+        provider_called = False
+        
+        async def call_model():
+            nonlocal provider_called
+            provider_called = True
+            # Call OpenAI Chat Completions API with gpt-5-nano for cost-effectiveness
+            # The OpenAI client is synchronous - run it off the event loop
+            response = await asyncio.to_thread(
+                client.chat.completions.create,
+                model="gpt-5-nano",  # Using cost-effective gpt-5-nano model
+                messages=[
+                    {"role": "system", "content": system_message},
+                    {"role": "user", "content": user_message}
+                ],
+                # gpt-5-nano specific configuration to avoid empty responses
+                max_completion_tokens=2000,  # Increased to ensure enough tokens for both reasoning and output
+                reasoning_effort="low"  # Use minimal reasoning to preserve tokens for response content
+            )
+            content = response.choices[0].message.content
+            usage = getattr(response, "usage", None)
+            if usage:
+                report_usage(usage.prompt_tokens, usage.completion_tokens)
+                return content, usage.total_tokens
+            prompt_tokens = estimate_tokens(system_message, user_message)
+            completion_tokens = estimate_tokens(content)
+            report_usage(prompt_tokens, completion_tokens)
+            return content, prompt_tokens + completion_tokens
+        
+        started = time.perf_counter()
+        ai_response = await llm_call(
+            "ai_chat", "gpt-5-nano", request.message, request.baby_age_months, call_model
         )
-        
-        ai_response = response.choices[0].message.content
+        if provider_called:
+            # Cache and single-flight hits cost nothing - they would skew the savings estimate
+            kb_router.record_llm(
+                time.perf_counter() - started, estimate_tokens(system_message, user_message, ai_response)
+            )
         
         logging.info(f"AI Chat - User: {current_user.id}, Message: {request.message[:50]}..., Response length: {len(ai_response)}")
         
@@ -535,6 +674,13 @@ Response format:
         )
         
     except Exception as e:
+        if is_urgent(request.message):
+            logging.error(f"AI Chat error on an urgent message, sending urgent-care advice: {str(e)}")
+            return ChatResponse(
+                response=URGENT_CARE_ADVICE,
+                timestamp=datetime.now(timezone.utc).isoformat(),
+                source="urgent_care"
+            )
         logging.error(f"AI Chat error: {str(e)}")
         logging.error(f"Exception type: {type(e).__name__}")
         import traceback
@@ -1677,43 +1823,61 @@ async def check_food_safety(check_data: FoodSafetyCheckCreate, current_user: Use
     if not baby:
         raise HTTPException(status_code=404, detail="Baby not found")
     
-    try:
-        chat = LlmChat(
-            api_key=os.environ.get('EMERGENT_LLM_KEY'),
-            session_id=f"safety_check_{current_user.id}",
-            system_message="You are a pediatric nutrition safety expert. Provide clear yes/no safety assessments for specific foods at specific ages, following AAP guidelines. Be conservative and prioritize safety."
-        ).with_model("openai", "gpt-5")
-        
-        question = f"Is {check_data.food_item} safe for a {check_data.age_months} month old baby? Provide a brief safety assessment."
-        user_message = UserMessage(text=question)
-        response = await chat.send_message(user_message)
-        
-        is_safe = not any(word in response.lower() for word in ["no", "not safe", "avoid", "too young", "don't"])
-        
-        safety_check_dict = FoodSafetyCheck(
-            user_id=current_user.id,
-            **check_data.dict(),
-            is_safe=is_safe,
-            safety_notes=response
-        ).dict()
-        
-        safety_check_to_store = prepare_for_mongo(safety_check_dict)
-        await db.food_safety_checks.insert_one(safety_check_to_store)
-        
-        return FoodSafetyCheck(**safety_check_dict)
-    except Exception as e:
-        logging.error(f"Safety check error: {str(e)}")
-        safety_check_dict = FoodSafetyCheck(
-            user_id=current_user.id,
-            **check_data.dict(),
-            is_safe=False,
-            safety_notes="Unable to assess safety at this time. Please consult your pediatrician."
-        ).dict()
-        
-        safety_check_to_store = prepare_for_mongo(safety_check_dict)
-        await db.food_safety_checks.insert_one(safety_check_to_store)
-        
-        return FoodSafetyCheck(**safety_check_dict)
+    # Known food/age-band combinations are answered from the verdict table - no LLM round trip
+    known = food_verdicts.get(check_data.food_item, check_data.age_months)
+    if known:
+        verdict, is_safe, notes, source = known["verdict"], known["is_safe"], known["notes"], "verdict_store"
+    else:
+        try:
+            question = (
+                f"Is {check_data.food_item} safe for a {check_data.age_months} month old baby? "
+                "Start your answer with SAFE, SAFE WITH CAUTION or NOT SAFE, then give a brief safety assessment."
+            )
+            
+            async def call_model():
+                # A fresh chat per attempt - hedged attempts must not share a session
+                chat = LlmChat(
+                    api_key=os.environ.get('EMERGENT_LLM_KEY'),
+                    session_id=f"safety_check_{current_user.id}",
+                    system_message="You are a pediatric nutrition safety expert. Provide clear yes/no safety assessments for specific foods at specific ages, following AAP guidelines. Be conservative and prioritize safety."
+                ).with_model("openai", "gpt-5")
+                reply = await chat.send_message(UserMessage(text=question))
+                report_usage(estimate_tokens(question), estimate_tokens(reply))
+                return reply, estimate_tokens(question, reply)
+            
+            notes = await llm_call(
+                "food_safety_check", "gpt-5", check_data.food_item, check_data.age_months, call_model
+            )
+            verdict = parse_verdict(notes)
+            is_safe = verdict in (SAFE, CAUTION)
+            source = "llm"
+            if verdict:
+                # Repeat checks for this food and age band will skip the LLM
+                food_verdicts.put(check_data.food_item, check_data.age_months, verdict, notes)
+        except Exception as e:
+            if isinstance(e, CircuitOpenError):
+                logging.warning(f"Safety check served from fallback: {str(e)}")
+            else:
+                logging.error(f"Safety check error: {str(e)}")
+            # Answer from the food knowledge base when it has a confident match, otherwise the canned text
+            kb_answer = knowledge_base_fallback(f"Is {check_data.food_item} safe for babies?", check_data.age_months)
+            verdict, is_safe = None, False
+            notes = kb_answer or "Unable to assess safety at this time. Please consult your pediatrician."
+            source = "knowledge_base" if kb_answer else "fallback"
+    
+    safety_check_dict = FoodSafetyCheck(
+        user_id=current_user.id,
+        **check_data.dict(),
+        is_safe=is_safe,
+        safety_notes=notes,
+        verdict=verdict,
+        source=source
+    ).dict()
+    
+    safety_check_to_store = prepare_for_mongo(safety_check_dict)
+    await db.food_safety_checks.insert_one(safety_check_to_store)
+    
+    return FoodSafetyCheck(**safety_check_dict)
 
 @api_router.get("/food/safety-history", response_model=List[FoodSafetyCheck])
 async def get_safety_history(baby_id: Optional[str] = None, current_user: User = Depends(get_current_user)):
@@ -1727,15 +1891,25 @@ async def get_safety_history(baby_id: Optional[str] = None, current_user: User =
 # Emergency Training Routes
 @api_router.post("/emergency/training", response_model=EmergencyResponse)
 async def get_emergency_training(query: EmergencyQuery, current_user: User = Depends(get_current_user)):
+    # Known emergency types are answered from the precomputed guides - no LLM round trip
+    guide = emergency_guides.get(query.emergency_type, query.baby_age_months)
+    if guide:
+        return EmergencyResponse(
+            **guide,
+            source="precomputed",
+            guide_version=emergency_guides.version
+        )
+    
     try:
         age_context = ""
         if query.baby_age_months is not None:
             age_context = f"for a {query.baby_age_months} month old baby"
         
-        chat = LlmChat(
-            api_key=os.environ.get('EMERGENT_LLM_KEY'),
-            session_id=f"emergency_{current_user.id}",
-            system_message=f"""You are an emergency training instructor following American Heart Association (AHA) guidelines for infant emergencies.
+        def new_chat():
+            return LlmChat(
+                api_key=os.environ.get('EMERGENT_LLM_KEY'),
+                session_id=f"emergency_{current_user.id}",
+                system_message=f"""You are an emergency training instructor following American Heart Association (AHA) guidelines for infant emergencies.
 
 CRITICAL: This is educational content only. Always emphasize:
 1. This is NOT a substitute for formal CPR/First Aid training
@@ -1750,10 +1924,18 @@ Format responses as:
 - Liability disclaimer
 
 Topic: {query.emergency_type} {age_context}"""
-        ).with_model("openai", "gpt-5")
+            ).with_model("openai", "gpt-5")
+        
+        prompt = f"Provide step-by-step {query.emergency_type} instructions {age_context} following AHA guidelines."
         
-        user_message = UserMessage(text=f"Provide step-by-step {query.emergency_type} instructions {age_context} following AHA guidelines.")
-        response = await chat.send_message(user_message)
+        async def call_model():
+            reply = await new_chat().send_message(UserMessage(text=prompt))
+            report_usage(estimate_tokens(prompt), estimate_tokens(reply))
+            return reply, estimate_tokens(prompt, reply)
+        
+        response = await llm_call(
+            "emergency_training", "gpt-5", query.emergency_type, query.baby_age_months, call_model
+        )
         
         lines = response.split('\n')
         steps = []
@@ -1786,7 +1968,8 @@ Topic: {query.emergency_type} {age_context}"""
             steps=steps,
             important_notes=notes or ["Always call 911 in a real emergency", "This is educational content only"],
             disclaimer=disclaimer,
-            when_to_call_911=call_911 or ["Baby is unconscious", "No response to intervention", "You are unsure about the situation"]
+            when_to_call_911=call_911 or ["Baby is unconscious", "No response to intervention", "You are unsure about the situation"],
+            source="llm"
         )
         
     except Exception as e:
@@ -1824,36 +2007,76 @@ async def get_meal_plans(baby_id: Optional[str] = None, age_months: Optional[int
 # New Simplified Meal Search Route
 @api_router.post("/meals/search", response_model=MealSearchResponse)
 async def search_meals_and_food_safety(search_query: MealSearchQuery, current_user: User = Depends(get_current_user)):
+    try:
+        excluded = parse_allergens(search_query.exclude_allergens)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    started = time.perf_counter()
+    found = meal_index.search(
+        search_query.query, search_query.baby_age_months, search_query.category,
+        search_query.ingredients, search_query.limit, search_query.offset,
+        excluded, search_query.exclude_ingredients,
+    )
+    search_ms = round((time.perf_counter() - started) * 1000, 3)
+    recipes = found["recipes"]
+    response = MealSearchResponse(
+        results=format_recipes(recipes),
+        query=search_query.query,
+        age_months=search_query.baby_age_months,
+        recipes=recipes,
+        total=found["total"],
+        search_ms=search_ms,
+        excluded_allergens=found["excluded_allergens"],
+    )
+    if not recipes:
+        # Not a dish or ingredient we have recipes for - often a food safety question
+        kb_answer = knowledge_base_fallback(search_query.query, search_query.baby_age_months)
+        response.results = kb_answer or (
+            "No matching meal ideas found. Try an ingredient (banana, lentils) or a meal (breakfast, snack)."
+        )
+        response.source = "knowledge_base" if kb_answer else "meal_planner"
+    if not search_query.enrich:
+        return response
+
     try:
         age_context = ""
         if search_query.baby_age_months is not None:
             age_context = f"for a {search_query.baby_age_months} month old baby"
         
-        chat = LlmChat(
-            api_key=os.environ.get('EMERGENT_LLM_KEY'),
-            session_id=f"meal_search_{current_user.id}",
-            system_message="""You are a pediatric nutrition expert. Provide helpful, safe meal ideas and food safety information following AAP guidelines. 
+        prompt = f"{search_query.query} {age_context}"
+        if recipes:
+            prompt += "\nBuild on these recipes from our meal planner: " + ", ".join(recipe["name"] for recipe in recipes)
+        exclusions = allergen_names(excluded) + search_query.exclude_ingredients
+        if exclusions:
+            # Only a request to the model - the recipes above are the ones guaranteed to be filtered
+            prompt += "\nDo not use any of: " + ", ".join(exclusions)
+        
+        async def call_model():
+            # A fresh chat per attempt - hedged attempts must not share a session
+            chat = LlmChat(
+                api_key=os.environ.get('EMERGENT_LLM_KEY'),
+                session_id=f"meal_search_{current_user.id}",
+                system_message="""You are a pediatric nutrition expert. Provide helpful, safe meal ideas and food safety information following AAP guidelines. 
 
 For meal searches: Include age-appropriate recipes with simple preparation steps.
 For food safety questions: Provide clear safety assessments and age recommendations.
 Always be concise and practical."""
-        ).with_model("openai", "gpt-5")
-        
-        user_message = UserMessage(text=f"{search_query.query} {age_context}")
-        response = await chat.send_message(user_message)
+            ).with_model("openai", "gpt-5")
+            reply = await chat.send_message(UserMessage(text=prompt))
+            report_usage(estimate_tokens(prompt), estimate_tokens(reply))
+            return reply, estimate_tokens(prompt, reply)
         
-        return MealSearchResponse(
-            results=response,
-            query=search_query.query,
-            age_months=search_query.baby_age_months
+        response.results = await llm_call(
+            "meals_search", "gpt-5", prompt, search_query.baby_age_months, call_model
         )
+        response.source = "llm"
     except Exception as e:
-        logging.error(f"Meal search error: {str(e)}")
-        return MealSearchResponse(
-            results="Unable to search at this time. Please consult your pediatrician for feeding guidance.",
-            query=search_query.query,
-            age_months=search_query.baby_age_months
-        )
+        # The recipes (or knowledge base answer) found above still go out
+        if isinstance(e, CircuitOpenError):
+            logging.warning(f"Meal search enrichment skipped: {str(e)}")
+        else:
+            logging.error(f"Meal search enrichment error: {str(e)}")
+    return response
 
 # General Research Routes
 @api_router.post("/research", response_model=ResearchResponse)
@@ -2196,6 +2419,111 @@ async def create_deletion_request(request: DeletionRequestModel):
             detail="Failed to submit deletion request. Please try again or contact support."
         )
 
+# Asynchronous LLM Jobs - enqueue an LLM endpoint call and poll for the result
+class JobCreate(BaseModel):
+    endpoint: str  # "ai_chat", "meals_search", "emergency_training", "food_safety_check"
+    payload: Dict[str, Any]
+
+# endpoint name -> (request model, handler)
+LLM_JOB_HANDLERS = {
+    "ai_chat": (ChatRequest, ai_chat),
+    "meals_search": (MealSearchQuery, search_meals_and_food_safety),
+    "emergency_training": (EmergencyQuery, get_emergency_training),
+    "food_safety_check": (FoodSafetyCheckCreate, check_food_safety),
+}
+MAX_JOB_WAIT_SECONDS = 30
+
+@api_router.post("/jobs", status_code=status.HTTP_202_ACCEPTED)
+async def create_llm_job(job_data: JobCreate, current_user: User = Depends(get_current_user)):
+    """Enqueue an LLM request and return a job ID immediately"""
+    handler = LLM_JOB_HANDLERS.get(job_data.endpoint)
+    if not handler:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unsupported endpoint. Choose one of: {', '.join(LLM_JOB_HANDLERS)}"
+        )
+    
+    request_model, handler_fn = handler
+    try:
+        request_data = request_model(**job_data.payload)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e))
+    
+    enqueued_at = time.monotonic()
+    
+    async def run():
+        # LLM metrics count time spent in the job queue as queue wait
+        mark_enqueued(enqueued_at)
+        result = await handler_fn(request_data, current_user=current_user)
+        return jsonable_encoder(result)
+    
+    try:
+        job = llm_jobs.submit(job_data.endpoint, current_user.id, run)
+    except JobQueueFull as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+            headers={"Retry-After": "5"}
+        )
+    
+    return {"job_id": job.id, "status": job.status, "poll_url": f"/api/jobs/{job.id}"}
+
+@api_router.get("/jobs/stats", dependencies=[Depends(require_metrics_access)])
+async def get_llm_job_stats():
+    """Queue depth, outcomes and queue-time percentiles for LLM jobs"""
+    return llm_jobs.stats()
+
+@api_router.get("/jobs/{job_id}")
+async def get_llm_job(job_id: str, wait: float = 0, current_user: User = Depends(get_current_user)):
+    """Poll a job; pass wait=<seconds> to long-poll until it finishes"""
+    job = llm_jobs.get(job_id, current_user.id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found or expired")
+    
+    await llm_jobs.wait(job, min(max(wait, 0), MAX_JOB_WAIT_SECONDS))
+    return job.to_dict()
+
+# LLM response cache statistics
+@api_router.get("/llm/cache/stats", dependencies=[Depends(require_metrics_access)])
+async def get_llm_cache_stats():
+    """Cache hit rates and the LLM seconds/tokens saved, per endpoint"""
+    return llm_cache.stats()
+
+@api_router.get("/ai/chat/routing", dependencies=[Depends(require_metrics_access)])
+async def get_chat_routing_stats():
+    """Knowledge base vs LLM split for /api/ai/chat and its latency/cost impact"""
+    return kb_router.stats()
+
+@api_router.get("/emergency/guides", dependencies=[Depends(require_metrics_access)])
+async def get_emergency_guides_info():
+    """Version and coverage of the precomputed emergency guides"""
+    return emergency_guides.stats()
+
+@api_router.get("/llm/singleflight/stats", dependencies=[Depends(require_metrics_access)])
+async def get_llm_singleflight_stats():
+    """In-flight LLM calls and how many requests were coalesced onto them"""
+    return llm_flights.stats()
+
+@api_router.get("/food/verdicts/stats", dependencies=[Depends(require_metrics_access)])
+async def get_food_verdict_stats():
+    """Size, seeding and hit rate of the food safety verdict table"""
+    return food_verdicts.stats()
+
+@api_router.get("/llm/breakers", dependencies=[Depends(require_metrics_access)])
+async def get_llm_breaker_stats():
+    """Circuit breaker state, window health and state transition counts per model and endpoint"""
+    return llm_breakers.stats()
+
+@api_router.get("/llm/metrics", response_class=PlainTextResponse, dependencies=[Depends(require_metrics_access)])
+async def get_llm_metrics():
+    """Prometheus histograms and counters for LLM latency, tokens, cost and outcomes"""
+    return PlainTextResponse(llm_metrics.prometheus(), media_type="text/plain; version=0.0.4")
+
+@api_router.get("/llm/metrics/summary", dependencies=[Depends(require_metrics_access)])
+async def get_llm_metrics_summary():
+    """Rolling per-endpoint LLM latency and cost summary"""
+    return llm_metrics.summary()
+
 # Health check
 @api_router.get("/health")
 async def health_check():
@@ -2219,6 +2547,43 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+@app.on_event("startup")
+async def init_llm_cache():
+    await llm_cache.ensure_indexes()
+
+@app.on_event("startup")
+async def load_knowledge_base_router():
+    kb_router.load()
+
+@app.on_event("startup")
+async def load_meal_search_index():
+    meal_index.load()
+
+@app.on_event("startup")
+async def warm_emergency_guides():
+    try:
+        emergency_guides.load()
+    except Exception as e:
+        # Unknown guides simply fall back to the LLM path
+        logging.error(f"Failed to load emergency guides: {str(e)}")
+
+@app.on_event("startup")
+async def warm_food_verdicts():
+    # Seeding reads the knowledge base and past checks - don't hold up startup for it
+    app.state.food_verdicts_warmup = asyncio.ensure_future(food_verdicts.warm(history=db.food_safety_checks))
+
+@app.on_event("startup")
+async def start_llm_job_workers():
+    llm_jobs.start()
+
+@app.on_event("shutdown")
+async def stop_llm_job_workers():
+    await llm_jobs.stop()
+
+@app.on_event("shutdown")
+async def flush_food_verdicts():
+    await food_verdicts.flush()
+
 @app.on_event("shutdown")
 async def shutdown_db_client():
     client.close()
\ No newline at end of file
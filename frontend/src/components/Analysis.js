@@ -8,8 +8,35 @@ import PageAd from './ads/PageAd';
 
 const API = process.env.REACT_APP_BACKEND_URL || 'http://localhost:8001';
 
+// Days reachable from the date navigator (today plus 30 back); also covers the 7-day trends
+const SUMMARY_DAYS = 31;
+const SUMMED_FIELDS = ['amount', 'duration', 'left_breast', 'right_breast'];
+const BREASTFEEDING = ['breast', 'breastfeeding'];
+
+// Combine one type's server-side stats across summary days, optionally only for some subtypes
+const combineStats = (days, type, subtypes) => {
+  const total = { count: 0, amount: 0, duration: 0, left_breast: 0, right_breast: 0, first: null, last: null };
+  days.forEach(day => {
+    const typeStats = day?.types?.[type];
+    if (!typeStats) return;
+    const parts = subtypes ? subtypes.map(subtype => typeStats.subtypes[subtype]).filter(Boolean) : [typeStats];
+    parts.forEach(stats => {
+      total.count += stats.count;
+      SUMMED_FIELDS.forEach(field => { total[field] += stats[field]; });
+      if (stats.first && (!total.first || stats.first < total.first)) total.first = stats.first;
+      if (stats.last && (!total.last || stats.last > total.last)) total.last = stats.last;
+    });
+  });
+  return total;
+};
+
+// Summary days, newest last: `offset` days ago, or the last `count` days
+const summaryDay = (summary, offset) => summary?.days?.[summary.days.length - 1 - offset];
+const lastDays = (summary, count) => summary?.days?.slice(-count) || [];
+const dayStats = (summary, offset, type, subtypes) => combineStats([summaryDay(summary, offset)], type, subtypes);
+
 const Analysis = ({ currentBaby }) => {
-  const [activities, setActivities] = useState([]);
+  const [summary, setSummary] = useState(null);
   const [loading, setLoading] = useState(true);
   const [selectedTab, setSelectedTab] = useState('summary');
   const [dayOffset, setDayOffset] = useState(0); // 0 = today, 1 = yesterday, etc.
@@ -21,22 +48,23 @@ const Analysis = ({ currentBaby }) => {
 
   useEffect(() => {
     if (currentBaby) {
-      fetchActivities();
+      fetchSummary();
     }
   }, [currentBaby]);
 
-  const fetchActivities = async () => {
+  const fetchSummary = async () => {
     if (!currentBaby) {
       console.log('❌ Analysis: No current baby');
       return;
     }
 
-    console.log('📊 Analysis: Fetching activities for baby:', currentBaby.id);
+    console.log('📊 Analysis: Fetching summary for baby:', currentBaby.id);
 
     try {
-      // EXACTLY match TrackingPage fetchAllActivities implementation
+      // Per-day totals are aggregated by the server in the device's time zone
       const token = localStorage.getItem('token');
-      const url = `${API}/api/activities?baby_id=${currentBaby.id}`;
+      const tz = Intl.DateTimeFormat().resolvedOptions().timeZone || 'UTC';
+      const url = `${API}/api/activities/summary?baby_id=${currentBaby.id}&days=${SUMMARY_DAYS}&tz=${encodeURIComponent(tz)}`;
       console.log('📡 Analysis: Fetching from:', url);
       
       const response = await androidFetch(url, {
@@ -52,67 +80,23 @@ const Analysis = ({ currentBaby }) => {
       }
       
       const data = await response.json();
-      console.log('✅ Analysis: Received', data.length, 'activities');
-      console.log('📋 Sample activity:', data[0]);
-      
-      // Add display type for consistency with Activity History
-      const activitiesWithDisplayType = data.map(activity => ({
-        ...activity,
-        activity_type: activity.type,
-        display_type: activity.type.charAt(0).toUpperCase() + activity.type.slice(1)
-      }));
-      
-      setActivities(activitiesWithDisplayType);
-      console.log('💾 Analysis: Activities stored in state');
+      console.log('✅ Analysis: Received summary for', data.days.length, 'days');
+      setSummary(data);
     } catch (error) {
-      console.error('❌ Analysis: Failed to fetch all activities:', error);
+      console.error('❌ Analysis: Failed to fetch summary:', error);
     } finally {
       setLoading(false);
     }
   };
 
-  // Get activities for a specific day
-  const getActivitiesForDay = (offset) => {
-    const targetDate = subDays(new Date(), offset);
-    return activities.filter(activity => {
-      const activityDate = parseISO(activity.timestamp);
-      return format(activityDate, 'yyyy-MM-dd') === format(targetDate, 'yyyy-MM-dd');
-    });
-  };
-
-  // Get activities by type with safe date parsing
-  const getActivitiesByType = (type, days = 7) => {
-    const cutoffDate = subDays(new Date(), days);
-    return activities.filter(activity => {
-      if (activity.type !== type) return false;
-      try {
-        const activityDate = new Date(activity.timestamp);
-        return activityDate >= cutoffDate;
-      } catch {
-        return false;
-      }
-    });
-  };
-
-  // Get measurement activities (any activity with weight, height, or head_circumference)
-  const getMeasurementActivities = () => {
-    return activities.filter(activity => 
-      activity.weight || activity.height || activity.head_circumference
-    ).sort((a, b) => new Date(b.timestamp) - new Date(a.timestamp));
-  };
-
   // Calculate time since last activity with safe date parsing
   const getTimeSinceLast = (type) => {
-    const typeActivities = activities.filter(a => a.type === type);
-    if (typeActivities.length === 0) return 'No data';
-    
-    const latest = typeActivities.sort((a, b) => 
-      new Date(b.timestamp) - new Date(a.timestamp)
-    )[0];
+    const latest = summary?.last?.[type];
+    if (!latest) return 'No data';
     
     try {
       const now = new Date();
-      const lastTime = new Date(latest.timestamp);
+      const lastTime = new Date(latest);
       const hours = differenceInHours(now, lastTime);
       const minutes = differenceInMinutes(now, lastTime) % 60;
       const days = differenceInDays(now, lastTime);
@@ -240,7 +224,7 @@ const Analysis = ({ currentBaby }) => {
           {/* Summary Tab */}
           <TabsContent value="summary">
             <SummaryView 
-              activities={activities}
+              summary={summary}
               currentBaby={currentBaby}
               getTimeSinceLast={getTimeSinceLast}
               dayOffset={dayOffset}
@@ -251,7 +235,7 @@ const Analysis = ({ currentBaby }) => {
           {/* Bottle Tab */}
           <TabsContent value="bottle">
             <BottleView 
-              activities={getActivitiesByType('feeding')}
+              summary={summary}
               currentBaby={currentBaby}
               getTimeSinceLast={getTimeSinceLast}
               dayOffset={dayOffset}
@@ -262,7 +246,7 @@ const Analysis = ({ currentBaby }) => {
           {/* Express (Pumping + Breastfeeding) Tab */}
           <TabsContent value="express">
             <ExpressView 
-              activities={activities}
+              summary={summary}
               currentBaby={currentBaby}
               getTimeSinceLast={getTimeSinceLast}
               dayOffset={dayOffset}
@@ -273,7 +257,7 @@ const Analysis = ({ currentBaby }) => {
           {/* Diaper Tab */}
           <TabsContent value="diaper">
             <DiaperView 
-              activities={getActivitiesByType('diaper')}
+              summary={summary}
               currentBaby={currentBaby}
               getTimeSinceLast={getTimeSinceLast}
               dayOffset={dayOffset}
@@ -284,7 +268,7 @@ const Analysis = ({ currentBaby }) => {
           {/* Growth Tab */}
           <TabsContent value="growth">
             <GrowthView 
-              activities={getMeasurementActivities()}
+              measurement={summary?.latest_measurement}
               currentBaby={currentBaby}
               calculatePercentile={calculatePercentile}
             />
@@ -296,17 +280,12 @@ const Analysis = ({ currentBaby }) => {
 };
 
 // Summary View Component
-const SummaryView = ({ activities, currentBaby, getTimeSinceLast, dayOffset, setDayOffset }) => {
+const SummaryView = ({ summary, currentBaby, getTimeSinceLast, dayOffset, setDayOffset }) => {
   const today = subDays(new Date(), dayOffset);
-  const todayActivities = activities.filter(a => 
-    format(parseISO(a.timestamp), 'yyyy-MM-dd') === format(today, 'yyyy-MM-dd')
-  );
 
-  const feedingCount = todayActivities.filter(a => a.type === 'feeding').length;
-  const diaperCount = todayActivities.filter(a => a.type === 'diaper').length;
-  const sleepTotal = todayActivities
-    .filter(a => a.type === 'sleep')
-    .reduce((sum, a) => sum + (a.duration || 0), 0);
+  const feedingCount = dayStats(summary, dayOffset, 'feeding').count;
+  const diaperCount = dayStats(summary, dayOffset, 'diaper').count;
+  const sleepTotal = dayStats(summary, dayOffset, 'sleep').duration;
 
   return (
     <div className="space-y-6">
@@ -377,15 +356,12 @@ const SummaryView = ({ activities, currentBaby, getTimeSinceLast, dayOffset, set
 };
 
 // Bottle View Component
-const BottleView = ({ activities, currentBaby, getTimeSinceLast, dayOffset, setDayOffset }) => {
-  const bottleFeeds = activities.filter(a => a.feeding_type === 'bottle');
+const BottleView = ({ summary, currentBaby, getTimeSinceLast, dayOffset, setDayOffset }) => {
   const today = subDays(new Date(), dayOffset);
-  const todayFeeds = bottleFeeds.filter(a => 
-    format(parseISO(a.timestamp), 'yyyy-MM-dd') === format(today, 'yyyy-MM-dd')
-  );
+  const todayFeeds = dayStats(summary, dayOffset, 'feeding', ['bottle']);
 
-  const totalAmount = todayFeeds.reduce((sum, a) => sum + (parseFloat(a.amount) || 0), 0);
-  const avgAmount = todayFeeds.length > 0 ? (totalAmount / todayFeeds.length).toFixed(1) : 0;
+  const totalAmount = todayFeeds.amount;
+  const avgAmount = todayFeeds.count > 0 ? (totalAmount / todayFeeds.count).toFixed(1) : 0;
 
   return (
     <div className="space-y-6">
@@ -432,7 +408,7 @@ const BottleView = ({ activities, currentBaby, getTimeSinceLast, dayOffset, setD
           </div>
           <div className="flex justify-between">
             <span className="text-gray-600 dark:text-gray-300">Number of feeds</span>
-            <span className="font-semibold text-orange-600">{todayFeeds.length}</span>
+            <span className="font-semibold text-orange-600">{todayFeeds.count}</span>
           </div>
           <div className="flex justify-between">
             <span className="text-gray-600 dark:text-gray-300">Time since last feed</span>
@@ -451,45 +427,15 @@ const BottleView = ({ activities, currentBaby, getTimeSinceLast, dayOffset, setD
             <p className="text-sm font-semibold mb-2">7 DAY AVERAGE</p>
             <div className="space-y-2 text-sm">
               {(() => {
-                // Calculate 7-day averages
-                const last7Days = [...Array(7)].map((_, i) => subDays(new Date(), i));
-                const feedsByDay = last7Days.map(day => {
-                  const dayFeeds = bottleFeeds.filter(a => {
-                    try {
-                      return format(new Date(a.timestamp), 'yyyy-MM-dd') === format(day, 'yyyy-MM-dd');
-                    } catch {
-                      return false;
-                    }
-                  });
-                  return {
-                    count: dayFeeds.length,
-                    totalOz: dayFeeds.reduce((sum, a) => sum + (parseFloat(a.amount) || 0), 0)
-                  };
-                });
-                
-                const avgDailyFeeds = (feedsByDay.reduce((sum, day) => sum + day.count, 0) / 7).toFixed(1);
-                const avgDailyOz = (feedsByDay.reduce((sum, day) => sum + day.totalOz, 0) / 7).toFixed(1);
-                
-                // Calculate avg time between feeds (in hours)
-                const allFeedTimes = bottleFeeds
-                  .filter(a => {
-                    try {
-                      const feedDate = new Date(a.timestamp);
-                      return feedDate >= subDays(new Date(), 7);
-                    } catch {
-                      return false;
-                    }
-                  })
-                  .map(a => new Date(a.timestamp).getTime())
-                  .sort((a, b) => a - b);
+                // 7-day averages from the last 7 summary days
+                const week = combineStats(lastDays(summary, 7), 'feeding', ['bottle']);
+                const avgDailyFeeds = (week.count / 7).toFixed(1);
+                const avgDailyOz = (week.amount / 7).toFixed(1);
                 
+                // Avg time between feeds: the mean of consecutive gaps is the first-to-last span over the gaps
                 let avgTimeBetween = '-';
-                if (allFeedTimes.length > 1) {
-                  const intervals = [];
-                  for (let i = 1; i < allFeedTimes.length; i++) {
-                    intervals.push(allFeedTimes[i] - allFeedTimes[i - 1]);
-                  }
-                  const avgMs = intervals.reduce((sum, interval) => sum + interval, 0) / intervals.length;
+                if (week.count > 1) {
+                  const avgMs = (new Date(week.last) - new Date(week.first)) / (week.count - 1);
                   const avgHours = Math.floor(avgMs / (1000 * 60 * 60));
                   const avgMinutes = Math.round((avgMs % (1000 * 60 * 60)) / (1000 * 60));
                   avgTimeBetween = avgHours > 0 ? `${avgHours}h ${avgMinutes}m` : `${avgMinutes}m`;
@@ -521,71 +467,30 @@ const BottleView = ({ activities, currentBaby, getTimeSinceLast, dayOffset, setD
 };
 
 // Express (Pumping + Breastfeeding) View Component
-const ExpressView = ({ activities, currentBaby, getTimeSinceLast, dayOffset, setDayOffset }) => {
+const ExpressView = ({ summary, currentBaby, getTimeSinceLast, dayOffset, setDayOffset }) => {
   const today = subDays(new Date(), dayOffset);
   
-  // Filter for pumping and breastfeeding
-  const pumpingActivities = activities.filter(a => a.type === 'pumping');
-  const breastfeedingActivities = activities.filter(a => 
-    a.type === 'feeding' && (a.feeding_type === 'breast' || a.feeding_type === 'breastfeeding')
-  );
-  
-  // Today's pumping
-  const todayPumping = pumpingActivities.filter(a => {
-    try {
-      return format(new Date(a.timestamp), 'yyyy-MM-dd') === format(today, 'yyyy-MM-dd');
-    } catch {
-      return false;
-    }
-  });
-  
-  // Today's breastfeeding
-  const todayBreastfeeding = breastfeedingActivities.filter(a => {
-    try {
-      return format(new Date(a.timestamp), 'yyyy-MM-dd') === format(today, 'yyyy-MM-dd');
-    } catch {
-      return false;
-    }
-  });
-
-  const totalPumpAmount = todayPumping.reduce((sum, a) => sum + (parseFloat(a.amount) || 0), 0);
-  const totalLeftBreast = todayPumping.reduce((sum, a) => sum + (parseFloat(a.left_breast) || 0), 0);
-  const totalRightBreast = todayPumping.reduce((sum, a) => sum + (parseFloat(a.right_breast) || 0), 0);
-  const avgPumpAmount = todayPumping.length > 0 ? (totalPumpAmount / todayPumping.length).toFixed(1) : 0;
-  const totalBreastDuration = todayBreastfeeding.reduce((sum, a) => sum + (parseInt(a.duration) || 0), 0);
+  // Today's pumping and breastfeeding
+  const todayPumping = dayStats(summary, dayOffset, 'pumping');
+  const todayBreastfeeding = dayStats(summary, dayOffset, 'feeding', BREASTFEEDING);
+
+  const totalPumpAmount = todayPumping.amount;
+  const totalLeftBreast = todayPumping.left_breast;
+  const totalRightBreast = todayPumping.right_breast;
+  const avgPumpAmount = todayPumping.count > 0 ? (totalPumpAmount / todayPumping.count).toFixed(1) : 0;
+  const totalBreastDuration = todayBreastfeeding.duration;
   
   // 7-day averages
-  const last7DaysPumping = pumpingActivities.filter(a => {
-    try {
-      const date = new Date(a.timestamp);
-      return date >= subDays(new Date(), 7);
-    } catch {
-      return false;
-    }
-  });
-  
-  const last7DaysBreastfeeding = breastfeedingActivities.filter(a => {
-    try {
-      const date = new Date(a.timestamp);
-      return date >= subDays(new Date(), 7);
-    } catch {
-      return false;
-    }
-  });
+  const last7DaysPumping = combineStats(lastDays(summary, 7), 'pumping');
+  const last7DaysBreastfeeding = combineStats(lastDays(summary, 7), 'feeding', BREASTFEEDING);
   
-  const avg7DayPumping = last7DaysPumping.length > 0 ? (last7DaysPumping.length / 7).toFixed(1) : 0;
-  const avg7DayBreastfeeding = last7DaysBreastfeeding.length > 0 ? (last7DaysBreastfeeding.length / 7).toFixed(1) : 0;
+  const avg7DayPumping = last7DaysPumping.count > 0 ? (last7DaysPumping.count / 7).toFixed(1) : 0;
+  const avg7DayBreastfeeding = last7DaysBreastfeeding.count > 0 ? (last7DaysBreastfeeding.count / 7).toFixed(1) : 0;
   
   // 7-day totals for left/right breast
-  const avg7DayLeftBreast = last7DaysPumping.length > 0 
-    ? (last7DaysPumping.reduce((sum, a) => sum + (parseFloat(a.left_breast) || 0), 0) / 7).toFixed(1) 
-    : '0';
-  const avg7DayRightBreast = last7DaysPumping.length > 0 
-    ? (last7DaysPumping.reduce((sum, a) => sum + (parseFloat(a.right_breast) || 0), 0) / 7).toFixed(1) 
-    : '0';
-  const avg7DayTotalOz = last7DaysPumping.length > 0 
-    ? (last7DaysPumping.reduce((sum, a) => sum + (parseFloat(a.amount) || 0), 0) / 7).toFixed(1) 
-    : '0';
+  const avg7DayLeftBreast = (last7DaysPumping.left_breast / 7).toFixed(1);
+  const avg7DayRightBreast = (last7DaysPumping.right_breast / 7).toFixed(1);
+  const avg7DayTotalOz = (last7DaysPumping.amount / 7).toFixed(1);
 
   return (
     <div className="space-y-6">
@@ -640,7 +545,7 @@ const ExpressView = ({ activities, currentBaby, getTimeSinceLast, dayOffset, set
           </div>
           <div className="flex justify-between">
             <span className="text-gray-600 dark:text-gray-300">Number of sessions</span>
-            <span className="font-semibold text-orange-600">{todayPumping.length}</span>
+            <span className="font-semibold text-orange-600">{todayPumping.count}</span>
           </div>
           <div className="flex justify-between">
             <span className="text-gray-600 dark:text-gray-300">Time since last pumped</span>
@@ -661,12 +566,12 @@ const ExpressView = ({ activities, currentBaby, getTimeSinceLast, dayOffset, set
           </div>
           <div className="flex justify-between">
             <span className="text-gray-600 dark:text-gray-300">Number of sessions</span>
-            <span className="font-semibold text-pink-600">{todayBreastfeeding.length}</span>
+            <span className="font-semibold text-pink-600">{todayBreastfeeding.count}</span>
           </div>
           <div className="flex justify-between">
             <span className="text-gray-600 dark:text-gray-300">Avg. duration per session</span>
             <span className="font-semibold text-pink-600">
-              {todayBreastfeeding.length > 0 ? Math.round(totalBreastDuration / todayBreastfeeding.length) : 0} min
+              {todayBreastfeeding.count > 0 ? Math.round(totalBreastDuration / todayBreastfeeding.count) : 0} min
             </span>
           </div>
         </CardContent>
@@ -715,19 +620,13 @@ const ExpressView = ({ activities, currentBaby, getTimeSinceLast, dayOffset, set
 };
 
 // Diaper View Component
-const DiaperView = ({ activities, currentBaby, getTimeSinceLast, dayOffset, setDayOffset }) => {
+const DiaperView = ({ summary, currentBaby, getTimeSinceLast, dayOffset, setDayOffset }) => {
   const today = subDays(new Date(), dayOffset);
-  const todayDiapers = activities.filter(a => {
-    try {
-      return format(new Date(a.timestamp), 'yyyy-MM-dd') === format(today, 'yyyy-MM-dd');
-    } catch {
-      return false;
-    }
-  });
+  const todayDiapers = dayStats(summary, dayOffset, 'diaper');
 
-  const wetCount = todayDiapers.filter(a => a.diaper_type === 'wet').length;
-  const dirtyCount = todayDiapers.filter(a => a.diaper_type === 'dirty').length;
-  const mixedCount = todayDiapers.filter(a => a.diaper_type === 'mixed').length;
+  const wetCount = dayStats(summary, dayOffset, 'diaper', ['wet']).count;
+  const dirtyCount = dayStats(summary, dayOffset, 'diaper', ['dirty']).count;
+  const mixedCount = dayStats(summary, dayOffset, 'diaper', ['mixed']).count;
 
   return (
     <div className="space-y-6">
@@ -766,7 +665,7 @@ const DiaperView = ({ activities, currentBaby, getTimeSinceLast, dayOffset, setD
         <CardContent className="space-y-3">
           <div className="flex justify-between">
             <span className="text-gray-600 dark:text-gray-300">Total number of diapers</span>
-            <span className="font-semibold text-blue-600">{todayDiapers.length}</span>
+            <span className="font-semibold text-blue-600">{todayDiapers.count}</span>
           </div>
           <div className="flex justify-between">
             <span className="text-gray-600 dark:text-gray-300">Number of wet diapers</span>
@@ -803,20 +702,12 @@ const DiaperView = ({ activities, currentBaby, getTimeSinceLast, dayOffset, setD
         </CardHeader>
         <CardContent>
           <div className="space-y-4">
-            {[...Array(7)].map((_, index) => {
-              const dayDate = subDays(new Date(), 6 - index);
-              const dayDiapers = activities.filter(a => {
-                try {
-                  return format(new Date(a.timestamp), 'yyyy-MM-dd') === format(dayDate, 'yyyy-MM-dd');
-                } catch {
-                  return false;
-                }
-              });
-              
-              const dayWet = dayDiapers.filter(a => a.diaper_type === 'wet').length;
-              const dayDirty = dayDiapers.filter(a => a.diaper_type === 'dirty').length;
-              const dayMixed = dayDiapers.filter(a => a.diaper_type === 'mixed').length;
-              const totalCount = dayDiapers.length;
+            {lastDays(summary, 7).map((day, index) => {
+              const dayDate = parseISO(day.date);
+              const dayWet = combineStats([day], 'diaper', ['wet']).count;
+              const dayDirty = combineStats([day], 'diaper', ['dirty']).count;
+              const dayMixed = combineStats([day], 'diaper', ['mixed']).count;
+              const totalCount = combineStats([day], 'diaper').count;
               
               return (
                 <div key={index} className="border-b border-gray-200 pb-3 last:border-0">
@@ -842,9 +733,8 @@ const DiaperView = ({ activities, currentBaby, getTimeSinceLast, dayOffset, setD
 };
 
 // Growth View Component
-const GrowthView = ({ activities, currentBaby, calculatePercentile }) => {
-  const measurements = activities.filter(a => a.weight || a.height || a.head_circumference);
-  const latestMeasurement = measurements.length > 0 ? measurements[0] : null;
+const GrowthView = ({ measurement, currentBaby, calculatePercentile }) => {
+  const latestMeasurement = measurement || null;
 
   // Calculate baby age in months
   const ageMonths = currentBaby.birth_date 
@@ -34,6 +34,9 @@ import { toast } from 'sonner';
 import { format, formatDistanceToNow } from 'date-fns';
 import PageAd from './ads/PageAd';
 
+// Activity types shown in the tabs and widgets; tab ids are plural for measurements and milestones
+const RECENT_TYPES = 'feeding,diaper,sleep,pumping,measurement,milestone';
+
 const TrackingPage = ({ currentBaby }) => {
   // PHASE 2: Cloud-first - Always use backend API
   const API = process.env.REACT_APP_BACKEND_URL;
@@ -63,9 +66,8 @@ const TrackingPage = ({ currentBaby }) => {
       fetchRecentActivities();
       fetchReminders();
       fetchAllActivities();
-      fetchRecentFeeding(); // Fetch feeding activities for "Recent Feeding" widget
     }
-  }, [currentBaby, activeTab]);
+  }, [currentBaby]);
 
   useEffect(() => {
     // Request notification permission
@@ -83,13 +85,14 @@ const TrackingPage = ({ currentBaby }) => {
     return () => clearInterval(reminderInterval);
   }, [reminders]);
 
+  // Newest 5 of every activity type in one request: feeds the tabs and the "Recent Feeding" widget
   const fetchRecentActivities = async () => {
     if (!currentBaby) return;
     
     try {
       // PHASE 2: Fetch from backend API
       const token = localStorage.getItem('token');
-      const response = await androidFetch(`${API}/api/activities?baby_id=${currentBaby.id}&type=${activeTab}&limit=5`, {
+      const response = await androidFetch(`${API}/api/activities/latest?baby_id=${currentBaby.id}&types=${RECENT_TYPES}&per_type=5`, {
         method: 'GET',
         headers: {
           'Authorization': `Bearer ${token}`,
@@ -102,10 +105,7 @@ const TrackingPage = ({ currentBaby }) => {
       }
       
       const data = await response.json();
-      setRecentActivities(prev => ({
-        ...prev,
-        [activeTab]: data
-      }));
+      setRecentActivities(data);
     } catch (error) {
       console.error('Failed to fetch recent activities:', error);
     }
@@ -144,49 +144,6 @@ const TrackingPage = ({ currentBaby }) => {
     }
   };
 
-  // Dedicated function to fetch feeding activities for "Recent Feeding" widget
-  const fetchRecentFeeding = async () => {
-    if (!currentBaby) {
-      console.log('❌ fetchRecentFeeding: No current baby');
-      return;
-    }
-
-    console.log('🔄 Fetching recent feeding for baby:', currentBaby.id);
-    
-    try {
-      const token = localStorage.getItem('token');
-      const url = `${API}/api/activities?baby_id=${currentBaby.id}&type=feeding&limit=5`;
-      console.log('📡 Fetching from:', url);
-      
-      const response = await androidFetch(url, {
-        method: 'GET',
-        headers: {
-          'Authorization': `Bearer ${token}`,
-          'Content-Type': 'application/json'
-        }
-      });
-      
-      if (!response.ok) {
-        throw new Error(`HTTP ${response.status}`);
-      }
-      
-      const data = await response.json();
-      console.log('✅ Recent feeding data received:', data.length, 'activities');
-      console.log('Sample:', data[0]);
-      
-      setRecentActivities(prev => {
-        const updated = {
-          ...prev,
-          feeding: data
-        };
-        console.log('📊 Updated recentActivities.feeding:', updated.feeding.length);
-        return updated;
-      });
-    } catch (error) {
-      console.error('❌ Failed to fetch recent feeding:', error);
-    }
-  };
-
   const fetchReminders = async () => {
     if (!currentBaby) return;
     
@@ -463,7 +420,6 @@ const TrackingPage = ({ currentBaby }) => {
       
       fetchRecentActivities();
       fetchAllActivities(); // Refresh comprehensive activity list
-      fetchRecentFeeding(); // Refresh Recent Feeding widget
       
       // Reset active timers if completing a timer-based action
       if (data.isCompleting) {
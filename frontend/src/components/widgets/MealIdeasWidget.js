@@ -9,6 +9,8 @@ const MealIdeasWidget = ({ widget, currentBaby, isEditing, onRemove, onSettings
   const navigate = useNavigate();
   const [mealIdea, setMealIdea] = useState(null);
   const [loading, setLoading] = useState(false);
+  // Each refresh pages to the next idea from the meal planner index
+  const [ideaOffset, setIdeaOffset] = useState(0);
 
   const calculateAgeInMonths = (birthDate) => {
     if (!birthDate) return 6;
@@ -19,7 +21,7 @@ const MealIdeasWidget = ({ widget, currentBaby, isEditing, onRemove, onSettings
     return Math.floor(diffDays / 30);
   };
 
-  const getMealIdea = async () => {
+  const getMealIdea = async (category = null) => {
     if (!currentBaby) return;
     
     setLoading(true);
@@ -27,10 +29,14 @@ const MealIdeasWidget = ({ widget, currentBaby, isEditing, onRemove, onSettings
       const ageInMonths = calculateAgeInMonths(currentBaby.birth_date);
       const response = await axios.post('/meals/search', {
         query: `meal ideas for ${ageInMonths} month old baby`,
-        baby_age_months: ageInMonths
+        baby_age_months: ageInMonths,
+        category,
+        limit: 1,
+        offset: ideaOffset
       });
       
       setMealIdea(response.data.results);
+      setIdeaOffset(response.data.total ? (ideaOffset + 1) % response.data.total : 0);
     } catch (error) {
       console.error('Error getting meal idea:', error);
     } finally {
@@ -62,7 +68,7 @@ const MealIdeasWidget = ({ widget, currentBaby, isEditing, onRemove, onSettings
               </span>
             </div>
             <Button
-              onClick={getMealIdea}
+              onClick={() => getMealIdea()}
               size="sm"
               variant="ghost"
               disabled={loading || isEditing}
@@ -92,6 +98,7 @@ const MealIdeasWidget = ({ widget, currentBaby, isEditing, onRemove, onSettings
               {quickMealTypes.map((meal) => (
                 <Button
                   key={meal.name}
+                  onClick={() => getMealIdea(meal.name)}
                   variant="outline"
                   size="sm"
                   disabled={isEditing}
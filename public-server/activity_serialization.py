@@ -0,0 +1,82 @@
+"""
+Activity serialization for GET /api/activities
+Works on raw column tuples from a column-projected query (no ORM objects or
+identity map), normalizes timestamps in the same pass and encodes the page
+straight to JSON bytes, skipping FastAPI's jsonable_encoder walk. orjson is
+used when installed; the stdlib encoder produces the same JSON otherwise.
+"""
+import json
+from datetime import datetime, timezone
+from typing import List, Optional, Sequence
+
+from dateutil import parser as date_parser
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def normalize_timestamp(ts) -> Optional[str]:
+    """ISO 8601 with an explicit offset; naive datetimes are UTC, which is how they are stored"""
+    if ts is None:
+        return None
+    if isinstance(ts, datetime):
+        return ts.isoformat() + "+00:00" if ts.tzinfo is None else ts.isoformat()
+    # Legacy rows kept the timestamp as text
+    try:
+        parsed = date_parser.parse(ts)
+    except (ValueError, OverflowError):
+        return ts
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.isoformat()
+
+
+def dumps(value) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def json_engine_options() -> dict:
+    """create_engine() codecs for JSON columns (activities.details) using orjson when installed"""
+    if orjson is None:
+        return {}
+    return {"json_serializer": lambda value: orjson.dumps(value).decode(), "json_deserializer": orjson.loads}
+
+
+def activity_dicts(columns: Sequence[str], rows, omit_nulls: bool = True, detail_fields: Sequence[str] = ()) -> List[dict]:
+    """
+    Activity objects from `rows` (tuples in `columns` order). A "details"
+    column is flattened into the `detail_fields` keys, after the common ones,
+    so objects keep the API field order.
+    """
+    ts_index = columns.index("timestamp")
+    details_index = columns.index("details") if "details" in columns else None
+    names = [name for name in columns if name != "details"]
+    activities = []
+    append = activities.append
+    for row in rows:
+        values = list(row)
+        values[ts_index] = normalize_timestamp(values[ts_index])
+        details = {}
+        if details_index is not None:
+            details = values.pop(details_index) or {}
+        if omit_nulls:
+            activity = {name: value for name, value in zip(names, values) if value is not None}
+            for name in detail_fields:
+                value = details.get(name)
+                if value is not None:
+                    activity[name] = value
+        else:
+            activity = dict(zip(names, values))
+            for name in detail_fields:
+                activity[name] = details.get(name)
+        append(activity)
+    return activities
+
+
+def encode_activities(columns: Sequence[str], rows, omit_nulls: bool = True, detail_fields: Sequence[str] = ()) -> bytes:
+    """JSON array of activity objects, see activity_dicts()"""
+    return dumps(activity_dicts(columns, rows, omit_nulls, detail_fields))
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Benchmark for GET /api/activities serialization
+Compares the previous path (ORM objects, a 19-key dict per row with a
+per-call dateutil import, then FastAPI's jsonable_encoder + JSONResponse
+rendering) with the current one (column tuples encoded by
+activity_serialization.encode_activities). Both read the same rows from a
+throwaway SQLite database, so the numbers include fetch and hydration.
+
+Usage:
+    python activity_serialization_benchmark.py --rows 5000 --repeat 20
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from activity_serialization import encode_activities  # noqa: E402
+from database import ACTIVITY_DETAIL_FIELDS, Activity, Base  # noqa: E402
+
+COMMON = ("id", "type", "baby_id", "user_id", "timestamp", "notes")
+FIELDS = COMMON + ACTIVITY_DETAIL_FIELDS
+
+
+DETAILS = {
+    "feeding": {"feeding_type": "bottle", "amount": 4.0},
+    "diaper": {"diaper_type": "wet"},
+    "sleep": {"duration": 60},
+    "pumping": {"duration": 60, "left_breast": 2.0, "right_breast": 2.5},
+    "measurements": {"weight": 16.2},
+    "milestone": {"title": "Rolled over"},
+}
+
+
+def seed(session, rows: int):
+    kinds = ["feeding", "diaper", "sleep", "pumping", "measurements", "milestone"]
+    start = datetime(2025, 1, 1)
+    for n in range(rows):
+        kind = kinds[n % len(kinds)]
+        session.add(Activity(
+            id=f"act-{n:06d}", type=kind, baby_id="baby", user_id="user",
+            timestamp=start + timedelta(minutes=37 * n), notes="note" if n % 3 == 0 else None,
+            details=DETAILS.get(kind),
+        ))
+    session.commit()
+
+
+def previous_path(session) -> bytes:
+    activities = session.query(Activity).filter(Activity.user_id == "user").order_by(Activity.timestamp.desc()).all()
+
+    def format_timestamp(ts):
+        if ts is None:
+            return None
+        if isinstance(ts, str):
+            try:
+                from dateutil import parser
+                dt = parser.parse(ts)
+                if dt.tzinfo is None:
+                    dt = dt.replace(tzinfo=timezone.utc)
+                return dt.isoformat()
+            except Exception:
+                return ts
+        if ts.tzinfo is None:
+            ts = ts.replace(tzinfo=timezone.utc)
+        return ts.isoformat()
+
+    content = []
+    for a in activities:
+        details = a.details or {}
+        content.append({
+            name: format_timestamp(a.timestamp) if name == "timestamp"
+            else getattr(a, name) if name in COMMON else details.get(name)
+            for name in FIELDS
+        })
+    # What FastAPI does with a returned list before JSONResponse.render
+    return json.dumps(jsonable_encoder(content), ensure_ascii=False, allow_nan=False,
+                      indent=None, separators=(",", ":")).encode()
+
+
+def current_path(session, omit_nulls: bool) -> bytes:
+    columns = COMMON + ("details",)
+    rows = session.query(*[getattr(Activity, name) for name in columns]).filter(Activity.user_id == "user").order_by(
+        Activity.timestamp.desc(), Activity.id.desc()).all()
+    return encode_activities(columns, rows, omit_nulls, ACTIVITY_DETAIL_FIELDS)
+
+
+def timed(Session, fn, repeat: int):
+    samples, size = [], 0
+    for _ in range(repeat):
+        session = Session()  # fresh identity map each time, like a request
+        started = time.perf_counter()
+        size = len(fn(session))
+        samples.append(time.perf_counter() - started)
+        session.close()
+    return statistics.median(samples), size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    engine = create_engine(f"sqlite:///{tempfile.mkdtemp(prefix='babysteps-serialize-')}/bench.db")
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+    with Session() as session:
+        seed(session, args.rows)
+
+    print(f"🏁 Serializing {args.rows} activities, median of {args.repeat} runs")
+    runs = {
+        "previous (ORM + dicts + jsonable_encoder)": lambda s: previous_path(s),
+        "current, all fields (tuples + encoder)": lambda s: current_path(s, omit_nulls=False),
+        "current, nulls omitted": lambda s: current_path(s, omit_nulls=True),
+    }
+    baseline = None
+    for label, fn in runs.items():
+        seconds, size = timed(Session, fn, args.repeat)
+        baseline = baseline or seconds
+        print(f"   {label:42s} {seconds * 1000:8.1f}ms  {args.rows / seconds:10.0f} rows/s  "
+              f"{size / 1024:8.1f} KB  {baseline / seconds:5.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Benchmark for activity storage layouts
+Compares the previous wide activities table (13 sparse type-specific columns,
+mostly NULL) with the current narrow one (common columns plus a JSON details
+payload) on the three access patterns the app has: inserts, per-type scans
+(daily feeding totals for one baby) and timeline reads (latest page and a full
+baby timeline through encode_activities). Each layout gets its own throwaway
+SQLite file with the same indexes, and both run the same queries.
+
+Usage:
+    python activity_storage_benchmark.py --rows 50000 --repeat 10
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import (
+    Column, DateTime, Float, Index, Integer, MetaData, String, Table, Text, create_engine, func, select,
+)
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from activity_serialization import encode_activities, json_engine_options  # noqa: E402
+from database import ACTIVITY_DETAIL_FIELDS, Activity  # noqa: E402
+
+COMMON = ("id", "type", "baby_id", "user_id", "timestamp", "notes")
+KINDS = {
+    "feeding": {"feeding_type": "bottle", "amount": 4.0},
+    "diaper": {"diaper_type": "wet"},
+    "sleep": {"duration": 90},
+    "pumping": {"duration": 20, "left_breast": 2.0, "right_breast": 2.5},
+    "measurements": {"weight": 16.2, "height": 24.5, "head_circumference": 15.1},
+    "milestone": {"title": "Rolled over", "description": "Back to tummy", "category": "motor"},
+}
+BATCH = 1000
+
+# The layout before migration 004
+wide_activities = Table(
+    "activities", MetaData(),
+    Column("id", String, primary_key=True), Column("type", String, nullable=False), Column("notes", Text),
+    Column("baby_id", String, nullable=False), Column("user_id", String, nullable=False),
+    Column("timestamp", DateTime), Column("created_at", DateTime),
+    Column("feeding_type", String), Column("amount", Float), Column("duration", Integer),
+    Column("left_breast", Float), Column("right_breast", Float), Column("diaper_type", String),
+    Column("weight", Float), Column("height", Float), Column("head_circumference", Float),
+    Column("temperature", Float), Column("title", String), Column("description", Text), Column("category", String),
+)
+Index("ix_activities_user_baby_type_ts", wide_activities.c.user_id, wide_activities.c.baby_id,
+      wide_activities.c.type, wide_activities.c.timestamp.desc())
+Index("ix_activities_baby_ts", wide_activities.c.baby_id, wide_activities.c.timestamp.desc())
+
+
+class Layout:
+    def __init__(self, path: str, table: Table, wide: bool):
+        self.path = path
+        self.table = table
+        self.wide = wide
+        self.engine = create_engine(f"sqlite:///{path}", **json_engine_options())
+        table.metadata.create_all(self.engine, tables=[table])
+        self.columns = COMMON + (ACTIVITY_DETAIL_FIELDS if wide else ("details",))
+        self.detail_fields = () if wide else ACTIVITY_DETAIL_FIELDS
+        self.amount = table.c.amount if wide else table.c.details["amount"].as_float()
+
+    def insert(self, records):
+        statement = self.table.insert()
+        for start in range(0, len(records), BATCH):
+            batch = records[start:start + BATCH]
+            if self.wide:
+                batch = [
+                    {**{name: r[name] for name in COMMON}, **{name: r["details"].get(name) for name in ACTIVITY_DETAIL_FIELDS}}
+                    for r in batch
+                ]
+            with self.engine.begin() as connection:
+                connection.execute(statement, batch)
+
+    def feeding_totals(self):
+        """Daily feeding count and volume for one baby, the shape of a per-type dashboard query"""
+        c = self.table.c
+        day = func.date(c.timestamp)
+        query = (
+            select(day, func.count(), func.sum(self.amount))
+            .where(c.user_id == "user-0", c.baby_id == "baby-0", c.type == "feeding")
+            .group_by(day)
+        )
+        with self.engine.connect() as connection:
+            return connection.execute(query).fetchall()
+
+    def timeline(self, limit=None) -> bytes:
+        c = self.table.c
+        query = select(*[c[name] for name in self.columns]).where(c.user_id == "user-0", c.baby_id == "baby-0")
+        query = query.order_by(c.timestamp.desc(), c.id.desc())
+        if limit:
+            query = query.limit(limit)
+        with self.engine.connect() as connection:
+            rows = connection.execute(query).fetchall()
+        return encode_activities(self.columns, rows, True, self.detail_fields)
+
+
+def generate(rows: int, babies: int):
+    start = datetime(2024, 1, 1)
+    names = list(KINDS)
+    for n in range(rows):
+        kind = names[n % len(names)]
+        yield {
+            "id": f"act-{n:07d}", "type": kind, "baby_id": f"baby-{n % babies}", "user_id": f"user-{n % babies}",
+            "timestamp": start + timedelta(minutes=7 * n), "notes": "note" if n % 5 == 0 else None,
+            "details": KINDS[kind],
+        }
+
+
+def timed(fn, repeat: int):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=50000)
+    parser.add_argument("--babies", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="babysteps-storage-")
+    records = list(generate(args.rows, args.babies))
+    layouts = {
+        "wide": Layout(os.path.join(workdir, "wide.db"), wide_activities, wide=True),
+        "narrow": Layout(os.path.join(workdir, "narrow.db"), Activity.__table__, wide=False),
+    }
+
+    print(f"🏁 {args.rows} activities across {args.babies} babies, median of {args.repeat} runs")
+    results = {}
+    for label, layout in layouts.items():
+        started = time.perf_counter()
+        layout.insert(records)
+        results[(label, "insert")] = time.perf_counter() - started
+        results[(label, "feeding totals")] = timed(layout.feeding_totals, args.repeat)
+        results[(label, "latest 50")] = timed(lambda: layout.timeline(limit=50), args.repeat)
+        results[(label, "baby timeline")] = timed(layout.timeline, args.repeat)
+
+    wide, narrow = layouts["wide"], layouts["narrow"]
+    assert wide.feeding_totals() == narrow.feeding_totals()
+    assert wide.timeline() == narrow.timeline()
+
+    print(f"   {'':16s} {'wide':>12s} {'narrow':>12s}")
+    for operation in ("insert", "feeding totals", "latest 50", "baby timeline"):
+        wide_s, narrow_s = results[("wide", operation)], results[("narrow", operation)]
+        print(f"   {operation:16s} {wide_s * 1000:10.1f}ms {narrow_s * 1000:10.1f}ms  {wide_s / narrow_s:5.2f}x")
+    print(f"   {'file size':16s} {os.path.getsize(wide.path) / 1024:10.0f}KB {os.path.getsize(narrow.path) / 1024:10.0f}KB")
+
+
+if __name__ == "__main__":
+    main()
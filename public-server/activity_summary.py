@@ -0,0 +1,118 @@
+"""
+Activity summaries for GET /api/activities/summary
+Per-day totals for the Analysis screen, computed in SQL: one GROUP BY over
+(local day, type, subtype) for the window and one GROUP BY type for the last
+event of each type, so the client no longer downloads the full history.
+Local days are bucketed with a CASE over the UTC instant each day starts at,
+which keeps DST changes inside the window correct on SQLite and Postgres alike.
+"""
+from datetime import date, datetime, time, timedelta, timezone, tzinfo
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import case, func
+from sqlalchemy.orm import Session
+
+from activity_serialization import normalize_timestamp
+from database import ACTIVITY_DETAIL_FIELDS, Activity
+
+# Detail fields summed per group
+SUMMED_FIELDS = ("amount", "duration", "left_breast", "right_breast")
+MAX_SUMMARY_DAYS = 90
+
+
+def day_bounds(days: int, tz: tzinfo, now: Optional[datetime] = None) -> Tuple[List[date], List[datetime]]:
+    """
+    The last `days` local dates (oldest first) and the naive UTC instants they
+    start at, plus the end of today, matching how timestamps are stored
+    """
+    now = now or datetime.now(timezone.utc)
+    today = now.astimezone(tz).date()
+    dates = [today - timedelta(days=offset) for offset in range(days - 1, -1, -1)]
+    bounds = [
+        datetime.combine(day, time.min, tzinfo=tz).astimezone(timezone.utc).replace(tzinfo=None)
+        for day in dates + [today + timedelta(days=1)]
+    ]
+    return dates, bounds
+
+
+def _stats(count, first, last, sums) -> Dict[str, Any]:
+    stats = {"count": count, "first": normalize_timestamp(first), "last": normalize_timestamp(last)}
+    for name, value in zip(SUMMED_FIELDS, sums):
+        stats[name] = round(value or 0, 2)
+    return stats
+
+
+def _merge(total: Dict[str, Any], stats: Dict[str, Any]):
+    total["count"] += stats["count"]
+    total["first"] = min(filter(None, (total["first"], stats["first"])), default=None)
+    total["last"] = max(filter(None, (total["last"], stats["last"])), default=None)
+    for name in SUMMED_FIELDS:
+        total[name] = round(total[name] + stats[name], 2)
+
+
+def summarize_activities(db: Session, user_id: str, baby_id: str, days: int, tz: tzinfo,
+                         now: Optional[datetime] = None) -> Dict[str, Any]:
+    dates, bounds = day_bounds(days, tz, now)
+    details = Activity.details
+
+    # Latest start first so each timestamp lands in the day it falls in
+    day = case(*[(Activity.timestamp >= start, index) for index, start in reversed(list(enumerate(bounds[:-1])))])
+    subtype = func.coalesce(details["feeding_type"].as_string(), details["diaper_type"].as_string())
+    window = (
+        db.query(
+            day.label("day"), Activity.type.label("type"), subtype.label("subtype"),
+            Activity.timestamp.label("ts"), *[details[name].as_float().label(name) for name in SUMMED_FIELDS],
+        )
+        .filter(
+            Activity.user_id == user_id, Activity.baby_id == baby_id,
+            Activity.timestamp >= bounds[0], Activity.timestamp < bounds[-1],
+        )
+        .subquery()
+    )
+    # Grouped from a subquery: Postgres will not match GROUP BY expressions that carry bind parameters
+    rows = (
+        db.query(
+            window.c.day, window.c.type, window.c.subtype,
+            func.count(), func.min(window.c.ts), func.max(window.c.ts),
+            *[func.sum(window.c[name]) for name in SUMMED_FIELDS],
+        )
+        .group_by(window.c.day, window.c.type, window.c.subtype)
+        .all()
+    )
+
+    summary_days = [{"date": day.isoformat(), "types": {}} for day in dates]
+    for index, activity_type, activity_subtype, count, first, last, *sums in rows:
+        stats = _stats(count, first, last, sums)
+        types = summary_days[index]["types"]
+        total = types.setdefault(activity_type, {**_stats(0, None, None, [0] * len(SUMMED_FIELDS)), "subtypes": {}})
+        _merge(total, stats)
+        if activity_subtype:
+            total["subtypes"][activity_subtype] = stats
+
+    last_by_type = (
+        db.query(Activity.type, func.max(Activity.timestamp))
+        .filter(Activity.user_id == user_id, Activity.baby_id == baby_id)
+        .group_by(Activity.type)
+        .all()
+    )
+    measurement = (
+        db.query(Activity.timestamp, Activity.details)
+        .filter(Activity.user_id == user_id, Activity.baby_id == baby_id, Activity.type == "measurement")
+        .order_by(Activity.timestamp.desc())
+        .first()
+    )
+    latest_measurement = None
+    if measurement:
+        latest_measurement = {"timestamp": normalize_timestamp(measurement[0])}
+        latest_measurement.update(
+            (name, value) for name, value in (measurement[1] or {}).items()
+            if name in ACTIVITY_DETAIL_FIELDS and value is not None
+        )
+
+    return {
+        "baby_id": baby_id,
+        "tz": str(tz),
+        "days": summary_days,
+        "last": {activity_type: normalize_timestamp(ts) for activity_type, ts in last_by_type},
+        "latest_measurement": latest_measurement,
+    }
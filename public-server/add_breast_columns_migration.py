@@ -1,6 +1,7 @@
 """
 Migration script to add left_breast and right_breast columns to activities table
 Run this on the Render PostgreSQL database
+Superseded by migrations.py (migration 001), which init_database() applies on startup
 """
 import os
 import sys
@@ -4,55 +4,80 @@ Baby Steps - Public Demo Server
 FastAPI backend with PostgreSQL support for production
 """
 
-from fastapi import FastAPI, HTTPException, Depends, status, Request
+# First import: startup phases are measured from here (see startup_timing.py)
+from startup_timing import startup_timer
+
+from fastapi import FastAPI, HTTPException, Depends, Query, status, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, ValidationError
 from typing import List, Optional, Dict, Any
 import uuid
 import json
+import secrets
+import re
+import base64
 from datetime import datetime, timezone, timedelta
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 from jose import JWTError, jwt
 import os
+import time
 import asyncio
+import logging
 from dotenv import load_dotenv
+from sqlalchemy import and_, func, or_
 from sqlalchemy.orm import Session
+from fastapi.responses import JSONResponse, PlainTextResponse
+from anyio import to_thread
 
 # Load environment variables
 load_dotenv()
 
+# Structured JSON logs through a background queue listener (see structured_logging.py)
+from structured_logging import SLOW_REQUEST_MS, request_id_var, setup_logging
+log_listener = setup_logging()
+logger = logging.getLogger("babysteps")
+access_logger = logging.getLogger("babysteps.access")
+
 # Import database configuration (using aliases to avoid naming conflicts)
 from database import (
-    get_db, init_database, init_demo_data,
+    get_db, init_database, init_demo_data, pool_metrics, ACTIVITY_DETAIL_FIELDS,
     User as DBUser, Baby as DBBaby, Activity as DBActivity, DeletionRequest as DBDeletionRequest
 )
+from llm_metrics import LLMMetrics, estimate_tokens, mark_enqueued
+from activity_serialization import activity_dicts, dumps, encode_activities, normalize_timestamp
+from activity_summary import MAX_SUMMARY_DAYS, summarize_activities
 
-# Try to import AI functionality
-try:
-    from emergentintegrations.llm.chat import LlmChat, UserMessage
-    AI_AVAILABLE = True
-    print("✅ AI integration available")
-except ImportError:
-    AI_AVAILABLE = False
-    print("⚠️ AI integration not available - using fallback responses")
-    # Create mock classes for deployment without emergentintegrations
-    class LlmChat:
-        def __init__(self, *args, **kwargs):
-            pass
-        def with_model(self, *args, **kwargs):
-            return self
-        async def send_message(self, message):
-            return "AI service temporarily unavailable. Please try again later."
-    
-    class UserMessage:
-        def __init__(self, text):
-            self.text = text
+# The AI stack (emergentintegrations -> litellm, openai, Google SDKs) is imported on
+# first use in a worker thread, not here, so a cold start does not pay for it
+from llm_integration import llm_integration_loaded, load_llm_integration
+from kb_router import KnowledgeBaseRouter
+from meal_search import DEFAULT_LIMIT as DEFAULT_MEAL_LIMIT, MealSearchIndex, allergen_names, parse_allergens
+from safety_verdicts import parse_verdict
+
+startup_timer.mark("imports")
 
 # Configuration
 SECRET_KEY = os.getenv("SECRET_KEY", "demo-baby-steps-secret-key-2025")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 480
-EMERGENT_LLM_KEY = os.getenv("EMERGENT_LLM_KEY")
+# Bearer token for metrics scrapers; operational endpoints otherwise need a signed-in user
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+EMERGENT_LLM_KEY = os.getenv("EMERGENT_LLM_KEY") or ("stub" if os.getenv("LLM_STUB_URL") else None)
+
+# Per-call LLM latency, token and cost instrumentation
+llm_metrics = LLMMetrics.from_env()
+
+# Curated food research answers (frontend/public/knowledge-base/food_research.json),
+# indexed at startup; /api/food/research escalates to the LLM only below the threshold
+food_research_router = KnowledgeBaseRouter()
+# Recipe search over meal_planner.json for /api/meals/search, indexed at startup
+meal_index = MealSearchIndex()
+
+# Database endpoints are plain `def` handlers: FastAPI runs them (and get_db) in
+# a worker threadpool so blocking SQLAlchemy calls never stall the event loop.
+# Keep this at or above DB_POOL_SIZE + DB_MAX_OVERFLOW (see db_pool.py).
+DB_THREADPOOL_SIZE = int(os.getenv("DB_THREADPOOL_SIZE", "40"))
 
 # OLD SQLite functions - DEPRECATED - kept for reference only
 # Using new SQLAlchemy functions from database.py instead
@@ -134,15 +159,65 @@ app.add_middleware(
     max_age=3600  # Cache preflight requests for 1 hour
 )
 
-# Request logging middleware for debugging mobile connections
+@app.on_event("startup")
+async def size_db_threadpool():
+    """Size the worker threadpool that runs the sync database handlers"""
+    to_thread.current_default_thread_limiter().total_tokens = DB_THREADPOOL_SIZE
+    logger.info("Database threadpool sized", extra={"workers": DB_THREADPOOL_SIZE})
+
+@app.on_event("startup")
+def load_knowledge_bases():
+    with startup_timer.phase("food_research_index"):
+        food_research_router.load(files={"food_research": "food_research.json"})
+    with startup_timer.phase("meal_search_index"):
+        meal_index.load()
+
+@app.on_event("startup")
+def prepare_database():
+    """Schema and demo data before the first request (not at import time); an up-to-date schema costs one query"""
+    with startup_timer.phase("init_database"):
+        init_database()
+    with startup_timer.phase("init_demo_data"):
+        init_demo_data()
+    logger.info("Startup complete", extra=startup_timer.report())
+
+@app.on_event("startup")
+async def preload_llm_integration():
+    """Import the AI stack in the background once the app is serving"""
+    if EMERGENT_LLM_KEY and os.getenv("LLM_PRELOAD", "true").lower() in ("1", "true", "yes"):
+        asyncio.get_running_loop().create_task(load_llm_integration())
+
+@app.on_event("shutdown")
+async def flush_logs():
+    log_listener.stop()
+
+# Access log: one structured line per request, with a request ID and timing
 @app.middleware("http")
 async def log_requests(request: Request, call_next):
-    print(f"📱 Incoming request: {request.method} {request.url.path}")
-    print(f"   Origin: {request.headers.get('origin', 'none')}")
-    print(f"   User-Agent: {request.headers.get('user-agent', 'unknown')[:100]}")
-    response = await call_next(request)
-    print(f"   Response: {response.status_code}")
-    return response
+    mark_enqueued()  # LLM queue wait is measured from request arrival
+    request_id = request.headers.get("x-request-id") or uuid.uuid4().hex
+    context = request_id_var.set(request_id)
+    started = time.perf_counter()
+    status_code = 500
+    try:
+        response = await call_next(request)
+        status_code = response.status_code
+        response.headers["X-Request-ID"] = request_id
+        return response
+    finally:
+        duration_ms = round((time.perf_counter() - started) * 1000, 1)
+        # Errors and slow requests are WARNING so LOG_SAMPLE_RATE never drops them
+        level = logging.WARNING if status_code >= 500 or duration_ms >= SLOW_REQUEST_MS else logging.INFO
+        access_logger.log(level, f"{request.method} {request.url.path} {status_code}", extra={
+            "method": request.method,
+            "path": request.url.path,
+            "status": status_code,
+            "duration_ms": duration_ms,
+            "client": request.client.host if request.client else None,
+            "origin": request.headers.get("origin"),
+            "user_agent": request.headers.get("user-agent", "")[:100] or None,
+        })
+        request_id_var.reset(context)
 
 # Pydantic Models
 class User(BaseModel):
@@ -212,6 +287,15 @@ class ActivityRequest(BaseModel):
     class Config:
         extra = "allow"  # Allow extra fields without validation errors
 
+class BulkActivityItem(ActivityRequest):
+    # Client-side ID and event time: replayed offline events keep both, and resends are detected by ID
+    id: Optional[str] = None
+    timestamp: Optional[datetime] = None
+
+class BulkActivityRequest(BaseModel):
+    # Validated one by one as BulkActivityItem so a bad event does not reject the whole batch
+    activities: List[Dict[str, Any]]
+
 # Helper functions
 def create_access_token(data: dict):
     to_encode = data.copy()
@@ -220,17 +304,96 @@ def create_access_token(data: dict):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
+class Principal:
+    """Authenticated caller, built from the JWT claims without touching the database"""
+    __slots__ = ("user_id", "email")
+
+    def __init__(self, user_id: Optional[str], email: str):
+        self.user_id = user_id
+        self.email = email
+
+def user_token_claims(user) -> dict:
+    # `uid` is the stable user ID; `sub` stays the email for older clients
+    return {"sub": user.email, "uid": user.id}
+
+def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)) -> Principal:
     try:
         token = credentials.credentials
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         user_email: str = payload.get("sub")
         if user_email is None:
             raise HTTPException(status_code=401, detail="Invalid token")
-        return user_email
+        return Principal(user_id=payload.get("uid"), email=user_email)
     except JWTError:
         raise HTTPException(status_code=401, detail="Invalid token")
 
+def require_metrics_access(credentials: HTTPAuthorizationCredentials = Depends(security)):
+    """Gate for operational stats: the METRICS_TOKEN or a valid user token"""
+    if METRICS_TOKEN and secrets.compare_digest(credentials.credentials, METRICS_TOKEN):
+        return
+    get_current_user(credentials)
+
+def get_current_principal(
+    principal: Principal = Depends(get_current_user),
+    db: Session = Depends(get_db)
+) -> Principal:
+    """Principal with user_id set; tokens issued before the `uid` claim fall back to an email lookup"""
+    if principal.user_id is None:
+        user = db.query(DBUser.id).filter(DBUser.email == principal.email).first()
+        if not user:
+            raise HTTPException(status_code=404, detail="User not found")
+        principal.user_id = user.id
+    return principal
+
+def principal_user_filter(principal: Principal):
+    return DBUser.id == principal.user_id if principal.user_id else DBUser.email == principal.email
+
+def get_active_principal(
+    principal: Principal = Depends(get_current_user),
+    db: Session = Depends(get_db)
+) -> Principal:
+    """Principal for write endpoints: the user must still exist, even when the token carries `uid`.
+    Reads trust the claim until the token expires (ACCESS_TOKEN_EXPIRE_MINUTES); writes pay one indexed lookup."""
+    user = db.query(DBUser.id).filter(principal_user_filter(principal)).first()
+    if not user:
+        raise HTTPException(status_code=401, detail="User no longer exists")
+    principal.user_id = user.id
+    return principal
+
+# Activity fields in response order; GET /api/activities?fields= selects from these.
+# Common fields are columns, the rest live in the Activity.details payload.
+ACTIVITY_COMMON_FIELDS = ("id", "type", "baby_id", "user_id", "timestamp", "notes")
+ACTIVITY_FIELDS = ACTIVITY_COMMON_FIELDS + ACTIVITY_DETAIL_FIELDS
+MAX_LATEST_PER_TYPE = 50
+MAX_ACTIVITY_PAGE = 500
+MAX_BULK_ACTIVITIES = 1000
+BULK_INSERT_ROWS = 500  # rows per multi-row INSERT statement
+
+def encode_activity_cursor(ts, activity_id: str) -> str:
+    """Opaque keyset cursor for the (timestamp, id) position of the last row on a page"""
+    if isinstance(ts, datetime):
+        ts = ts.isoformat()
+    return base64.urlsafe_b64encode(f"{ts}|{activity_id}".encode()).decode().rstrip("=")
+
+def activity_details(request: ActivityRequest) -> Optional[dict]:
+    """Optional fields based on activity type, only the ones that were sent, for Activity.details"""
+    return {
+        name: getattr(request, name, None) for name in ACTIVITY_DETAIL_FIELDS
+        if getattr(request, name, None) is not None
+    } or None
+
+def decode_activity_cursor(cursor: str):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        ts, activity_id = raw.split("|", 1)
+        after = datetime.fromisoformat(ts)
+    except (ValueError, UnicodeDecodeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    # Timestamps are stored as naive UTC
+    if after.tzinfo is not None:
+        after = after.astimezone(timezone.utc).replace(tzinfo=None)
+    return after, activity_id
+
 # OLD SQLite demo data initialization - DEPRECATED
 def init_demo_data_old_sqlite():
     """OLD - Initialize demo data if not exists - DEPRECATED"""
@@ -272,18 +435,10 @@ def init_demo_data_old_sqlite():
     
     conn.close()
 
-# Initialize database and demo data on startup
-# Using new SQLAlchemy-based functions imported from database.py at top of file
-init_database()  # This calls the NEW function from database.py
-init_demo_data()  # This calls the NEW function from database.py
 
 # Root endpoint
 @app.get("/")
-async def root(request: Request):
-    # Log request details for debugging
-    print(f"Request from: {request.client.host if request.client else 'unknown'}")
-    print(f"User-Agent: {request.headers.get('user-agent', 'unknown')}")
-    
+async def root():
     return {
         "message": "Baby Steps Demo API",
         "version": "1.0.0",
@@ -297,40 +452,83 @@ async def root(request: Request):
 
 # Health check
 @app.get("/api/health")
-async def health_check():
-    return {"status": "healthy", "timestamp": datetime.utcnow().isoformat()}
+def health_check():
+    """Readiness: a SELECT 1 round trip through the pool, 503 if the database is unreachable"""
+    timestamp = datetime.utcnow().isoformat()
+    try:
+        round_trip_ms = pool_metrics.round_trip()
+    except Exception as e:
+        logger.error("Health check database round trip failed", extra={"error": str(e)})
+        # The probe is public; driver errors can carry hosts and credentials, so they only go to the log
+        return JSONResponse(status_code=503, content={
+            "status": "unhealthy",
+            "timestamp": timestamp,
+            "database": "unreachable",
+        })
+    return {
+        "status": "healthy",
+        "timestamp": timestamp,
+        "database": {"ok": True, "round_trip_ms": round_trip_ms, "pool": pool_metrics.gauges()},
+    }
+
+# Database pool instrumentation
+@app.get("/api/db/metrics", response_class=PlainTextResponse, dependencies=[Depends(require_metrics_access)])
+def db_metrics_export():
+    """Prometheus gauges, counters and checkout latency for the connection pool"""
+    return PlainTextResponse(pool_metrics.prometheus(), media_type="text/plain; version=0.0.4")
+
+@app.get("/api/db/pool", dependencies=[Depends(require_metrics_access)])
+def db_pool_stats():
+    """Pool occupancy, churn and average checkout wait"""
+    return pool_metrics.stats()
+
+@app.get("/api/startup", dependencies=[Depends(require_metrics_access)])
+async def startup_report():
+    """Cold start breakdown: import, route setup and init phases, plus the background AI import once it has run"""
+    llm = llm_integration_loaded()
+    return {
+        **startup_timer.report(),
+        "llm_integration": {"loaded": llm is not None, "available": llm.available if llm else None,
+                            "load_ms": llm.load_ms if llm else None},
+    }
+
+@app.get("/api/food/research/routing", dependencies=[Depends(require_metrics_access)])
+async def food_research_routing_stats():
+    """Knowledge base vs LLM split for /api/food/research and its latency/cost impact"""
+    return food_research_router.stats()
+
+# LLM instrumentation
+@app.get("/api/llm/metrics", response_class=PlainTextResponse, dependencies=[Depends(require_metrics_access)])
+async def llm_metrics_export():
+    """Prometheus histograms and counters for LLM latency, tokens, cost and outcomes"""
+    return PlainTextResponse(llm_metrics.prometheus(), media_type="text/plain; version=0.0.4")
+
+@app.get("/api/llm/metrics/summary", dependencies=[Depends(require_metrics_access)])
+async def llm_metrics_summary():
+    """Rolling per-endpoint LLM latency and cost summary"""
+    return llm_metrics.summary()
 
 # Authentication endpoints
+# Handlers that use the sync Session are `def`, not `async def` (see DB_THREADPOOL_SIZE)
 @app.post("/api/auth/login")
-async def login(login_data: LoginRequest, http_request: Request, db: Session = Depends(get_db)):
-    # Enhanced logging for debugging mobile connections
-    print(f"Login attempt from: {http_request.client.host if http_request.client else 'unknown'}")
-    print(f"User-Agent: {http_request.headers.get('user-agent', 'unknown')}")
-    print(f"Email: {login_data.email}")
-    
-    # Debug: List all users in database
-    all_users = db.query(DBUser).all()
-    print(f"🔍 DEBUG: Users in database: {[u.email for u in all_users]}")
-    
+def login(login_data: LoginRequest, db: Session = Depends(get_db)):
     # Find user by email
     user = db.query(DBUser).filter(DBUser.email == login_data.email).first()
     
     if not user:
-        print(f"❌ User not found in database: {login_data.email}")
-        print("✅ Using PostgreSQL - user data persists across restarts!")
+        logger.warning("Login failed: unknown email", extra={"email": login_data.email})
         raise HTTPException(status_code=401, detail="Invalid credentials")
     
     if user.password != login_data.password:
-        print(f"❌ Password mismatch for {login_data.email}")
-        print(f"🔍 DEBUG: Stored password length: {len(user.password)}, Provided: {len(login_data.password)}")
+        logger.warning("Login failed: wrong password", extra={"email": login_data.email})
         raise HTTPException(status_code=401, detail="Invalid credentials")
     
-    access_token = create_access_token(data={"sub": login_data.email})
-    print(f"✅ Successful login for {login_data.email}")
+    access_token = create_access_token(data=user_token_claims(user))
+    logger.info("Login succeeded", extra={"user_id": user.id})
     return {"access_token": access_token, "token_type": "bearer"}
 
 @app.post("/api/auth/register") 
-async def register(request: RegisterRequest, db: Session = Depends(get_db)):
+def register(request: RegisterRequest, db: Session = Depends(get_db)):
     try:
         # Check if email already exists
         existing_user = db.query(DBUser).filter(DBUser.email == request.email).first()
@@ -350,8 +548,8 @@ async def register(request: RegisterRequest, db: Session = Depends(get_db)):
         db.commit()
         db.refresh(new_user)
         
-        access_token = create_access_token(data={"sub": request.email})
-        print(f"✅ New user registered: {request.email} (PostgreSQL - persistent!)")
+        access_token = create_access_token(data=user_token_claims(new_user))
+        logger.info("User registered", extra={"user_id": new_user.id})
         
         # Return complete user data with token
         return {
@@ -366,13 +564,13 @@ async def register(request: RegisterRequest, db: Session = Depends(get_db)):
         
     except Exception as e:
         db.rollback()
-        print(f"❌ Registration failed for {request.email}: {e}")
+        logger.error("Registration failed", extra={"email": request.email, "error": str(e)})
         raise HTTPException(status_code=500, detail="Registration failed")
 
 # User endpoints
 @app.get("/api/user/profile")
-async def get_profile(current_user_email: str = Depends(get_current_user), db: Session = Depends(get_db)):
-    user = db.query(DBUser).filter(DBUser.email == current_user_email).first()
+def get_profile(principal: Principal = Depends(get_current_user), db: Session = Depends(get_db)):
+    user = db.query(DBUser).filter(principal_user_filter(principal)).first()
     
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
@@ -384,13 +582,13 @@ async def get_profile(current_user_email: str = Depends(get_current_user), db: S
     )
 
 @app.put("/api/user/profile")
-async def update_profile(
+def update_profile(
     request: UserUpdateRequest, 
-    current_user_email: str = Depends(get_current_user), 
+    principal: Principal = Depends(get_current_user), 
     db: Session = Depends(get_db)
 ):
     """Update user profile including name, email, and password"""
-    user = db.query(DBUser).filter(DBUser.email == current_user_email).first()
+    user = db.query(DBUser).filter(principal_user_filter(principal)).first()
     
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
@@ -442,8 +640,8 @@ async def update_profile(
         }
         
         # If email was changed, generate a new token
-        if request.email and request.email != current_user_email:
-            new_token = create_access_token({"sub": user.email})
+        if request.email and request.email != principal.email:
+            new_token = create_access_token(user_token_claims(user))
             response["token"] = new_token
             response["message"] = "Profile updated successfully. Please use your new email to login."
         
@@ -454,20 +652,15 @@ async def update_profile(
         raise
     except Exception as e:
         db.rollback()
-        print(f"❌ Profile update failed: {e}")
+        logger.error("Profile update failed", extra={"user_id": user.id, "error": str(e)})
         raise HTTPException(status_code=500, detail="Failed to update profile")
 
 
 # Baby endpoints
 @app.get("/api/babies")
-async def get_babies(current_user_email: str = Depends(get_current_user), db: Session = Depends(get_db)):
-    # Get user
-    user = db.query(DBUser).filter(DBUser.email == current_user_email).first()
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-    
+def get_babies(principal: Principal = Depends(get_current_principal), db: Session = Depends(get_db)):
     # Get user's babies
-    babies = db.query(DBBaby).filter(DBBaby.user_id == user.id).all()
+    babies = db.query(DBBaby).filter(DBBaby.user_id == principal.user_id).all()
     
     return [Baby(
         id=baby.id,
@@ -479,12 +672,7 @@ async def get_babies(current_user_email: str = Depends(get_current_user), db: Se
     ) for baby in babies]
 
 @app.post("/api/babies")
-async def create_baby(request: BabyCreateRequest, current_user_email: str = Depends(get_current_user), db: Session = Depends(get_db)):
-    # Get user
-    user = db.query(DBUser).filter(DBUser.email == current_user_email).first()
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-    
+def create_baby(request: BabyCreateRequest, principal: Principal = Depends(get_active_principal), db: Session = Depends(get_db)):
     baby_id = str(uuid.uuid4())
     try:
         new_baby = DBBaby(
@@ -493,14 +681,14 @@ async def create_baby(request: BabyCreateRequest, current_user_email: str = Depe
             birth_date=request.birth_date,
             gender=request.gender,
             profile_image=request.profile_image,
-            user_id=user.id
+            user_id=principal.user_id
         )
         
         db.add(new_baby)
         db.commit()
         db.refresh(new_baby)
         
-        print(f"✅ New baby created: {request.name} (PostgreSQL)")
+        logger.info("Baby created", extra={"user_id": principal.user_id, "baby_id": new_baby.id})
         
         return Baby(
             id=new_baby.id,
@@ -513,24 +701,19 @@ async def create_baby(request: BabyCreateRequest, current_user_email: str = Depe
         
     except Exception as e:
         db.rollback()
-        print(f"❌ Baby creation failed: {e}")
+        logger.error("Baby creation failed", extra={"user_id": principal.user_id, "error": str(e)})
         raise HTTPException(status_code=500, detail=f"Failed to create baby: {str(e)}")
 
 @app.get("/api/babies/{baby_id}")
-async def get_baby(
+def get_baby(
     baby_id: str,
-    current_user_email: str = Depends(get_current_user),
+    principal: Principal = Depends(get_current_principal),
     db: Session = Depends(get_db)
 ):
-    # Get user
-    user = db.query(DBUser).filter(DBUser.email == current_user_email).first()
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-    
     # Get baby
     baby = db.query(DBBaby).filter(
         DBBaby.id == baby_id,
-        DBBaby.user_id == user.id
+        DBBaby.user_id == principal.user_id
     ).first()
     
     if not baby:
@@ -546,21 +729,16 @@ async def get_baby(
     }
 
 @app.put("/api/babies/{baby_id}")
-async def update_baby(
+def update_baby(
     baby_id: str,
     request: BabyCreateRequest,
-    current_user_email: str = Depends(get_current_user),
+    principal: Principal = Depends(get_active_principal),
     db: Session = Depends(get_db)
 ):
-    # Get user
-    user = db.query(DBUser).filter(DBUser.email == current_user_email).first()
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-    
     # Check if baby exists and belongs to user
     baby = db.query(DBBaby).filter(
         DBBaby.id == baby_id,
-        DBBaby.user_id == user.id
+        DBBaby.user_id == principal.user_id
     ).first()
     if not baby:
         raise HTTPException(status_code=404, detail="Baby not found or doesn't belong to user")
@@ -573,7 +751,7 @@ async def update_baby(
     db.commit()
     db.refresh(baby)
     
-    print(f"✅ Baby updated: {baby.name}")
+    logger.info("Baby updated", extra={"user_id": principal.user_id, "baby_id": baby.id})
     return {
         "id": baby.id,
         "name": baby.name,
@@ -585,98 +763,144 @@ async def update_baby(
 
 # Activity endpoints
 @app.get("/api/activities")
-async def get_activities(
+def get_activities(
     baby_id: str = None,
     type: str = None,
-    limit: int = None,
-    current_user_email: str = Depends(get_current_user),
+    limit: Optional[int] = Query(None, ge=1, le=MAX_ACTIVITY_PAGE),
+    cursor: str = None,
+    fields: str = None,
+    omit_nulls: bool = True,
+    principal: Principal = Depends(get_current_principal),
     db: Session = Depends(get_db)
 ):
-    # Get user
-    user = db.query(DBUser).filter(DBUser.email == current_user_email).first()
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
+    """
+    Activities newest first. With `limit`, pages are keyset-paginated on
+    (timestamp, id): pass the X-Next-Cursor response header back as `cursor`.
+    `fields=type,amount` loads only those columns (id and timestamp always
+    come along for the cursor); null fields are left out unless omit_nulls=false.
+    """
+    selected = ACTIVITY_FIELDS
+    if fields:
+        requested = {name.strip() for name in fields.split(",") if name.strip()}
+        unknown = sorted(requested - set(ACTIVITY_FIELDS))
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown activity fields: {', '.join(unknown)}")
+        selected = tuple(name for name in ACTIVITY_FIELDS if name in requested or name in ("id", "timestamp"))
+    columns = [name for name in selected if name in ACTIVITY_COMMON_FIELDS]
+    detail_fields = [name for name in selected if name in ACTIVITY_DETAIL_FIELDS]
+    if detail_fields:
+        columns.append("details")
     
     # Build query
-    query = db.query(DBActivity).filter(DBActivity.user_id == user.id)
+    query = db.query(*(getattr(DBActivity, name) for name in columns)).filter(DBActivity.user_id == principal.user_id)
     
     # Apply filters
     if baby_id:
         query = query.filter(DBActivity.baby_id == baby_id)
     if type:
         query = query.filter(DBActivity.type == type)
+    if cursor:
+        after_ts, after_id = decode_activity_cursor(cursor)
+        query = query.filter(or_(
+            DBActivity.timestamp < after_ts,
+            and_(DBActivity.timestamp == after_ts, DBActivity.id < after_id)
+        ))
     
-    # Order by timestamp desc
-    query = query.order_by(DBActivity.timestamp.desc())
+    # Order by timestamp desc, id breaks ties so pages never skip or repeat rows
+    query = query.order_by(DBActivity.timestamp.desc(), DBActivity.id.desc())
     
-    # Apply limit
+    # Apply limit (one extra row tells us whether there is a next page)
     if limit:
-        query = query.limit(limit)
+        query = query.limit(limit + 1)
     
-    activities = query.all()
+    rows = query.all()
+    headers = {}
+    if limit and len(rows) > limit:
+        rows = rows[:limit]
+        headers["X-Next-Cursor"] = encode_activity_cursor(rows[-1].timestamp, rows[-1].id)
     
-    # Convert to dict
-    def format_timestamp(ts):
-        """Handle both datetime objects and string timestamps, ensure ISO format with timezone"""
-        if ts is None:
-            return None
-        if isinstance(ts, str):
-            # If already a string, try to parse and convert to ISO format
-            try:
-                from dateutil import parser
-                dt = parser.parse(ts)
-                # If no timezone info, assume UTC
-                if dt.tzinfo is None:
-                    dt = dt.replace(tzinfo=timezone.utc)
-                return dt.isoformat()
-            except:
-                return ts  # Return as-is if parsing fails
-        # If datetime object
-        # Ensure it has timezone info (assume UTC if not)
-        if ts.tzinfo is None:
-            ts = ts.replace(tzinfo=timezone.utc)
-        return ts.isoformat()  # Convert datetime to ISO format
+    # Column tuples straight to JSON bytes (see activity_serialization.py)
+    return Response(
+        content=encode_activities(columns, rows, omit_nulls, detail_fields),
+        media_type="application/json",
+        headers=headers
+    )
+
+@app.get("/api/activities/latest")
+def get_latest_activities(
+    baby_id: str,
+    types: str = None,
+    per_type: int = 5,
+    omit_nulls: bool = True,
+    principal: Principal = Depends(get_current_principal),
+    db: Session = Depends(get_db)
+):
+    """
+    The newest `per_type` activities of each type (comma-separated `types`,
+    default all) as {type: [activity, ...]}, newest first, from one
+    ROW_NUMBER() OVER (PARTITION BY type ...) query. ix_activities_user_baby_type_ts
+    already orders the baby's rows by type and timestamp, so there is no sort.
+    """
+    if not 1 <= per_type <= MAX_LATEST_PER_TYPE:
+        raise HTTPException(status_code=400, detail=f"per_type must be between 1 and {MAX_LATEST_PER_TYPE}")
+    requested = [name.strip() for name in types.split(",") if name.strip()] if types else []
     
-    return [
-        {
-            "id": a.id,
-            "type": a.type,
-            "baby_id": a.baby_id,
-            "user_id": a.user_id,
-            "timestamp": format_timestamp(a.timestamp),
-            "notes": a.notes,
-            "feeding_type": a.feeding_type,
-            "amount": a.amount,
-            "duration": a.duration,
-            "left_breast": a.left_breast,
-            "right_breast": a.right_breast,
-            "diaper_type": a.diaper_type,
-            "weight": a.weight,
-            "height": a.height,
-            "head_circumference": a.head_circumference,
-            "temperature": a.temperature,
-            "title": a.title,
-            "description": a.description,
-            "category": a.category
-        }
-        for a in activities
-    ]
+    columns = ACTIVITY_COMMON_FIELDS + ("details",)
+    rank = func.row_number().over(
+        partition_by=DBActivity.type,
+        order_by=(DBActivity.timestamp.desc(), DBActivity.id.desc())
+    ).label("rank")
+    ranked = db.query(*(getattr(DBActivity, name) for name in columns), rank).filter(
+        DBActivity.user_id == principal.user_id,
+        DBActivity.baby_id == baby_id
+    )
+    if requested:
+        ranked = ranked.filter(DBActivity.type.in_(requested))
+    ranked = ranked.subquery()
+    rows = (
+        db.query(*(ranked.c[name] for name in columns))
+        .filter(ranked.c.rank <= per_type)
+        .order_by(ranked.c.type, ranked.c.timestamp.desc(), ranked.c.id.desc())
+        .all()
+    )
+    
+    latest = {name: [] for name in requested}
+    for activity in activity_dicts(columns, rows, omit_nulls, ACTIVITY_DETAIL_FIELDS):
+        latest.setdefault(activity["type"], []).append(activity)
+    return Response(content=dumps(latest), media_type="application/json")
+
+@app.get("/api/activities/summary")
+def get_activity_summary(
+    baby_id: str,
+    days: int = 7,
+    tz: str = "UTC",
+    principal: Principal = Depends(get_current_principal),
+    db: Session = Depends(get_db)
+):
+    """
+    Per-day counts and totals (amount, duration, left/right breast) by type and
+    subtype for the last `days` days in the `tz` time zone, the last event of
+    each type and the latest measurement, aggregated in SQL for the Analysis screen
+    """
+    if not 1 <= days <= MAX_SUMMARY_DAYS:
+        raise HTTPException(status_code=400, detail=f"days must be between 1 and {MAX_SUMMARY_DAYS}")
+    try:
+        zone = ZoneInfo(tz)
+    except (ZoneInfoNotFoundError, ValueError):
+        raise HTTPException(status_code=400, detail=f"Unknown time zone: {tz}")
+    
+    return summarize_activities(db, principal.user_id, baby_id, days, zone)
 
 @app.post("/api/activities")
-async def create_activity(
+def create_activity(
     request: ActivityRequest,
-    current_user_email: str = Depends(get_current_user),
+    principal: Principal = Depends(get_active_principal),
     db: Session = Depends(get_db)
 ):
-    # Get user
-    user = db.query(DBUser).filter(DBUser.email == current_user_email).first()
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-    
     # Verify baby belongs to user
     baby = db.query(DBBaby).filter(
         DBBaby.id == request.baby_id,
-        DBBaby.user_id == user.id
+        DBBaby.user_id == principal.user_id
     ).first()
     if not baby:
         raise HTTPException(status_code=404, detail="Baby not found or doesn't belong to user")
@@ -687,82 +911,168 @@ async def create_activity(
             id=str(uuid.uuid4()),
             type=request.type,
             baby_id=request.baby_id,
-            user_id=user.id,
+            user_id=principal.user_id,
             timestamp=datetime.utcnow(),
             notes=request.notes,
-            # Optional fields based on activity type
-            feeding_type=getattr(request, 'feeding_type', None),
-            amount=getattr(request, 'amount', None),
-            duration=getattr(request, 'duration', None),
-            left_breast=getattr(request, 'left_breast', None),
-            right_breast=getattr(request, 'right_breast', None),
-            diaper_type=getattr(request, 'diaper_type', None),
-            weight=getattr(request, 'weight', None),
-            height=getattr(request, 'height', None),
-            head_circumference=getattr(request, 'head_circumference', None),
-            temperature=getattr(request, 'temperature', None),
-            title=getattr(request, 'title', None),
-            description=getattr(request, 'description', None),
-            category=getattr(request, 'category', None)
+            details=activity_details(request)
         )
         
         db.add(new_activity)
         db.commit()
         db.refresh(new_activity)
         
-        print(f"✅ Activity logged to PostgreSQL: {new_activity.type} for baby {baby.name}")
-        
-        # Helper function to format timestamp with timezone
-        def format_timestamp(ts):
-            if ts is None:
-                return None
-            if isinstance(ts, str):
-                try:
-                    from dateutil import parser
-                    dt = parser.parse(ts)
-                    if dt.tzinfo is None:
-                        dt = dt.replace(tzinfo=timezone.utc)
-                    return dt.isoformat()
-                except:
-                    return ts
-            # Ensure datetime has timezone
-            if ts.tzinfo is None:
-                ts = ts.replace(tzinfo=timezone.utc)
-            return ts.isoformat()
+        logger.info("Activity logged", extra={"activity_type": new_activity.type, "baby_id": baby.id})
         
         return {
             "id": new_activity.id,
             "type": new_activity.type,
             "baby_id": new_activity.baby_id,
             "user_id": new_activity.user_id,
-            "timestamp": format_timestamp(new_activity.timestamp),
+            "timestamp": normalize_timestamp(new_activity.timestamp),
             "notes": new_activity.notes
         }
     except Exception as e:
         db.rollback()
-        print(f"❌ Failed to create activity: {str(e)}")
+        logger.error("Failed to create activity", extra={"baby_id": request.baby_id, "error": str(e)})
         raise HTTPException(status_code=500, detail=f"Failed to create activity: {str(e)}")
 
+@app.post("/api/activities/bulk")
+def create_activities_bulk(
+    request: BulkActivityRequest,
+    principal: Principal = Depends(get_active_principal),
+    db: Session = Depends(get_db)
+):
+    """
+    Import a batch of activities (offline replay, data imports) in one
+    transaction: one ownership query for all distinct babies, one lookup for
+    already-stored client IDs, then multi-row INSERTs. Client timestamps are
+    kept (naive values are taken as UTC). Returns an outcome per item, in
+    order: created, duplicate (ID already stored for this user) or rejected
+    with an error.
+    """
+    if len(request.activities) > MAX_BULK_ACTIVITIES:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BULK_ACTIVITIES} activities per request")
+    
+    results: List[Optional[Dict[str, Any]]] = [None] * len(request.activities)
+    items = []
+    for index, raw in enumerate(request.activities):
+        try:
+            items.append((index, BulkActivityItem(**raw)))
+        except (ValidationError, TypeError) as e:
+            error = e.errors()[0]["msg"] if isinstance(e, ValidationError) else str(e)
+            results[index] = {"index": index, "status": "rejected", "error": error}
+    
+    baby_ids = {item.baby_id for _, item in items}
+    owned = {row[0] for row in db.query(DBBaby.id).filter(
+        DBBaby.id.in_(baby_ids),
+        DBBaby.user_id == principal.user_id
+    )} if baby_ids else set()
+    client_ids = {item.id for _, item in items if item.id}
+    # Only the caller's own rows count as duplicates; an ID taken by another user is
+    # rejected without saying whose it is (and would otherwise fail the INSERT)
+    stored, taken = set(), set()
+    if client_ids:
+        for activity_id, user_id in db.query(DBActivity.id, DBActivity.user_id).filter(DBActivity.id.in_(client_ids)):
+            (stored if user_id == principal.user_id else taken).add(activity_id)
+    
+    now = datetime.utcnow()
+    rows = []
+    for index, item in items:
+        if item.baby_id not in owned:
+            results[index] = {"index": index, "status": "rejected", "error": "Baby not found or doesn't belong to user"}
+            continue
+        activity_id = item.id or str(uuid.uuid4())
+        if activity_id in taken:
+            results[index] = {"index": index, "status": "rejected", "error": "Activity ID is not available"}
+            continue
+        if activity_id in stored:
+            results[index] = {"index": index, "id": activity_id, "status": "duplicate"}
+            continue
+        stored.add(activity_id)
+        timestamp = item.timestamp or now
+        if timestamp.tzinfo is not None:
+            timestamp = timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+        rows.append({
+            "id": activity_id,
+            "type": item.type,
+            "baby_id": item.baby_id,
+            "user_id": principal.user_id,
+            "timestamp": timestamp,
+            "notes": item.notes,
+            "created_at": now,
+            "details": activity_details(item),
+        })
+        results[index] = {"index": index, "id": activity_id, "status": "created"}
+    
+    try:
+        for start in range(0, len(rows), BULK_INSERT_ROWS):
+            db.execute(DBActivity.__table__.insert().values(rows[start:start + BULK_INSERT_ROWS]))
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        logger.error("Failed to import activities", extra={"count": len(rows), "error": str(e)})
+        raise HTTPException(status_code=500, detail=f"Failed to import activities: {str(e)}")
+    
+    logger.info("Activities imported", extra={"received": len(results), "imported": len(rows)})
+    return {"created": len(rows), "results": results}
+
+def kb_safety_level(answer: str) -> str:
+    # Same reading as the backend food verdict store; unclear answers defer to the doctor
+    return parse_verdict(answer) or "consult_doctor"
+
 # AI-powered food research endpoint
 @app.post("/api/food/research")
-async def food_research(request: dict, current_user_email: str = Depends(get_current_user)):
+async def food_research(request: dict, principal: Principal = Depends(get_current_user)):
     query = request.get("query", request.get("question", ""))
-    baby_age_months = request.get("baby_age_months", 6)
-    
-    print(f"🔬 Food research request: {query} (baby age: {baby_age_months} months)")
+    try:
+        baby_age_months = int(request.get("baby_age_months", 6))
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="baby_age_months must be an integer")
     
-    # Try AI-powered response if available
-    if AI_AVAILABLE and EMERGENT_LLM_KEY:
+    logger.info("Food research request", extra={"query": query, "baby_age_months": baby_age_months})
+    started = time.perf_counter()
+
+    def routed(response, route, confidence=None):
+        # Which source answered and how long it took, for the client and the logs
+        response["metadata"] = {
+            "route": route,
+            "confidence": confidence,
+            "threshold": food_research_router.threshold,
+            "latency_ms": round((time.perf_counter() - started) * 1000, 3),
+        }
+        logger.info("Food research answered", extra=response["metadata"])
+        return response
+
+    # Curated answers first: an in-memory index lookup, no LLM round trip
+    kb_match = food_research_router.route(query, baby_age_months)
+    if kb_match:
+        entry = kb_match["entry"]
+        return routed({
+            "answer": entry["answer"],
+            "safety_level": kb_safety_level(entry["answer"]),
+            "age_recommendation": entry.get("age_range", "Ask your doctor"),
+            "sources": ["Baby Steps Food Research Knowledge Base", entry.get("category", "Food Safety")],
+        }, "knowledge_base", kb_match["confidence"])
+
+    # No confident match: try AI-powered response if available
+    llm = await load_llm_integration() if EMERGENT_LLM_KEY else None
+    if llm and llm.available:
         try:
-            chat = LlmChat(
+            system_message = f"You are a pediatric nutrition expert. Provide safe, evidence-based food safety information for a {baby_age_months}-month-old baby. Include safety level (safe/caution/avoid), age recommendations, and trusted sources."
+            chat = llm.LlmChat(
                 api_key=EMERGENT_LLM_KEY,
                 session_id=f"food_research_{uuid.uuid4()}",
-                system_message=f"You are a pediatric nutrition expert. Provide safe, evidence-based food safety information for a {baby_age_months}-month-old baby. Include safety level (safe/caution/avoid), age recommendations, and trusted sources."
+                system_message=system_message
             ).with_model("openai", "gpt-4o-mini")
             
-            user_message = UserMessage(text=f"Is '{query}' safe for a {baby_age_months}-month-old baby? Provide detailed safety information including when it can be introduced, preparation tips, and potential risks.")
+            user_message = llm.UserMessage(text=f"Is '{query}' safe for a {baby_age_months}-month-old baby? Provide detailed safety information including when it can be introduced, preparation tips, and potential risks.")
             
-            response = await chat.send_message(user_message)
+            llm_started = time.perf_counter()
+            async with llm_metrics.track("food_research", "gpt-4o-mini") as metered:
+                response = await chat.send_message(user_message)
+                tokens = (estimate_tokens(system_message, user_message.text), estimate_tokens(response))
+                metered.usage(*tokens)
+            food_research_router.record_llm(time.perf_counter() - llm_started, sum(tokens))
             
             # Determine safety level based on age and response content
             # For proper safety assessment based on baby age
@@ -774,15 +1084,15 @@ async def food_research(request: dict, current_user_email: str = Depends(get_cur
                 default_safety = "safe"
             
             # Parse AI response and format it with proper safety level
-            return {
+            return routed({
                 "answer": response,
                 "safety_level": default_safety,  # Use standard levels: safe/caution/avoid/consult_doctor
                 "age_recommendation": f"Based on {baby_age_months} months old",
                 "sources": ["AI-Powered Pediatric Nutrition Assessment", "Evidence-Based Guidelines"]
-            }
+            }, "llm")
             
         except Exception as e:
-            print(f"❌ AI food research failed: {e}")
+            logger.error("AI food research failed", extra={"error": str(e)})
             # Fall through to fallback responses
     
     # Fallback responses for common queries
@@ -816,128 +1126,124 @@ async def food_research(request: dict, current_user_email: str = Depends(get_cur
     # Simple keyword matching
     for keyword, response in responses.items():
         if keyword.lower() in query.lower():
-            return response
+            return routed(dict(response), "fallback")
     
     # Default response
-    return {
+    return routed({
         "answer": f"For safety information about '{query}' for a {baby_age_months}-month-old baby, please consult your pediatrician for personalized advice.",
         "safety_level": "consult_doctor",
         "age_recommendation": "Ask your doctor",
         "sources": ["Pediatric Guidelines"]
+    }, "fallback")
+
+def meal_result(recipe: Dict[str, Any]) -> Dict[str, Any]:
+    """A meal_search recipe in the /api/meals/search result shape"""
+    return {
+        **recipe,
+        "instructions": [step for step in re.split(r"(?<=\.)\s+", recipe["instructions"]) if step],
+        "age_appropriate": recipe["age_range"],
+        "source": "Baby Steps Meal Planner",
     }
 
-# AI-powered meal planner endpoint
+# Meal planner endpoint: indexed recipes, with the LLM as an opt-in extra
 @app.post("/api/meals/search")
-async def meal_search(request: dict, current_user_email: str = Depends(get_current_user)):
+async def meal_search(request: dict, principal: Principal = Depends(get_current_user)):
     query = request.get("query", "")
-    age_months = request.get("baby_age_months", request.get("age_months", 6))
+    try:
+        age_months = int(request.get("baby_age_months", request.get("age_months", 6)))
+        limit = int(request.get("limit", DEFAULT_MEAL_LIMIT))
+        offset = int(request.get("offset", 0))
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="baby_age_months, limit and offset must be integers")
+    exclude_ingredients = request.get("exclude_ingredients") or []
+    try:
+        excluded = parse_allergens(request.get("exclude_allergens") or [])
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
-    print(f"🍽️ Meal search request: {query} (baby age: {age_months} months)")
+    logger.info("Meal search request", extra={"query": query, "baby_age_months": age_months})
     
-    # Try AI-powered response if available
-    if AI_AVAILABLE and EMERGENT_LLM_KEY:
+    started = time.perf_counter()
+    found = meal_index.search(query, age_months, request.get("category"), request.get("ingredients") or [], limit, offset,
+                              excluded, exclude_ingredients)
+    # Babies too young for solids get the milk feeds entry, which does not count as a match
+    matched = bool(found["recipes"]) and not found["milk_feeds_only"]
+    if not matched:
+        # Nothing with those ingredients: general ideas for the baby's age instead, same exclusions
+        found = meal_index.search("", age_months, limit=limit, exclude_allergens=excluded,
+                                  exclude_ingredients=exclude_ingredients)
+    search_ms = round((time.perf_counter() - started) * 1000, 3)
+    response = {
+        "results": [meal_result(recipe) for recipe in found["recipes"]],
+        "query": query,
+        "age_months": age_months,
+        "total": found["total"],
+        "matched": matched,
+        "source": "meal_planner",
+        "search_ms": search_ms,
+        "excluded_allergens": found["excluded_allergens"],
+    }
+    if not request.get("enrich"):
+        return response
+    
+    # Opt-in AI enrichment on top of the recipes
+    llm = await load_llm_integration() if EMERGENT_LLM_KEY else None
+    if llm and llm.available:
         try:
-            chat = LlmChat(
+            system_message = f"You are a pediatric nutrition expert. Provide age-appropriate meal ideas with detailed recipes, ingredients, instructions, and safety tips for a {age_months}-month-old baby. Focus on nutrition, safety, and development-appropriate textures."
+            chat = llm.LlmChat(
                 api_key=EMERGENT_LLM_KEY,
                 session_id=f"meal_search_{uuid.uuid4()}",
-                system_message=f"You are a pediatric nutrition expert. Provide age-appropriate meal ideas with detailed recipes, ingredients, instructions, and safety tips for a {age_months}-month-old baby. Focus on nutrition, safety, and development-appropriate textures."
+                system_message=system_message
             ).with_model("openai", "gpt-4o-mini")
             
-            user_message = UserMessage(text=f"Provide meal ideas for: '{query}' suitable for a {age_months}-month-old baby. Include 3-5 recipe suggestions with ingredients, step-by-step instructions, age appropriateness, prep time, and safety tips.")
+            recipe_names = ", ".join(recipe["name"] for recipe in found["recipes"])
+            exclusions = allergen_names(excluded) + list(exclude_ingredients)
+            avoid = f" Do not use any of: {', '.join(exclusions)}." if exclusions else ""
+            user_message = llm.UserMessage(text=f"Provide meal ideas for: '{query}' suitable for a {age_months}-month-old baby, building on these recipes from our meal planner: {recipe_names}.{avoid} Include 3-5 recipe suggestions with ingredients, step-by-step instructions, age appropriateness, prep time, and safety tips.")
             
-            response = await chat.send_message(user_message)
+            async with llm_metrics.track("meals_search", "gpt-4o-mini") as metered:
+                ai_response = await chat.send_message(user_message)
+                metered.usage(estimate_tokens(system_message, user_message.text), estimate_tokens(ai_response))
             
-            # For now, return the AI response in a simple format
-            # In a production app, you'd parse this into structured meal objects
-            return {
-                "results": [{
-                    "name": "AI-Generated Meal Ideas",
-                    "description": response,
-                    "age_appropriate": f"{age_months}+ months",
-                    "source": "AI-Powered Nutrition Expert"
-                }],
-                "query": query,
-                "age_months": age_months,
-                "ai_powered": True
-            }
+            response["results"].insert(0, {
+                "name": "AI-Generated Meal Ideas",
+                "description": ai_response,
+                "age_appropriate": f"{age_months}+ months",
+                "source": "AI-Powered Nutrition Expert"
+            })
+            response["ai_powered"] = True
+            response["source"] = "llm"
             
         except Exception as e:
-            print(f"❌ AI meal search failed: {e}")
-            # Fall through to fallback responses
+            logger.error("AI meal search failed", extra={"error": str(e)})
+            # The recipes alone still go out
     
-    # Fallback meal suggestions
-    if age_months >= 6:
-        meals = [
-            {
-                "name": "Mashed Banana",
-                "ingredients": ["1 ripe banana"],
-                "instructions": ["Mash banana with fork until smooth", "Ensure no lumps for younger babies", "Serve at room temperature"],
-                "age_appropriate": "6+ months",
-                "prep_time": "2 minutes",
-                "safety_tips": ["Always test temperature", "Supervise eating", "Watch for choking"]
-            },
-            {
-                "name": "Sweet Potato Puree", 
-                "ingredients": ["1 sweet potato", "Water or breast milk"],
-                "instructions": ["Steam sweet potato until very soft (15-20 min)", "Mash with liquid to desired consistency", "Cool before serving"],
-                "age_appropriate": "6+ months",
-                "prep_time": "25 minutes", 
-                "safety_tips": ["Check temperature", "Start with thin consistency", "No added salt or sugar"]
-            },
-            {
-                "name": "Avocado Mash",
-                "ingredients": ["1/2 ripe avocado"],
-                "instructions": ["Mash avocado until smooth", "Add breast milk if needed for consistency", "Serve immediately"],
-                "age_appropriate": "6+ months",
-                "prep_time": "1 minute",
-                "safety_tips": ["Use very ripe avocado", "Serve fresh", "Watch for allergies"]
-            }
-        ]
-    else:
-        meals = [
-            {
-                "name": "Breast Milk or Formula",
-                "ingredients": ["Breast milk or appropriate infant formula"],
-                "instructions": ["Follow feeding schedule as recommended by pediatrician"],
-                "age_appropriate": "0+ months",
-                "prep_time": "As needed",
-                "safety_tips": ["Consult pediatrician for feeding schedule", "No solid foods before 6 months"]
-            }
-        ]
-    
-    if age_months >= 8:
-        meals.extend([
-            {
-                "name": "Soft Scrambled Eggs",
-                "ingredients": ["1 egg", "1 tbsp milk", "Small amount of butter"],
-                "instructions": ["Whisk egg with milk", "Cook on very low heat, stirring constantly", "Ensure very soft texture", "Cool before serving"],
-                "age_appropriate": "8+ months",
-                "prep_time": "5 minutes",
-                "safety_tips": ["Cook thoroughly", "Cool to room temperature", "Watch for egg allergies", "Cut into small pieces"]
-            }
-        ])
-    
-    return {"results": meals, "query": query, "age_months": age_months}
+    return response
 
 # AI-powered general research endpoint
 @app.post("/api/research")
-async def research(request: dict, current_user_email: str = Depends(get_current_user)):
+async def research(request: dict, principal: Principal = Depends(get_current_user)):
     query = request.get("query", request.get("question", ""))
     
-    print(f"📚 Research request: {query}")
+    logger.info("Research request", extra={"query": query})
     
     # Try AI-powered response if available
-    if AI_AVAILABLE and EMERGENT_LLM_KEY:
+    llm = await load_llm_integration() if EMERGENT_LLM_KEY else None
+    if llm and llm.available:
         try:
-            chat = LlmChat(
+            system_message = "You are a helpful parenting and child development expert. Provide evidence-based, practical advice for parents. Always remind users to consult healthcare professionals for medical concerns."
+            chat = llm.LlmChat(
                 api_key=EMERGENT_LLM_KEY,
                 session_id=f"research_{uuid.uuid4()}",
-                system_message="You are a helpful parenting and child development expert. Provide evidence-based, practical advice for parents. Always remind users to consult healthcare professionals for medical concerns."
+                system_message=system_message
             ).with_model("openai", "gpt-4o-mini")
             
-            user_message = UserMessage(text=f"Parent question: {query}. Please provide helpful, evidence-based information while reminding them to consult healthcare professionals for medical advice.")
+            user_message = llm.UserMessage(text=f"Parent question: {query}. Please provide helpful, evidence-based information while reminding them to consult healthcare professionals for medical advice.")
             
-            response = await chat.send_message(user_message)
+            async with llm_metrics.track("research", "gpt-4o-mini") as metered:
+                response = await chat.send_message(user_message)
+                metered.usage(estimate_tokens(system_message, user_message.text), estimate_tokens(response))
             
             return {
                 "answer": response,
@@ -948,7 +1254,7 @@ async def research(request: dict, current_user_email: str = Depends(get_current_
             }
             
         except Exception as e:
-            print(f"❌ AI research failed: {e}")
+            logger.error("AI research failed", extra={"error": str(e)})
             # Fall through to fallback
     
     # Fallback response
@@ -961,7 +1267,7 @@ async def research(request: dict, current_user_email: str = Depends(get_current_
 
 # AI Chat endpoint - matches Android app expectations
 @app.post("/api/ai/chat")
-async def ai_chat(request: dict, current_user_email: str = Depends(get_current_user)):
+async def ai_chat(request: dict, principal: Principal = Depends(get_current_user)):
     """
     AI Chat endpoint for Android app - uses gpt-5-nano model for cost-effectiveness
     Expected request format: {"message": "user question", "baby_age_months": 15}
@@ -972,10 +1278,11 @@ async def ai_chat(request: dict, current_user_email: str = Depends(get_current_u
     if not message.strip():
         raise HTTPException(status_code=400, detail="Message is required")
     
-    print(f"🤖 AI Chat request: {message} (baby age: {baby_age_months} months)")
+    logger.info("AI chat request", extra={"chars": len(message), "baby_age_months": baby_age_months})
     
     # Try AI-powered response if available
-    if AI_AVAILABLE and EMERGENT_LLM_KEY:
+    llm = await load_llm_integration() if EMERGENT_LLM_KEY else None
+    if llm and llm.available:
         try:
             # Create specialized system message for baby care
             system_prompt = "You are an expert parenting and baby care assistant. Provide helpful, evidence-based advice about baby care, nutrition, safety, development, and parenting. Always prioritize safety and recommend consulting pediatricians for medical concerns."
@@ -984,14 +1291,16 @@ async def ai_chat(request: dict, current_user_email: str = Depends(get_current_u
             if baby_age_months is not None:
                 system_prompt += f" The baby is {baby_age_months} months old - tailor your advice appropriately for this age."
             
-            chat = LlmChat(
+            chat = llm.LlmChat(
                 api_key=EMERGENT_LLM_KEY,
                 session_id=f"ai_chat_{uuid.uuid4()}",
                 system_message=system_prompt
             ).with_model("openai", "gpt-5-nano")  # Use cost-effective gpt-5-nano model
             
-            user_message = UserMessage(text=message)
-            response = await chat.send_message(user_message)
+            user_message = llm.UserMessage(text=message)
+            async with llm_metrics.track("ai_chat", "gpt-5-nano") as metered:
+                response = await chat.send_message(user_message)
+                metered.usage(estimate_tokens(system_prompt, message), estimate_tokens(response))
             
             return {
                 "response": response,
@@ -1000,7 +1309,7 @@ async def ai_chat(request: dict, current_user_email: str = Depends(get_current_u
             }
             
         except Exception as e:
-            print(f"❌ AI chat failed: {e}")
+            logger.error("AI chat failed", extra={"error": str(e)})
             # Fall through to fallback response
     
     # Fallback response when AI is not available
@@ -1023,7 +1332,7 @@ class DeletionRequestModel(BaseModel):
     reason: Optional[str] = None
 
 @app.post("/api/deletion-request")
-async def create_deletion_request(
+def create_deletion_request(
     request: DeletionRequestModel,
     db: Session = Depends(get_db)
 ):
@@ -1044,7 +1353,7 @@ async def create_deletion_request(
         db.add(deletion_request)
         db.commit()
         
-        print(f"📝 Deletion request created for: {request.email}")
+        logger.info("Deletion request created", extra={"deletion_request_id": deletion_request.id})
         
         return {
             "success": True,
@@ -1054,13 +1363,15 @@ async def create_deletion_request(
         
     except Exception as e:
         db.rollback()
-        print(f"❌ Error creating deletion request: {e}")
+        logger.error("Deletion request failed", extra={"error": str(e)})
         raise HTTPException(
             status_code=500,
             detail="Failed to submit deletion request. Please try again or contact support."
         )
 
+startup_timer.mark("routes")
+
 if __name__ == "__main__":
     import uvicorn
     port = int(os.environ.get("PORT", 8000))
-    uvicorn.run(app, host="0.0.0.0", port=port)
\ No newline at end of file
+    uvicorn.run(app, host="0.0.0.0", port=port, access_log=False)
\ No newline at end of file
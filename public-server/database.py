@@ -3,11 +3,18 @@ Database configuration and utilities
 Supports both SQLite (local) and PostgreSQL (production)
 """
 import os
-from sqlalchemy import create_engine, Column, String, DateTime, Integer, Text, Float
+import time
+from sqlalchemy import create_engine, Column, String, DateTime, Text, Index, JSON
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from datetime import datetime
 
+from activity_serialization import json_engine_options
+from db_pool import PoolMetrics, apply_sqlite_profile, pool_options
+from migrations import migrate, pending_migrations
+
 # Get database URL from environment or use SQLite for local development
 DATABASE_URL = os.getenv("DATABASE_URL")
 
@@ -17,14 +24,21 @@ if DATABASE_URL:
     if DATABASE_URL.startswith("postgres://"):
         DATABASE_URL = DATABASE_URL.replace("postgres://", "postgresql://", 1)
     
-    engine = create_engine(DATABASE_URL)
+    engine = create_engine(DATABASE_URL, **pool_options(DATABASE_URL), **json_engine_options())
     print(f"✅ Using PostgreSQL database (production)")
 else:
     # Development: Use SQLite
     DATABASE_URL = "sqlite:///./baby_steps.db"
-    engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
+    engine = create_engine(DATABASE_URL, **pool_options(DATABASE_URL), **json_engine_options())
     print(f"✅ Using SQLite database (development)")
 
+if engine.dialect.name == "sqlite" and engine.url.database not in (None, "", ":memory:"):
+    # WAL, synchronous=NORMAL, mmap and busy timeout on each pooled connection
+    apply_sqlite_profile(engine)
+
+# Pool event hooks: checkout latency, active/idle counts, invalidations
+pool_metrics = PoolMetrics().attach(engine)
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
@@ -49,6 +63,23 @@ class Baby(Base):
     user_id = Column(String, nullable=False, index=True)
     created_at = Column(DateTime, default=datetime.utcnow)
 
+# Keys that may appear in Activity.details, in API response order
+ACTIVITY_DETAIL_FIELDS = (
+    "feeding_type",  # feeding: breast, bottle, formula, solid
+    "amount",  # feeding: oz or ml
+    "duration",  # sleep, pumping: minutes
+    "left_breast",  # pumping: oz
+    "right_breast",  # pumping: oz
+    "diaper_type",  # diaper: wet, dirty, both
+    "weight",  # measurements: lbs or kg
+    "height",  # measurements: inches or cm
+    "head_circumference",  # measurements: inches or cm
+    "temperature",  # measurements: F or C
+    "title",  # milestone
+    "description",  # milestone
+    "category",  # milestone: physical, cognitive, social, language
+)
+
 class Activity(Base):
     __tablename__ = "activities"
     
@@ -60,30 +91,15 @@ class Activity(Base):
     timestamp = Column(DateTime, nullable=False, default=datetime.utcnow)
     created_at = Column(DateTime, default=datetime.utcnow)
     
-    # Feeding-specific fields
-    feeding_type = Column(String)  # breast, bottle, formula, solid
-    amount = Column(Float)  # in oz or ml
-    
-    # Pumping-specific fields (for tracking left/right breast separately)
-    left_breast = Column(Float)  # left breast amount in oz
-    right_breast = Column(Float)  # right breast amount in oz
-    
-    # Sleep-specific fields
-    duration = Column(Integer)  # in minutes
-    
-    # Diaper-specific fields
-    diaper_type = Column(String)  # wet, dirty, both
-    
-    # Measurement-specific fields
-    weight = Column(Float)  # in lbs or kg
-    height = Column(Float)  # in inches or cm
-    head_circumference = Column(Float)  # in inches or cm
-    temperature = Column(Float)  # in F or C
-    
-    # Milestone-specific fields
-    title = Column(String)
-    description = Column(Text)
-    category = Column(String)  # physical, cognitive, social, language
+    # Type-specific fields (ACTIVITY_DETAIL_FIELDS), only the ones that are set,
+    # as one compact payload instead of a wide mostly-NULL row; JSONB on Postgres
+    details = Column(JSON().with_variant(JSONB(), "postgresql"))
+
+    # Same definitions as migrations 2 and 3, so fresh databases get them from create_all
+    __table_args__ = (
+        Index("ix_activities_user_baby_type_ts", user_id, baby_id, type, timestamp.desc()),
+        Index("ix_activities_baby_ts", baby_id, timestamp.desc()),
+    )
 
 class DeletionRequest(Base):
     __tablename__ = "deletion_requests"
@@ -97,14 +113,32 @@ class DeletionRequest(Base):
 
 # Database initialization
 def init_database():
-    """Create all tables"""
+    """
+    Create tables and apply pending schema migrations (see migrations.py). A
+    database already at the latest migration costs a single query, so cold
+    starts skip the create_all table checks.
+    """
+    if os.getenv("DB_MIGRATE_ON_STARTUP", "true").lower() not in ("1", "true", "yes"):
+        return
+    if not pending_migrations(engine):
+        print("✅ Schema up to date")
+        return
     Base.metadata.create_all(bind=engine)
     print("✅ Database tables created/verified")
+    migrate(engine)
 
 def get_db():
     """Get database session"""
     db = SessionLocal()
     try:
+        # Check the connection out up front so pool waits (and pre-ping) are measured
+        started = time.perf_counter()
+        try:
+            db.connection()
+        except PoolTimeoutError:
+            pool_metrics.checkout_timed_out()
+            raise
+        pool_metrics.observe_checkout(time.perf_counter() - started)
         yield db
     finally:
         db.close()
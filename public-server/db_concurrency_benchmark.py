@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Concurrency benchmark for the database endpoints
+Compares GET /api/babies served the old way (sync SQLAlchemy work inside an
+`async def` handler, i.e. on the event loop) with the current way (plain `def`
+handler run in the sized worker threadpool). Every SQL statement gets an
+artificial delay to emulate a remote Postgres round trip, and event-loop lag
+(how late a 5ms timer fires) is sampled during the load to show loop stalls.
+
+Runs in-process against a throwaway SQLite database unless DATABASE_URL is set.
+Keep --concurrency at or below the engine's pool_size + max_overflow (15 by
+default): above that the "before" layout can starve the connection pool, since
+blocked handlers keep the loop from running get_db's cleanup, and requests
+fail with QueuePool timeouts.
+
+Usage:
+    python db_concurrency_benchmark.py --requests 200 --concurrency 10 --query-delay 0.02
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+import httpx
+
+
+def _percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[max(0, int(len(ordered) * fraction) - 1)]
+
+
+def seed_user(email):
+    from database import Baby, SessionLocal, User
+
+    db = SessionLocal()
+    try:
+        if not db.query(User).filter(User.email == email).first():
+            db.add(User(id="bench-user", email=email, name="Bench Parent", password="bench"))
+            for n in range(3):
+                db.add(Baby(id=f"bench-baby-{n}", name=f"Baby {n}", birth_date="2024-01-15", user_id="bench-user"))
+            db.commit()
+    finally:
+        db.close()
+
+
+def build_apps():
+    """The real handler mounted as-is ("after") and wrapped back onto the loop ("before")"""
+    from fastapi import Depends, FastAPI
+    from sqlalchemy.orm import Session
+
+    import app as server
+    from database import get_db
+
+    async def get_babies_on_loop(
+        principal: server.Principal = Depends(server.get_current_principal), db: Session = Depends(get_db)
+    ):
+        return server.get_babies(principal, db)
+
+    before, after = FastAPI(), FastAPI()
+    before.add_api_route("/api/babies", get_babies_on_loop, methods=["GET"])
+    after.add_api_route("/api/babies", server.get_babies, methods=["GET"])
+    return server, {"before (async def, on loop)": before, "after (def, threadpool)": after}
+
+
+async def run_load(bench_app, token, requests, concurrency):
+    transport = httpx.ASGITransport(app=bench_app)
+    headers = {"Authorization": f"Bearer {token}"}
+    latencies, lags, statuses = [], [], {}
+    done = asyncio.Event()
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def one():
+            async with semaphore:
+                started = time.perf_counter()
+                try:
+                    response = await client.get("/api/babies", headers=headers)
+                    outcome = response.status_code
+                except Exception as e:  # e.g. QueuePool TimeoutError when the loop starves the pool
+                    outcome = type(e).__name__
+                latencies.append(time.perf_counter() - started)
+                statuses[outcome] = statuses.get(outcome, 0) + 1
+
+        async def monitor():
+            while not done.is_set():
+                started = time.perf_counter()
+                await asyncio.sleep(0.005)
+                lags.append(time.perf_counter() - started - 0.005)
+
+        prober = asyncio.create_task(monitor())
+        started = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(requests)))
+        elapsed = time.perf_counter() - started
+        done.set()
+        await prober
+
+    return {
+        "throughput": requests / elapsed,
+        "p50": statistics.median(latencies),
+        "p95": _percentile(latencies, 0.95),
+        "lag_p95": _percentile(lags, 0.95) if lags else 0.0,
+        "lag_max": max(lags) if lags else 0.0,
+        "statuses": statuses,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--query-delay", type=float, default=0.02, help="seconds added to every SQL statement")
+    parser.add_argument("--threads", type=int, help="worker threadpool size (default DB_THREADPOOL_SIZE)")
+    args = parser.parse_args()
+
+    if not os.getenv("DATABASE_URL"):
+        # database.py falls back to ./baby_steps.db; keep the benchmark off the real file
+        sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+        os.chdir(tempfile.mkdtemp(prefix="babysteps-bench-"))
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        server, apps = build_apps()
+    seed_user("bench@babysteps.com")
+    from anyio import to_thread
+    from sqlalchemy import event
+
+    from database import engine
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _slow_round_trip(*_):
+        time.sleep(args.query_delay)
+
+    token = server.create_access_token({"sub": "bench@babysteps.com", "uid": "bench-user"})
+    threads = args.threads or server.DB_THREADPOOL_SIZE
+    print(f"🏁 {args.requests} x GET /api/babies at concurrency {args.concurrency}, "
+          f"{args.query_delay * 1000:.0f}ms per query, {threads} worker threads")
+
+    async def bench():
+        to_thread.current_default_thread_limiter().total_tokens = threads
+        results = {}
+        for label, bench_app in apps.items():
+            with contextlib.redirect_stdout(io.StringIO()):
+                results[label] = await run_load(bench_app, token, args.requests, args.concurrency)
+        return results
+
+    for label, r in asyncio.run(bench()).items():
+        print(f"   {label:28s} {r['throughput']:7.1f} req/s  p50 {r['p50'] * 1000:7.1f}ms  "
+              f"p95 {r['p95'] * 1000:7.1f}ms  loop lag p95 {r['lag_p95'] * 1000:6.1f}ms "
+              f"(max {r['lag_max'] * 1000:.1f}ms)  statuses {r['statuses']}")
+
+
+if __name__ == "__main__":
+    main()
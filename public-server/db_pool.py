@@ -0,0 +1,167 @@
+"""
+Connection pool profile and instrumentation for database.py
+The pool is configured from the environment (size, overflow, checkout timeout,
+recycle, pre-ping, Postgres statement timeout) so idle connections dropped by
+Render's managed Postgres are recycled or re-validated instead of failing the
+first request after a quiet period. Pool events feed checkout latency,
+connection churn and invalidation counters for /api/db/metrics.
+
+Local SQLite databases get their own profile (apply_sqlite_profile): WAL so
+readers no longer block on the writer, synchronous=NORMAL, a memory-mapped
+read path and a busy timeout, set by connect-event PRAGMAs on every pooled
+connection. Pooled SQLite connections are kept for the life of the process
+(no recycle or pre-ping: there is no server to drop them).
+"""
+import os
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from sqlalchemy import event, text
+
+from histogram import Histogram
+
+CHECKOUT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    return os.environ.get(name, str(default)).lower() in ("1", "true", "yes")
+
+
+def pool_options(database_url: str) -> Dict[str, Any]:
+    """create_engine() keyword arguments for the configured pool profile"""
+    sqlite = database_url.startswith("sqlite")
+    options = {
+        "pool_size": int(os.environ.get("DB_POOL_SIZE", 5)),
+        "max_overflow": int(os.environ.get("DB_MAX_OVERFLOW", 10)),
+        "pool_timeout": float(os.environ.get("DB_POOL_TIMEOUT_SECONDS", 10)),
+        # Recycle before typical 5 minute idle cutoffs; pre-ping catches anything dropped sooner
+        "pool_recycle": int(os.environ.get("DB_POOL_RECYCLE_SECONDS", -1 if sqlite else 280)),
+        "pool_pre_ping": _env_bool("DB_POOL_PRE_PING", not sqlite),
+    }
+    connect_args: Dict[str, Any] = {}
+    if sqlite:
+        connect_args["check_same_thread"] = False
+    else:
+        statement_timeout_ms = int(os.environ.get("DB_STATEMENT_TIMEOUT_MS", 15000))
+        if statement_timeout_ms > 0:
+            connect_args["options"] = f"-c statement_timeout={statement_timeout_ms}"
+        connect_timeout = int(os.environ.get("DB_CONNECT_TIMEOUT_SECONDS", 10))
+        if connect_timeout > 0:
+            connect_args["connect_timeout"] = connect_timeout
+    options["connect_args"] = connect_args
+    return options
+
+
+def sqlite_pragmas() -> Dict[str, Any]:
+    """PRAGMAs for the SQLite profile, in the order they are applied"""
+    return {
+        # Readers see the last commit while a write is in progress instead of waiting for it
+        "journal_mode": "WAL" if _env_bool("DB_SQLITE_WAL", True) else "DELETE",
+        # In WAL mode NORMAL only fsyncs at checkpoints: a crash can lose the last commits, not corrupt
+        "synchronous": os.environ.get("DB_SQLITE_SYNCHRONOUS", "NORMAL").upper(),
+        "mmap_size": int(os.environ.get("DB_SQLITE_MMAP_BYTES", 256 * 1024 * 1024)),
+        # Writers queue for the lock instead of failing with "database is locked"
+        "busy_timeout": int(os.environ.get("DB_SQLITE_BUSY_TIMEOUT_MS", 5000)),
+        "temp_store": "MEMORY",
+    }
+
+
+def apply_sqlite_profile(engine, pragmas: Optional[Dict[str, Any]] = None):
+    """Set the SQLite profile on every new connection of a file-backed SQLite engine"""
+    pragmas = sqlite_pragmas() if pragmas is None else pragmas
+
+    def set_pragmas(dbapi_connection, _connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name} = {value}")
+        finally:
+            cursor.close()
+
+    event.listen(engine, "connect", set_pragmas)
+    return engine
+
+
+class PoolMetrics:
+    """Counters and a checkout-wait histogram fed by SQLAlchemy pool events"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkout_seconds = Histogram(CHECKOUT_BUCKETS)
+        self.counters = {
+            "connects": 0,
+            "checkouts": 0,
+            "checkins": 0,
+            "invalidations": 0,
+            "soft_invalidations": 0,
+            "checkout_timeouts": 0,
+        }
+        self.engine = None
+
+    def _count(self, name: str):
+        with self._lock:
+            self.counters[name] += 1
+
+    def attach(self, engine):
+        self.engine = engine
+        pool = engine.pool
+        event.listen(pool, "connect", lambda *_: self._count("connects"))
+        event.listen(pool, "checkout", lambda *_: self._count("checkouts"))
+        event.listen(pool, "checkin", lambda *_: self._count("checkins"))
+        event.listen(pool, "invalidate", lambda *_: self._count("invalidations"))
+        event.listen(pool, "soft_invalidate", lambda *_: self._count("soft_invalidations"))
+        return self
+
+    def observe_checkout(self, seconds: float):
+        with self._lock:
+            self.checkout_seconds.observe(seconds)
+
+    def checkout_timed_out(self):
+        self._count("checkout_timeouts")
+
+    def gauges(self) -> Dict[str, int]:
+        pool = self.engine.pool if self.engine is not None else None
+        gauges = {}
+        for name, method in (("size", "size"), ("active", "checkedout"), ("idle", "checkedin"), ("overflow", "overflow")):
+            if hasattr(pool, method):
+                gauges[name] = getattr(pool, method)()
+        return gauges
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            histogram = self.checkout_seconds
+            return {
+                **self.gauges(),
+                **self.counters,
+                "checkout_avg_ms": round(histogram.sum / histogram.count * 1000, 2) if histogram.count else None,
+            }
+
+    def prometheus(self) -> str:
+        """Prometheus text exposition of the pool gauges, counters and checkout histogram"""
+        lines = []
+        for name, value in self.gauges().items():
+            lines += [f"# TYPE db_pool_{name} gauge", f"db_pool_{name} {value}"]
+        with self._lock:
+            for name, value in self.counters.items():
+                lines += [f"# TYPE db_pool_{name}_total counter", f"db_pool_{name}_total {value}"]
+            histogram = self.checkout_seconds
+            lines += [
+                "# HELP db_pool_checkout_seconds Time to check a connection out of the pool (including pre-ping)",
+                "# TYPE db_pool_checkout_seconds histogram",
+            ]
+            cumulative = 0
+            for bound, count in zip(histogram.buckets, histogram.counts):
+                cumulative += count
+                lines.append(f'db_pool_checkout_seconds_bucket{{le="{bound}"}} {cumulative}')
+            lines.append(f'db_pool_checkout_seconds_bucket{{le="+Inf"}} {histogram.count}')
+            lines.append(f"db_pool_checkout_seconds_sum {histogram.sum:.6f}")
+            lines.append(f"db_pool_checkout_seconds_count {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+    def round_trip(self) -> float:
+        """Readiness probe: check a connection out and run SELECT 1; returns milliseconds"""
+        started = time.perf_counter()
+        with self.engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+        return round((time.perf_counter() - started) * 1000, 2)
@@ -0,0 +1,262 @@
+"""
+Knowledge-base-first routing for the AI chat
+Indexes the JSON knowledge bases (ai_assistant.json, food_research.json) in
+memory and answers a chat message directly when a match clears a calibrated
+confidence threshold. Only low-confidence messages escalate to the LLM.
+Calibrate the threshold with backend/kb_router_benchmark.py. Mirrors
+backend/kb_router.py - public-server deploys on its own and cannot import
+from backend/.
+"""
+import json
+import logging
+import math
+import os
+import re
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+KNOWLEDGE_BASE_DIR = Path(
+    os.environ.get(
+        "KNOWLEDGE_BASE_DIR",
+        Path(__file__).parent.parent / "frontend" / "public" / "knowledge-base",
+    )
+)
+KNOWLEDGE_BASE_FILES = {
+    "ai_assistant": "ai_assistant.json",
+    "food_research": "food_research.json",
+}
+
+# Calibrated with kb_router_benchmark.py: precision >= 0.95 on the replay corpus
+# and a 0.1 margin above the best-scoring off-topic message
+DEFAULT_CONFIDENCE_THRESHOLD = 0.68
+
+# Words that carry no topic signal; ages are handled separately from the text
+STOP_WORDS = {
+    "a", "about", "all", "am", "an", "and", "any", "are", "at", "be", "before", "by", "can",
+    "could", "do", "does", "for", "from", "give", "good", "has", "have", "how", "i", "if",
+    "in", "into", "is", "it", "its", "me", "mo", "month", "my", "of", "ok", "okay", "old",
+    "on", "or", "our", "should", "so", "some", "that", "the", "their", "them", "there",
+    "they", "this", "to", "up", "was", "we", "week", "what", "when", "where", "which",
+    "who", "why", "will", "with", "would", "year", "yo", "you", "your",
+    "baby", "child", "infant", "kid", "little", "one", "toddler",
+}
+
+# Symptom and emergency wording is never answered from the knowledge base however
+# well it matches ("my baby has a fever of 104" scores close to "Do teething
+# babies get fevers?"); those messages always escalate. Planning questions about
+# choking hazards stay answerable.
+URGENT_TERMS = re.compile(
+    r"\b(fevers?|feverish|febrile|(?:high|has a|running a) temp(?:erature)?|temp(?:erature)? (?:of|is|over|above) \d"
+    r"|\b1[01]\d(?:\.\d)? ?(?:°|degrees?\b)|\b(?:3[89]|4[01])(?:\.\d)? ?(?:°|degrees? )c(?:elsius)?\b"
+    r"|(?:not|isn't|stopped|trouble|difficulty|struggling|hard time) breathing|can't breathe|turning blue|blue lips"
+    r"|(?<!prevent )chok(?:e|es|ed|ing)\b(?! hazards?| risks?)|swallowed|unresponsive|unconscious|hard to wake"
+    r"|won't wake|seizures?|convuls\w*|blood\w*|bleed\w*)"
+)
+URGENT_CARE_ADVICE = (
+    "This sounds like it may need urgent medical attention. If your baby is not breathing, is "
+    "unresponsive, is having a seizure, has swallowed a battery, magnet or chemical, or is choking "
+    "and cannot cry or cough, call emergency services now. For a fever in a baby under 3 months, "
+    "or a high fever with unusual sleepiness, contact your pediatrician or urgent care right away."
+)
+
+_TOKEN = re.compile(r"[a-z]+")
+_AGE_RANGE = re.compile(r"(\d+)\s*[–-]\s*(\d+)\s*month")
+
+
+def _stem(token: str) -> str:
+    if len(token) > 4 and token.endswith("ies"):
+        return token[:-3] + "y"
+    if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+        return token[:-1]
+    return token
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens with stop words and digits removed, lightly stemmed"""
+    tokens = []
+    for token in _TOKEN.findall((text or "").lower()):
+        if token in STOP_WORDS:
+            continue
+        token = _stem(token)
+        if token not in STOP_WORDS:
+            tokens.append(token)
+    return tokens
+
+
+def normalize_question(text: str) -> str:
+    return " ".join(_TOKEN.findall((text or "").lower()))
+
+
+def is_urgent(message: str) -> bool:
+    """True for symptom or emergency descriptions that must not get a canned answer"""
+    return bool(URGENT_TERMS.search((message or "").lower().replace("\u2019", "'")))
+
+
+def parse_age_range(age_range: str) -> Optional[Tuple[int, int]]:
+    """'6–12 months' -> (6, 12); None when the range is not in months"""
+    match = _AGE_RANGE.search((age_range or "").lower())
+    if not match:
+        return None
+    return int(match.group(1)), int(match.group(2))
+
+
+class KnowledgeBaseIndex:
+    """TF-IDF inverted index over knowledge-base questions"""
+
+    def __init__(self, entries: List[Dict[str, Any]]):
+        self.entries = entries
+        self._exact: Dict[str, List[int]] = defaultdict(list)
+        self._postings: Dict[str, List[Tuple[int, float]]] = defaultdict(list)
+        self._age_ranges: List[Optional[Tuple[int, int]]] = []
+
+        document_frequency: Dict[str, int] = defaultdict(int)
+        tokenized = []
+        for entry in entries:
+            tokens = set(tokenize(entry.get("question", "")))
+            tokenized.append(tokens)
+            for token in tokens:
+                document_frequency[token] += 1
+
+        total = max(len(entries), 1)
+        self._idf = {token: math.log(1 + total / df) for token, df in document_frequency.items()}
+
+        for position, (entry, tokens) in enumerate(zip(entries, tokenized)):
+            self._exact[normalize_question(entry.get("question", ""))].append(position)
+            self._age_ranges.append(parse_age_range(entry.get("age_range", "")))
+            norm = math.sqrt(sum(self._idf[token] ** 2 for token in tokens)) or 1.0
+            for token in tokens:
+                self._postings[token].append((position, self._idf[token] / norm))
+
+    @classmethod
+    def load(cls, directory: Path = KNOWLEDGE_BASE_DIR, files: Dict[str, str] = None) -> "KnowledgeBaseIndex":
+        entries = []
+        for source, filename in (files or KNOWLEDGE_BASE_FILES).items():
+            path = Path(directory) / filename
+            try:
+                with open(path, "r", encoding="utf-8") as file:
+                    items = json.load(file)
+            except (FileNotFoundError, json.JSONDecodeError) as e:
+                logging.error(f"Knowledge base {path} unavailable: {str(e)}")
+                continue
+            for item in items:
+                if isinstance(item.get("answer"), str) and item.get("question"):
+                    entries.append({**item, "source": source})
+        logging.info(f"Indexed {len(entries)} knowledge base entries")
+        return cls(entries)
+
+    def _age_penalty(self, position: int, age_months: Optional[int]) -> float:
+        age_range = self._age_ranges[position]
+        if age_months is None or age_range is None:
+            return 1.0
+        low, high = age_range
+        return 1.0 if low <= age_months <= high else 0.85
+
+    def search(self, query: str, age_months: Optional[int] = None, limit: int = 3) -> List[Tuple[float, Dict[str, Any]]]:
+        """Best matches as (confidence, entry), confidence in [0, 1]"""
+        exact = self._exact.get(normalize_question(query))
+        if exact:
+            ranked = sorted(exact, key=lambda p: -self._age_penalty(p, age_months))
+            return [(self._age_penalty(p, age_months), self.entries[p]) for p in ranked[:limit]]
+
+        tokens = set(tokenize(query))
+        if not tokens:
+            return []
+        query_weights = {token: self._idf[token] for token in tokens if token in self._idf}
+        # Unknown query words still count against the match
+        query_norm = math.sqrt(
+            sum(w ** 2 for w in query_weights.values())
+            + sum(math.log(1 + len(self.entries)) ** 2 for token in tokens if token not in self._idf)
+        ) or 1.0
+
+        scores: Dict[int, float] = defaultdict(float)
+        for token, weight in query_weights.items():
+            for position, doc_weight in self._postings[token]:
+                scores[position] += weight / query_norm * doc_weight
+
+        ranked = sorted(
+            ((score * self._age_penalty(position, age_months), position) for position, score in scores.items()),
+            reverse=True,
+        )
+        return [(round(score, 4), self.entries[position]) for score, position in ranked[:limit]]
+
+
+class KnowledgeBaseRouter:
+    """Decides between a knowledge-base answer and the LLM, and reports the split"""
+
+    def __init__(self, index: Optional[KnowledgeBaseIndex] = None, threshold: float = None):
+        self.index = index
+        if threshold is None:
+            threshold = float(os.environ.get("KB_ROUTER_THRESHOLD", DEFAULT_CONFIDENCE_THRESHOLD))
+        self.threshold = threshold
+        self.kb_answers = 0
+        self.llm_escalations = 0
+        self.urgent_escalations = 0
+        self.kb_seconds = 0.0
+        self.llm_seconds = 0.0
+        self.llm_tokens = 0
+        self.llm_calls_measured = 0
+
+    def load(self, directory: Path = KNOWLEDGE_BASE_DIR, files: Dict[str, str] = None) -> "KnowledgeBaseRouter":
+        self.index = KnowledgeBaseIndex.load(directory, files)
+        return self
+
+    def route(self, message: str, age_months: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """
+        Return a knowledge-base answer when the best match clears the threshold,
+        otherwise None (the caller escalates to the LLM and reports it via record_llm).
+        Urgent messages (see is_urgent) always escalate.
+        """
+        if is_urgent(message):
+            self.urgent_escalations += 1
+            self.llm_escalations += 1
+            return None
+        started = time.perf_counter()
+        matches = self.index.search(message, age_months, limit=1) if self.index else []
+        elapsed = time.perf_counter() - started
+
+        if matches and matches[0][0] >= self.threshold:
+            confidence, entry = matches[0]
+            self.kb_answers += 1
+            self.kb_seconds += elapsed
+            return {
+                "answer": format_answer(entry),
+                "confidence": confidence,
+                "entry": entry,
+            }
+        self.llm_escalations += 1
+        return None
+
+    def record_llm(self, seconds: float, tokens: int = 0):
+        """Record the cost of an escalated message - only call it for real provider calls, not cache hits"""
+        self.llm_seconds += seconds
+        self.llm_tokens += tokens
+        self.llm_calls_measured += 1
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.kb_answers + self.llm_escalations
+        avg_llm_seconds = self.llm_seconds / self.llm_calls_measured if self.llm_calls_measured else None
+        avg_llm_tokens = self.llm_tokens / self.llm_calls_measured if self.llm_calls_measured else None
+        return {
+            "threshold": self.threshold,
+            "indexed_entries": len(self.index.entries) if self.index else 0,
+            "messages": total,
+            "knowledge_base": self.kb_answers,
+            "llm": self.llm_escalations,
+            "urgent_escalations": self.urgent_escalations,
+            "llm_provider_calls": self.llm_calls_measured,
+            "knowledge_base_share": round(self.kb_answers / total, 4) if total else 0.0,
+            "avg_kb_ms": round(self.kb_seconds / self.kb_answers * 1000, 3) if self.kb_answers else None,
+            "avg_llm_seconds": round(avg_llm_seconds, 3) if avg_llm_seconds is not None else None,
+            "estimated_llm_seconds_saved": round(self.kb_answers * avg_llm_seconds, 1) if avg_llm_seconds else None,
+            "estimated_tokens_saved": int(self.kb_answers * avg_llm_tokens) if avg_llm_tokens else None,
+        }
+
+
+def format_answer(entry: Dict[str, Any]) -> str:
+    return (
+        f"**{entry.get('category', 'General Parenting')}** ({entry.get('age_range', 'All ages')})\n\n"
+        f"{entry.get('answer', '')}\n\n"
+        "Consult your pediatrician for personalized medical advice."
+    )
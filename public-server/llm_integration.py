@@ -0,0 +1,86 @@
+"""
+Lazy loader for the LLM integration
+emergentintegrations pulls in litellm, openai and the Google SDKs: seconds of
+imports that a scale-to-zero instance would otherwise pay on every wake-up
+before it can answer anything. The stack is imported once, on first use, in a
+worker thread (app.py also warms it in the background after startup), so cold
+starts and the event loop never wait on it.
+"""
+import logging
+import os
+import threading
+import time
+from typing import NamedTuple, Optional
+
+from anyio import to_thread
+
+logger = logging.getLogger("babysteps")
+
+
+class LlmIntegration(NamedTuple):
+    LlmChat: type
+    UserMessage: type
+    available: bool
+    load_ms: float
+
+
+class UnavailableChat:
+    """Stand-in when emergentintegrations is not installed"""
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def with_model(self, *args, **kwargs):
+        return self
+
+    async def send_message(self, message):
+        return "AI service temporarily unavailable. Please try again later."
+
+
+class UnavailableMessage:
+    def __init__(self, text):
+        self.text = text
+
+
+_lock = threading.Lock()
+_integration: Optional[LlmIntegration] = None
+
+
+def _import() -> LlmIntegration:
+    started = time.perf_counter()
+    try:
+        if os.getenv("LLM_STUB_URL"):
+            # Local stand-in provider for offline load and latency testing (backend/llm_stub_server.py)
+            from llm_stub_client import LlmChat, UserMessage
+            logger.info("Using local LLM stub", extra={"url": os.getenv("LLM_STUB_URL")})
+        else:
+            from emergentintegrations.llm.chat import LlmChat, UserMessage
+        available = True
+    except ImportError:
+        LlmChat, UserMessage, available = UnavailableChat, UnavailableMessage, False
+    load_ms = round((time.perf_counter() - started) * 1000, 1)
+    if available:
+        logger.info("AI integration loaded", extra={"load_ms": load_ms})
+    else:
+        logger.warning("AI integration not available - using fallback responses")
+    return LlmIntegration(LlmChat, UserMessage, available, load_ms)
+
+
+def load_llm_integration_sync() -> LlmIntegration:
+    global _integration
+    if _integration is None:
+        with _lock:
+            if _integration is None:
+                _integration = _import()
+    return _integration
+
+
+async def load_llm_integration() -> LlmIntegration:
+    """The integration classes, importing them in a worker thread the first time"""
+    if _integration is not None:
+        return _integration
+    return await to_thread.run_sync(load_llm_integration_sync)
+
+
+def llm_integration_loaded() -> Optional[LlmIntegration]:
+    return _integration
@@ -0,0 +1,255 @@
+"""
+Per-call LLM instrumentation
+Every provider call is wrapped in LLMMetrics.track(), which records queue
+wait, time to first token, total latency, prompt/completion tokens, model and
+outcome. Calls feed Prometheus-style histograms (prometheus()) and a rolling
+per-endpoint summary with latency percentiles and estimated cost (summary()).
+
+Non-streaming calls receive their first token with the full response, so
+their time to first token equals total latency unless report_first_token()
+is called. Mirrors backend/llm_metrics.py - public-server deploys on its own
+and cannot import from backend/.
+"""
+import asyncio
+import contextvars
+import json
+import math
+import os
+import time
+from collections import defaultdict, deque
+from contextlib import asynccontextmanager
+from typing import Any, Deque, Dict, Optional, Tuple
+
+from histogram import Histogram
+
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0)
+TOKEN_BUCKETS = (50, 100, 250, 500, 1000, 2000, 4000, 8000, 16000)
+
+# USD per 1M (prompt, completion) tokens; override with LLM_PRICES='{"gpt-5": [1.25, 10]}'
+DEFAULT_PRICES = {
+    "gpt-5": (1.25, 10.0),
+    "gpt-5-nano": (0.05, 0.40),
+    "gpt-4o-mini": (0.15, 0.60),
+}
+
+_current_call: contextvars.ContextVar = contextvars.ContextVar("llm_current_call", default=None)
+_enqueued_at: contextvars.ContextVar = contextvars.ContextVar("llm_enqueued_at", default=None)
+
+
+def estimate_tokens(*texts: str) -> int:
+    """Rough token estimate (~4 characters per token) for providers without usage data"""
+    return sum(math.ceil(len(text or "") / 4) for text in texts)
+
+
+def mark_enqueued(at: Optional[float] = None):
+    """Mark when the current request started waiting (time.monotonic()) - queue wait is measured from here"""
+    _enqueued_at.set(time.monotonic() if at is None else at)
+
+
+def report_usage(prompt_tokens: int, completion_tokens: int):
+    """Report provider token usage from inside a tracked call"""
+    call = _current_call.get()
+    if call is not None:
+        call.prompt_tokens = prompt_tokens
+        call.completion_tokens = completion_tokens
+
+
+def report_first_token():
+    """Mark the first streamed token of a tracked call"""
+    call = _current_call.get()
+    if call is not None and call.first_token_at is None:
+        call.first_token_at = time.monotonic()
+
+
+class LLMCall:
+    def __init__(self, endpoint: str, model: str, queued_at: float):
+        self.endpoint = endpoint
+        self.model = model
+        self.queued_at = queued_at
+        self.started_at = time.monotonic()
+        self.first_token_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.prompt_tokens: Optional[int] = None
+        self.completion_tokens: Optional[int] = None
+        self.outcome: Optional[str] = None
+
+    def usage(self, prompt_tokens: int, completion_tokens: int):
+        self.prompt_tokens = prompt_tokens
+        self.completion_tokens = completion_tokens
+
+    @property
+    def queue_seconds(self) -> float:
+        return max(self.started_at - self.queued_at, 0.0)
+
+    @property
+    def total_seconds(self) -> float:
+        return (self.finished_at or time.monotonic()) - self.started_at
+
+    @property
+    def ttft_seconds(self) -> float:
+        return (self.first_token_at or self.finished_at or time.monotonic()) - self.started_at
+
+
+def _percentile(values, pct: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return round(ordered[min(len(ordered) - 1, int(len(ordered) * pct))], 3)
+
+
+class LLMMetrics:
+    def __init__(self, window_seconds: int = 300, prices: Dict[str, Tuple[float, float]] = None):
+        self.window_seconds = window_seconds
+        self.prices = dict(DEFAULT_PRICES)
+        self.prices.update(prices or {})
+        self._histograms: Dict[Tuple[str, str, str], Histogram] = {}
+        self._calls: Dict[Tuple[str, str, str], int] = defaultdict(int)
+        self._tokens: Dict[Tuple[str, str, str], int] = defaultdict(int)
+        self._cost: Dict[Tuple[str, str], float] = defaultdict(float)
+        self._recent: Deque[Dict[str, Any]] = deque(maxlen=10000)
+
+    @classmethod
+    def from_env(cls) -> "LLMMetrics":
+        prices = {model: tuple(price) for model, price in json.loads(os.environ.get("LLM_PRICES", "{}")).items()}
+        return cls(
+            window_seconds=int(os.environ.get("LLM_METRICS_WINDOW_SECONDS", 300)),
+            prices=prices,
+        )
+
+    @asynccontextmanager
+    async def track(self, endpoint: str, model: str, queued_at: Optional[float] = None):
+        """
+        Time one provider call. Queue wait runs from mark_enqueued() (or
+        ``queued_at``) to entering the block. Set ``call.outcome`` before
+        raising to override the default error/timeout classification.
+        """
+        enqueued = _enqueued_at.get()
+        candidates = [at for at in (enqueued, queued_at) if at is not None]
+        call = LLMCall(endpoint, model, min(candidates) if candidates else time.monotonic())
+        token = _current_call.set(call)
+        try:
+            yield call
+        except asyncio.CancelledError:
+            call.outcome = call.outcome or "cancelled"
+            raise
+        except asyncio.TimeoutError:
+            call.outcome = call.outcome or "timeout"
+            raise
+        except Exception:
+            call.outcome = call.outcome or "error"
+            raise
+        else:
+            call.outcome = call.outcome or "success"
+        finally:
+            _current_call.reset(token)
+            call.finished_at = time.monotonic()
+            self.record(call)
+
+    def cost(self, model: str, prompt_tokens: int, completion_tokens: int) -> float:
+        prompt_price, completion_price = self.prices.get(model, (0.0, 0.0))
+        return (prompt_tokens * prompt_price + completion_tokens * completion_price) / 1_000_000
+
+    def _histogram(self, name: str, endpoint: str, model: str, buckets) -> Histogram:
+        key = (name, endpoint, model)
+        if key not in self._histograms:
+            self._histograms[key] = Histogram(buckets)
+        return self._histograms[key]
+
+    def record(self, call: LLMCall):
+        self._calls[(call.endpoint, call.model, call.outcome)] += 1
+        # Rejected calls never reached the provider - keep them out of the latency histograms
+        if call.outcome == "rejected":
+            return
+
+        prompt_tokens = call.prompt_tokens or 0
+        completion_tokens = call.completion_tokens or 0
+        cost = self.cost(call.model, prompt_tokens, completion_tokens)
+        self._histogram("queue_wait_seconds", call.endpoint, call.model, LATENCY_BUCKETS).observe(call.queue_seconds)
+        self._histogram("ttft_seconds", call.endpoint, call.model, LATENCY_BUCKETS).observe(call.ttft_seconds)
+        self._histogram("latency_seconds", call.endpoint, call.model, LATENCY_BUCKETS).observe(call.total_seconds)
+        if call.outcome == "success":
+            self._histogram("prompt_tokens", call.endpoint, call.model, TOKEN_BUCKETS).observe(prompt_tokens)
+            self._histogram("completion_tokens", call.endpoint, call.model, TOKEN_BUCKETS).observe(completion_tokens)
+        self._tokens[(call.endpoint, call.model, "prompt")] += prompt_tokens
+        self._tokens[(call.endpoint, call.model, "completion")] += completion_tokens
+        self._cost[(call.endpoint, call.model)] += cost
+        self._recent.append({
+            "at": call.finished_at,
+            "endpoint": call.endpoint,
+            "model": call.model,
+            "outcome": call.outcome,
+            "queue": call.queue_seconds,
+            "ttft": call.ttft_seconds,
+            "total": call.total_seconds,
+            "tokens": prompt_tokens + completion_tokens,
+            "cost": cost,
+        })
+
+    def prometheus(self) -> str:
+        """Prometheus text exposition of the LLM counters and histograms"""
+        lines = [
+            "# HELP llm_calls_total LLM provider calls by outcome",
+            "# TYPE llm_calls_total counter",
+        ]
+        for (endpoint, model, outcome), count in sorted(self._calls.items()):
+            lines.append(f'llm_calls_total{{endpoint="{endpoint}",model="{model}",outcome="{outcome}"}} {count}')
+        lines += ["# HELP llm_tokens_total LLM tokens by kind", "# TYPE llm_tokens_total counter"]
+        for (endpoint, model, kind), count in sorted(self._tokens.items()):
+            lines.append(f'llm_tokens_total{{endpoint="{endpoint}",model="{model}",kind="{kind}"}} {count}')
+        lines += ["# HELP llm_cost_usd_total Estimated LLM spend", "# TYPE llm_cost_usd_total counter"]
+        for (endpoint, model), cost in sorted(self._cost.items()):
+            lines.append(f'llm_cost_usd_total{{endpoint="{endpoint}",model="{model}"}} {cost:.6f}')
+
+        names = sorted({name for name, _, _ in self._histograms})
+        for name in names:
+            lines += [f"# HELP llm_{name} LLM call {name.replace('_', ' ')}", f"# TYPE llm_{name} histogram"]
+            for (hist_name, endpoint, model), histogram in sorted(self._histograms.items()):
+                if hist_name != name:
+                    continue
+                labels = f'endpoint="{endpoint}",model="{model}"'
+                cumulative = 0
+                for bound, count in zip(histogram.buckets, histogram.counts):
+                    cumulative += count
+                    lines.append(f'llm_{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+                lines.append(f'llm_{name}_bucket{{{labels},le="+Inf"}} {histogram.count}')
+                lines.append(f"llm_{name}_sum{{{labels}}} {histogram.sum:.6f}")
+                lines.append(f"llm_{name}_count{{{labels}}} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+    def summary(self) -> Dict[str, Any]:
+        """Rolling per-endpoint summary over the last ``window_seconds``"""
+        cutoff = time.monotonic() - self.window_seconds
+        recent = [call for call in self._recent if call["at"] >= cutoff]
+        total_seconds = sum(call["total"] for call in recent)
+        total_cost = sum(call["cost"] for call in recent)
+
+        by_endpoint: Dict[str, list] = defaultdict(list)
+        for call in recent:
+            by_endpoint[call["endpoint"]].append(call)
+
+        endpoints = {}
+        for endpoint, calls in sorted(by_endpoint.items()):
+            latencies = [call["total"] for call in calls]
+            seconds = sum(latencies)
+            cost = sum(call["cost"] for call in calls)
+            endpoints[endpoint] = {
+                "calls": len(calls),
+                "models": sorted({call["model"] for call in calls}),
+                "error_rate": round(sum(1 for call in calls if call["outcome"] != "success") / len(calls), 4),
+                "latency_p50": _percentile(latencies, 0.5),
+                "latency_p95": _percentile(latencies, 0.95),
+                "ttft_p95": _percentile([call["ttft"] for call in calls], 0.95),
+                "queue_wait_avg": round(sum(call["queue"] for call in calls) / len(calls), 3),
+                "tokens": sum(call["tokens"] for call in calls),
+                "cost_usd": round(cost, 6),
+                "llm_seconds": round(seconds, 3),
+                "share_of_llm_seconds": round(seconds / total_seconds, 4) if total_seconds else 0.0,
+                "share_of_cost": round(cost / total_cost, 4) if total_cost else 0.0,
+            }
+        return {
+            "window_seconds": self.window_seconds,
+            "calls": len(recent),
+            "llm_seconds": round(total_seconds, 3),
+            "cost_usd": round(total_cost, 6),
+            "endpoints": endpoints,
+        }
@@ -0,0 +1,82 @@
+"""
+LlmChat-compatible client for the local stand-in provider (backend/llm_stub_server.py)
+Selected instead of emergentintegrations when LLM_STUB_URL is set. Set
+LLM_STUB_STREAM=true to stream responses, which lets llm_metrics record a
+real time to first token.
+"""
+import asyncio
+import json
+import os
+from typing import Optional
+
+import httpx
+
+from llm_metrics import report_first_token
+
+_http: Optional[httpx.AsyncClient] = None
+_http_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def stub_url() -> Optional[str]:
+    return os.environ.get("LLM_STUB_URL") or None
+
+
+def _client() -> httpx.AsyncClient:
+    # One pooled client per event loop, like a real provider SDK
+    global _http, _http_loop
+    loop = asyncio.get_running_loop()
+    if _http is None or _http_loop is not loop:
+        _http_loop = loop
+        _http = httpx.AsyncClient(
+            base_url=stub_url() or "http://127.0.0.1:8900",
+            timeout=float(os.environ.get("LLM_STUB_TIMEOUT_SECONDS", 120)),
+            limits=httpx.Limits(max_connections=int(os.environ.get("LLM_STUB_MAX_CONNECTIONS", 100))),
+        )
+    return _http
+
+
+class UserMessage:
+    def __init__(self, text: str):
+        self.text = text
+
+
+class LlmChat:
+    """Same construction and send_message() surface as emergentintegrations' LlmChat"""
+
+    def __init__(self, api_key: str = None, session_id: str = None, system_message: str = ""):
+        self.session_id = session_id
+        self.system_message = system_message
+        self.model = "gpt-5"
+
+    def with_model(self, provider: str, model: str) -> "LlmChat":
+        self.model = model
+        return self
+
+    async def send_message(self, message: UserMessage) -> str:
+        body = {
+            "model": self.model,
+            "messages": [
+                {"role": "system", "content": self.system_message},
+                {"role": "user", "content": message.text},
+            ],
+        }
+        if os.environ.get("LLM_STUB_STREAM", "false").lower() in ("1", "true", "yes"):
+            return await self._stream(body)
+
+        response = await _client().post("/v1/chat/completions", json=body)
+        response.raise_for_status()
+        return response.json()["choices"][0]["message"]["content"]
+
+    async def _stream(self, body: dict) -> str:
+        parts = []
+        async with _client().stream("POST", "/v1/chat/completions", json={**body, "stream": True}) as response:
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                if not line.startswith("data: ") or line == "data: [DONE]":
+                    continue
+                for choice in json.loads(line[6:]).get("choices", []):
+                    content = choice.get("delta", {}).get("content")
+                    if content:
+                        report_first_token()
+                        parts.append(content)
+        return "".join(parts)
@@ -2,6 +2,7 @@
 """
 Database migration script to add missing columns to PostgreSQL
 Run this ONCE on the production database
+Superseded by migrations.py (migration 001), which init_database() applies on startup
 """
 import os
 import psycopg2
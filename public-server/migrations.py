@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+Versioned schema migrations for the public server
+Applied migrations are recorded in the schema_migrations table, so running
+this again is a no-op. Every migration is also written to be idempotent on its
+own (IF NOT EXISTS, column checks), so a database that was patched by the old
+one-off scripts converges to the same schema.
+
+Runs from init_database() on startup, where an up-to-date schema costs one
+query (set DB_MIGRATE_ON_STARTUP=false to run it only as a deploy step), or by hand:
+    python migrations.py            # apply pending migrations
+    python migrations.py --status   # list applied / pending versions
+
+On Postgres a session advisory lock serializes concurrent runs from several
+instances, and indexes are built CONCURRENTLY so activities stays writable.
+"""
+import sys
+import time
+from datetime import datetime
+
+from sqlalchemy import bindparam, inspect, text
+from sqlalchemy.exc import OperationalError, ProgrammingError
+
+SCHEMA_TABLE = "schema_migrations"
+ADVISORY_LOCK_KEY = 4207313  # arbitrary, shared by every instance of this app
+
+
+class Migration:
+    def __init__(self, version: int, name: str, upgrade, transactional: bool = True):
+        self.version = version
+        self.name = name
+        self.upgrade = upgrade
+        # CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+        self.transactional = transactional
+
+
+def add_missing_columns(connection):
+    """Add model columns missing from existing tables (replaces migrate_database.py and
+    add_breast_columns_migration.py) and fix the legacy VARCHAR activities.timestamp"""
+    from database import Base
+
+    inspector = inspect(connection)
+    for table in Base.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name not in existing:
+                column_type = column.type.compile(dialect=connection.dialect)
+                connection.execute(text(f'ALTER TABLE {table.name} ADD COLUMN "{column.name}" {column_type}'))
+                print(f"   ➕ {table.name}.{column.name} {column_type}")
+
+    if connection.dialect.name == "postgresql":
+        current_type = connection.execute(text(
+            "SELECT data_type FROM information_schema.columns "
+            "WHERE table_name = 'activities' AND column_name = 'timestamp'"
+        )).scalar()
+        if current_type and current_type != "timestamp without time zone":
+            connection.execute(text(
+                'ALTER TABLE activities ALTER COLUMN "timestamp" TYPE TIMESTAMP '
+                'USING "timestamp"::timestamp without time zone'
+            ))
+            print("   🔁 activities.timestamp converted to TIMESTAMP")
+
+
+# Rows per keyset batch when copying activity details
+DETAILS_BATCH_SIZE = 1000
+
+
+def _legacy_detail_columns(connection):
+    from database import ACTIVITY_DETAIL_FIELDS
+
+    existing = {column["name"] for column in inspect(connection).get_columns("activities")}
+    return existing, [name for name in ACTIVITY_DETAIL_FIELDS if name in existing]
+
+
+def _copy_legacy_details(connection, legacy) -> int:
+    """
+    Copy set legacy columns into details for rows that have no details yet,
+    in keyset batches by id so the table is never loaded whole. Rows already
+    copied are skipped, so an interrupted run resumes where it stopped.
+    """
+    from database import Activity
+
+    table = Activity.__table__
+    quoted = ", ".join(f'"{name}"' for name in legacy)
+    any_set = " OR ".join(f'"{name}" IS NOT NULL' for name in legacy)
+    select = text(
+        f"SELECT id, {quoted} FROM activities WHERE id > :after AND details IS NULL AND ({any_set}) "
+        "ORDER BY id LIMIT :batch_size"
+    )
+    update = table.update().where(table.c.id == bindparam("activity_id")).values(details=bindparam("payload"))
+    copied, after = 0, ""
+    while True:
+        rows = connection.execute(select, {"after": after, "batch_size": DETAILS_BATCH_SIZE}).fetchall()
+        if not rows:
+            return copied
+        connection.execute(update, [
+            {"activity_id": row[0], "payload": {
+                name: value for name, value in zip(legacy, row[1:]) if value is not None
+            }}
+            for row in rows
+        ])
+        copied += len(rows)
+        after = rows[-1][0]
+
+
+def copy_activity_details(connection):
+    """
+    Expand step: add details and copy the sparse type-specific activity columns
+    into it. The legacy columns stay, so instances still on the previous release
+    keep working during a rolling deploy; drop_legacy_activity_columns removes
+    them a release later.
+    """
+    from database import Activity
+
+    existing, legacy = _legacy_detail_columns(connection)
+    if "details" not in existing:
+        column_type = Activity.__table__.c.details.type.compile(dialect=connection.dialect)
+        connection.execute(text(f"ALTER TABLE activities ADD COLUMN details {column_type}"))
+    if legacy:
+        print(f"   📦 {_copy_legacy_details(connection, legacy)} activities copied to details")
+
+
+def drop_legacy_activity_columns(connection):
+    """
+    Contract step for copy_activity_details: catch up rows written by old
+    instances after the copy, then drop the legacy columns
+    """
+    _, legacy = _legacy_detail_columns(connection)
+    if not legacy:
+        return
+    print(f"   📦 {_copy_legacy_details(connection, legacy)} late activities copied to details")
+    for name in legacy:
+        connection.execute(text(f'ALTER TABLE activities DROP COLUMN "{name}"'))
+
+
+def create_index(name: str, table: str, columns: str):
+    def upgrade(connection):
+        if connection.dialect.name != "postgresql":
+            connection.execute(text(f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({columns})"))
+            return
+        # A failed concurrent build leaves an INVALID index behind that IF NOT EXISTS would keep
+        valid = connection.execute(text(
+            "SELECT i.indisvalid FROM pg_class c JOIN pg_index i ON i.indexrelid = c.oid WHERE c.relname = :name"
+        ), {"name": name}).scalar()
+        if valid is False:
+            connection.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {name}"))
+        connection.execute(text(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {table} ({columns})"))
+
+    return upgrade
+
+
+MIGRATIONS = [
+    Migration(1, "add_missing_columns", add_missing_columns),
+    # GET /api/activities: WHERE user_id [AND baby_id] [AND type] ORDER BY timestamp DESC
+    Migration(2, "ix_activities_user_baby_type_ts", create_index(
+        "ix_activities_user_baby_type_ts", "activities", 'user_id, baby_id, type, "timestamp" DESC'
+    ), transactional=False),
+    # Per-baby timelines regardless of user or type
+    Migration(3, "ix_activities_baby_ts", create_index(
+        "ix_activities_baby_ts", "activities", 'baby_id, "timestamp" DESC'
+    ), transactional=False),
+    # Autocommit so each copied batch commits on its own instead of one long transaction
+    Migration(4, "copy_activity_details", copy_activity_details, transactional=False),
+]
+
+# Contract migrations ship a release after the expand step they finish, once no
+# running instance reads the columns they drop; move them into MIGRATIONS then.
+LATER_MIGRATIONS = [
+    Migration(5, "drop_legacy_activity_columns", drop_legacy_activity_columns),
+]
+
+
+def _ensure_schema_table(engine):
+    with engine.begin() as connection:
+        connection.execute(text(
+            f"CREATE TABLE IF NOT EXISTS {SCHEMA_TABLE} ("
+            "version INTEGER PRIMARY KEY, name VARCHAR NOT NULL, applied_at TIMESTAMP NOT NULL)"
+        ))
+        return {row[0] for row in connection.execute(text(f"SELECT version FROM {SCHEMA_TABLE}"))}
+
+
+def _record(connection, migration: Migration):
+    connection.execute(
+        text(f"INSERT INTO {SCHEMA_TABLE} (version, name, applied_at) VALUES (:version, :name, :applied_at)"),
+        {"version": migration.version, "name": migration.name, "applied_at": datetime.utcnow()},
+    )
+
+
+def _statement_timeout(connection, value: str):
+    # The pool profile sets DB_STATEMENT_TIMEOUT_MS for requests; schema changes may take longer
+    if connection.dialect.name == "postgresql":
+        connection.execute(text(f"SET statement_timeout = {value}"))
+
+
+def _apply(engine, migration: Migration):
+    if migration.transactional:
+        with engine.begin() as connection:
+            _statement_timeout(connection, "0")
+            migration.upgrade(connection)
+            _record(connection, migration)
+            _statement_timeout(connection, "DEFAULT")
+        return
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        _statement_timeout(connection, "0")
+        try:
+            migration.upgrade(connection)
+            _record(connection, migration)
+        finally:
+            # Pooled connection goes back to serving requests
+            _statement_timeout(connection, "DEFAULT")
+
+
+def migrate(engine, migrations=None):
+    """Apply pending migrations in version order; returns the names applied"""
+    migrations = sorted(migrations or MIGRATIONS, key=lambda m: m.version)
+    # Autocommit so the lock holder never sits idle in a transaction that CONCURRENTLY would wait on
+    lock = (
+        engine.connect().execution_options(isolation_level="AUTOCOMMIT")
+        if engine.dialect.name == "postgresql" else None
+    )
+    try:
+        if lock is not None:
+            lock.execute(text("SELECT pg_advisory_lock(:key)"), {"key": ADVISORY_LOCK_KEY})
+        applied = _ensure_schema_table(engine)
+        ran = []
+        for migration in migrations:
+            if migration.version in applied:
+                continue
+            started = time.perf_counter()
+            _apply(engine, migration)
+            print(f"✅ Migration {migration.version:03d} {migration.name} applied "
+                  f"in {time.perf_counter() - started:.2f}s")
+            ran.append(migration.name)
+        if not ran:
+            print(f"✅ Schema up to date (version {max(applied, default=0)})")
+        return ran
+    finally:
+        if lock is not None:
+            lock.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": ADVISORY_LOCK_KEY})
+            lock.close()
+
+
+def pending_migrations(engine):
+    """Versions not yet applied; a single query once the schema table exists"""
+    try:
+        with engine.connect() as connection:
+            applied = {row[0] for row in connection.execute(text(f"SELECT version FROM {SCHEMA_TABLE}"))}
+    except (OperationalError, ProgrammingError):
+        return [m.version for m in MIGRATIONS]  # fresh database: no schema table yet
+    return sorted(m.version for m in MIGRATIONS if m.version not in applied)
+
+
+def status(engine):
+    applied = _ensure_schema_table(engine)
+    return [(m.version, m.name, m.version in applied) for m in sorted(MIGRATIONS, key=lambda m: m.version)]
+
+
+if __name__ == "__main__":
+    from database import Base, engine
+
+    Base.metadata.create_all(bind=engine)
+    if "--status" in sys.argv:
+        for version, name, done in status(engine):
+            print(f"{'✅' if done else '⏳'} {version:03d} {name}")
+    else:
+        migrate(engine)
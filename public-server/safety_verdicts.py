@@ -0,0 +1,63 @@
+"""
+Food-safety answer classification
+Reads a free-text safety answer (LLM output or a curated knowledge-base
+answer) as safe, caution or avoid. Used by the food verdict store and, as a
+copy, by public-server's food research endpoint. Mirrors
+backend/safety_verdicts.py - public-server deploys on its own and cannot
+import from backend/.
+"""
+import re
+from typing import Optional
+
+SAFE = "safe"
+CAUTION = "caution"
+AVOID = "avoid"
+# Conflicting sources resolve to the most conservative verdict
+SEVERITY = {SAFE: 0, CAUTION: 1, AVOID: 2}
+
+_LABEL = re.compile(r"^\W*(not safe|unsafe|avoid|safe with caution|caution|safe)\b")
+_LEADING_NO = re.compile(r"^\W*no\b")
+_LEADING_YES = re.compile(r"^\W*(yes|introduce|offer|start|serve)\b")
+_NEGATIVE = re.compile(
+    r"\b(not safe|unsafe|(?<!to )avoid|too young|do not|don't|should not|shouldn't|"
+    r"not recommended|never (?:be )?(?:give|given|offered|fed)|not until|not before|wait until)\b"
+)
+_SAFE = re.compile(r"(?<!not )\b(?:safe|fine|okay)\b")
+_CAUTION_HINTS = re.compile(
+    r"\b(only|once|after|if|as long as|make sure|ensure|cut|mash|thin|cooked|thoroughly|supervise|"
+    r"small amounts?|in moderation|choking|allerg\w*)\b"
+)
+
+
+def parse_verdict(text: str) -> Optional[str]:
+    """
+    Classify a safety answer as safe, caution or avoid, or None when unclear.
+    Matches whole words only - the old substring test treated "know" and
+    "note" as "no". A leading label or yes/no decides; otherwise a negative
+    phrase means avoid, unless the answer already called the food safe or
+    qualified it, which makes the negative a caveat ("safe around 6 months;
+    avoid raw yolks").
+    """
+    lowered = " ".join((text or "").lower().replace("’", "'").split())
+    label = _LABEL.match(lowered)
+    if label:
+        word = label.group(1)
+        if word in ("not safe", "unsafe", "avoid"):
+            return AVOID
+        return CAUTION if "caution" in word else SAFE
+    if _LEADING_NO.match(lowered):
+        return AVOID
+    if _LEADING_YES.match(lowered):
+        return CAUTION if _CAUTION_HINTS.search(lowered) else SAFE
+    negative = _NEGATIVE.search(lowered)
+    if negative:
+        # "Only pasteurized varieties; avoid unpasteurized" qualifies a yes
+        qualified = _SAFE.search(lowered, 0, negative.start()) or _CAUTION_HINTS.search(lowered, 0, negative.start())
+        return CAUTION if qualified else AVOID
+    if _SAFE.search(lowered):
+        return CAUTION if _CAUTION_HINTS.search(lowered) else SAFE
+    return None
+
+
+def is_safe(verdict: Optional[str]) -> bool:
+    return verdict in (SAFE, CAUTION)
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Read/write concurrency benchmark for the local SQLite profile
+Worker threads share one engine and run a mix of the two hot statements: the
+recent-activities read behind GET /api/activities and a single-activity insert
+with its own commit. Each mix runs against the old setup (rollback journal,
+default synchronous, no busy timeout beyond the driver's) and the tuned profile
+from db_pool.apply_sqlite_profile (WAL, synchronous=NORMAL, mmap, busy
+timeout), each on a fresh database file seeded with the same history.
+
+Reports throughput, p50/p95 latency per operation kind and "database is locked"
+failures. Write throughput depends heavily on the disk (fsync cost), so compare
+profiles on the same machine.
+
+Usage:
+    python sqlite_profile_benchmark.py --threads 8 --seconds 5 --mixes 95,80,50
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.exc import OperationalError
+
+from database import Activity, Base
+from db_pool import apply_sqlite_profile, pool_options
+
+BABIES = [f"bench-baby-{index}" for index in range(4)]
+
+
+def _percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[max(0, int(len(ordered) * fraction) - 1)] if ordered else 0.0
+
+
+def make_engine(path, tuned):
+    url = f"sqlite:///{path}"
+    if not tuned:
+        # The setup before the profile: default journal and sync, the driver's 5s lock wait
+        return create_engine(url, connect_args={"check_same_thread": False})
+    return apply_sqlite_profile(create_engine(url, **pool_options(url)))
+
+
+def seed(engine, rows):
+    Base.metadata.create_all(bind=engine)
+    start = datetime(2025, 1, 1)
+    with engine.begin() as connection:
+        connection.execute(insert(Activity.__table__), [
+            {
+                "id": f"seed-{index}", "type": "feeding" if index % 2 else "diaper",
+                "baby_id": BABIES[index % len(BABIES)], "user_id": "bench",
+                "timestamp": start + timedelta(minutes=index), "details": {"amount": 4.0},
+            }
+            for index in range(rows)
+        ])
+
+
+def read_recent(connection, baby_id):
+    table = Activity.__table__
+    connection.execute(
+        select(table.c.id, table.c.type, table.c.timestamp, table.c.details)
+        .where(table.c.user_id == "bench", table.c.baby_id == baby_id)
+        .order_by(table.c.timestamp.desc())
+        .limit(50)
+    ).all()
+
+
+def write_one(connection, baby_id):
+    connection.execute(insert(Activity.__table__).values(
+        id=str(uuid.uuid4()), type="feeding", baby_id=baby_id, user_id="bench",
+        timestamp=datetime.utcnow(), details={"amount": 3.5},
+    ))
+    connection.commit()
+
+
+def run_mix(engine, read_percent, threads, seconds):
+    latencies = {"read": [], "write": []}
+    locked = {"read": 0, "write": 0}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + seconds
+
+    def worker(seed_value):
+        chooser = random.Random(seed_value)
+        while time.perf_counter() < deadline:
+            kind = "read" if chooser.random() * 100 < read_percent else "write"
+            baby_id = chooser.choice(BABIES)
+            started = time.perf_counter()
+            try:
+                with engine.connect() as connection:
+                    (read_recent if kind == "read" else write_one)(connection, baby_id)
+            except OperationalError as error:
+                if "locked" not in str(error):
+                    raise
+                with lock:
+                    locked[kind] += 1
+                continue
+            with lock:
+                latencies[kind].append(time.perf_counter() - started)
+
+    workers = [threading.Thread(target=worker, args=(index,)) for index in range(threads)]
+    started = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    result = {"ops_per_second": sum(len(values) for values in latencies.values()) / elapsed}
+    for kind, values in latencies.items():
+        result[kind] = {
+            "count": len(values),
+            "p50_ms": statistics.median(values) * 1000 if values else 0.0,
+            "p95_ms": _percentile(values, 0.95) * 1000,
+            "locked": locked[kind],
+        }
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--mixes", default="95,80,50", help="read percentages to run, comma separated")
+    parser.add_argument("--rows", type=int, default=20000, help="activities seeded before each run")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        for read_percent in (int(value) for value in args.mixes.split(",")):
+            print(f"\n📊 {read_percent}% reads / {100 - read_percent}% writes, {args.threads} threads, {args.seconds:g}s")
+            for label, tuned in (("default", False), ("tuned", True)):
+                path = os.path.join(directory, f"{label}-{read_percent}.db")
+                engine = make_engine(path, tuned)
+                seed(engine, args.rows)
+                result = run_mix(engine, read_percent, args.threads, args.seconds)
+                engine.dispose()
+                read, write = result["read"], result["write"]
+                print(
+                    f"   {label:8s} {result['ops_per_second']:8.0f} ops/s | "
+                    f"read p50 {read['p50_ms']:6.2f}ms p95 {read['p95_ms']:7.2f}ms | "
+                    f"write p50 {write['p50_ms']:6.2f}ms p95 {write['p95_ms']:7.2f}ms | "
+                    f"locked {read['locked'] + write['locked']}"
+                )
+
+
+if __name__ == "__main__":
+    main()
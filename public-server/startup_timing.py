@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Startup timing for the public server
+On scale-to-zero hosts (Render free tier) every wake-up pays the import and
+init costs before the first request. app.py marks each phase on startup_timer;
+the report is logged once the app is ready and served at /api/startup.
+
+Run directly for an import-cost breakdown by top-level package (-X importtime):
+    python startup_timing.py [--top 15]
+"""
+import time
+from contextlib import contextmanager
+from typing import Any, Dict
+
+
+class StartupTimer:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self._last = self.started
+        self.phases: Dict[str, float] = {}
+
+    def mark(self, name: str):
+        """Close the phase that began at the previous mark"""
+        now = time.perf_counter()
+        self.phases[name] = round((now - self._last) * 1000, 1)
+        self._last = now
+
+    @contextmanager
+    def phase(self, name: str):
+        self._last = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.mark(name)
+
+    def report(self) -> Dict[str, Any]:
+        return {"phases_ms": dict(self.phases), "total_ms": round(sum(self.phases.values()), 1)}
+
+
+# Created by the first import in app.py, so "imports" is measured from there
+startup_timer = StartupTimer()
+
+
+def import_breakdown(module: str = "app") -> Dict[str, float]:
+    """Self import time in ms per top-level package for `import module` in a fresh interpreter"""
+    import os
+    import subprocess
+    import sys
+
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=os.path.dirname(os.path.abspath(__file__)), capture_output=True, text=True, check=True,
+    )
+    totals: Dict[str, float] = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, _cumulative, name = (part.strip() for part in line[len("import time:"):].split("|"))
+        package = name.split(".")[0]
+        totals[package] = totals.get(package, 0) + int(self_us) / 1000
+    return dict(sorted(totals.items(), key=lambda item: item[1], reverse=True))
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    breakdown = import_breakdown()
+    print(f"⏱️  import app: {sum(breakdown.values()):.0f}ms across {len(breakdown)} top-level packages")
+    for package, ms in list(breakdown.items())[:args.top]:
+        print(f"   {package:28s} {ms:8.1f}ms")
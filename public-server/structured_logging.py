@@ -0,0 +1,101 @@
+"""
+Structured, non-blocking logging for the public server
+Records are JSON lines (LOG_FORMAT=text for a readable local format) tagged with
+the ID of the request that emitted them; keyword `extra=` fields become JSON
+keys. Loggers only enqueue records: a QueueListener thread does the stdout
+I/O, so logging never blocks the event loop or a database worker thread.
+
+Environment:
+    LOG_LEVEL            root level (INFO)
+    LOG_FORMAT           json | text (json)
+    LOG_SAMPLE_RATE      fraction of successful access-log lines kept (1.0)
+    LOG_SLOW_REQUEST_MS  requests at least this slow are logged as WARNING
+                         and never sampled out (1000)
+"""
+import contextvars
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+from datetime import datetime, timezone
+from typing import Optional
+
+request_id_var: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("request_id", default=None)
+
+SLOW_REQUEST_MS = float(os.environ.get("LOG_SLOW_REQUEST_MS", 1000))
+
+# Attributes every LogRecord has; anything else on a record came from `extra=`
+_STANDARD_ATTRS = set(vars(logging.makeLogRecord({}))) | {"message", "asctime", "request_id"}
+
+
+def _extra_fields(record: logging.LogRecord) -> dict:
+    return {key: value for key, value in vars(record).items() if key not in _STANDARD_ATTRS and value is not None}
+
+
+class RequestContextFilter(logging.Filter):
+    """Stamps the current request ID on records; runs in the emitting thread"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id_var.get()
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """Keeps a `rate` fraction of records below WARNING"""
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return record.levelno >= logging.WARNING or self.rate >= 1.0 or random.random() < self.rate
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        if getattr(record, "request_id", None):
+            payload["request_id"] = record.request_id
+        payload.update(_extra_fields(record))
+        return json.dumps(payload, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        line = f"{self.formatTime(record)} {record.levelname:7s} {record.name}"
+        if getattr(record, "request_id", None):
+            line += f" [{record.request_id}]"
+        line += f" {record.getMessage()}"
+        fields = _extra_fields(record)
+        if fields:
+            line += " " + " ".join(f"{key}={value}" for key, value in fields.items())
+        return line
+
+
+def setup_logging() -> logging.handlers.QueueListener:
+    """Route the root logger through a queue; returns the started listener (stop() flushes)"""
+    stream = logging.StreamHandler(sys.stdout)
+    stream.setFormatter(TextFormatter() if os.environ.get("LOG_FORMAT", "json") == "text" else JsonFormatter())
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    queue_handler.addFilter(RequestContextFilter())
+
+    root = logging.getLogger()
+    for handler in [h for h in root.handlers if isinstance(h, logging.handlers.QueueHandler)]:
+        root.removeHandler(handler)  # from an earlier setup_logging() call
+    root.addHandler(queue_handler)
+    root.setLevel(os.environ.get("LOG_LEVEL", "INFO").upper())
+    logging.getLogger("babysteps.access").addFilter(SamplingFilter(float(os.environ.get("LOG_SAMPLE_RATE", 1.0))))
+
+    listener = logging.handlers.QueueListener(log_queue, stream, respect_handler_level=True)
+    listener.start()
+    return listener
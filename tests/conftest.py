@@ -0,0 +1,48 @@
+import os
+import sys
+import tempfile
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+
+ROOT_DIR = Path(__file__).parent.parent
+
+# Backend modules are imported flat (uvicorn runs from inside backend/)
+sys.path.insert(0, str(ROOT_DIR / "backend"))
+# public-server modules (db_pool, ...) without its app import side effects; appended
+# after backend so the shared copies (llm_metrics, llm_stub_client) resolve to backend's
+sys.path.append(str(ROOT_DIR / "public-server"))
+
+# public-server's database.py binds its engine at import time; never let tests
+# reach ./baby_steps.db or a DATABASE_URL from the developer's environment
+os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp(prefix='babysteps-tests-')}/public-server.db"
+
+
+@pytest.fixture(scope="session")
+def public_server():
+    """TestClient for public-server/app.py with a seeded user, baby and 25 activities.
+    The Authorization header carries an email-only (pre-`uid`) token."""
+    from fastapi.testclient import TestClient
+
+    import app
+    import database
+
+    # Startup creates the schema (init_database no longer runs at import time)
+    with TestClient(app.app) as client:
+        db = database.SessionLocal()
+        db.add(database.User(id="pager", email="pager@babysteps.com", name="Pager", password="pw"))
+        db.add(database.Baby(id="pager-baby", name="Page", birth_date="2024-01-01", user_id="pager"))
+        start = datetime(2025, 1, 1)
+        for n in range(25):
+            # Pairs of rows share a timestamp so the id tie-breaker is exercised
+            db.add(database.Activity(
+                id=f"act-{n:02d}", type="feeding" if n % 2 else "diaper", baby_id="pager-baby",
+                user_id="pager", timestamp=start + timedelta(hours=n // 2),
+                details={"amount": 4.0} if n % 2 else {"diaper_type": "wet"},
+            ))
+        db.commit()
+        db.close()
+
+        client.headers["Authorization"] = f"Bearer {app.create_access_token({'sub': 'pager@babysteps.com'})}"
+        yield client
@@ -0,0 +1,42 @@
+import json
+from datetime import datetime, timedelta, timezone
+
+import activity_serialization
+from activity_serialization import encode_activities, normalize_timestamp
+
+COLUMNS = ("id", "type", "timestamp", "notes", "details")
+DETAILS = ("amount", "diaper_type")
+ROWS = [
+    ("a1", "feeding", datetime(2025, 1, 1, 8, 30), None, {"amount": 4.0}),
+    ("a2", "diaper", "2025-01-01T07:00:00Z", "changed", {"diaper_type": "wet"}),
+    ("a3", "sleep", datetime(2025, 1, 1, 6, 0), None, None),
+]
+
+
+def test_normalize_timestamp_matches_utc_isoformat():
+    naive = datetime(2025, 1, 1, 8, 30, 0, 1500)
+    assert normalize_timestamp(naive) == naive.replace(tzinfo=timezone.utc).isoformat()
+    aware = datetime(2025, 1, 1, 8, 30, tzinfo=timezone(timedelta(hours=2)))
+    assert normalize_timestamp(aware) == "2025-01-01T08:30:00+02:00"
+    assert normalize_timestamp("2025-01-01 07:00") == "2025-01-01T07:00:00+00:00"
+    assert normalize_timestamp("not a date") == "not a date"
+    assert normalize_timestamp(None) is None
+
+
+def test_encode_activities_flattens_details_and_omits_nulls():
+    decoded = json.loads(encode_activities(COLUMNS, ROWS, detail_fields=DETAILS))
+    assert decoded == [
+        {"id": "a1", "type": "feeding", "timestamp": "2025-01-01T08:30:00+00:00", "amount": 4.0},
+        {"id": "a2", "type": "diaper", "timestamp": "2025-01-01T07:00:00+00:00", "notes": "changed",
+         "diaper_type": "wet"},
+        {"id": "a3", "type": "sleep", "timestamp": "2025-01-01T06:00:00+00:00"},
+    ]
+    full = json.loads(encode_activities(COLUMNS, ROWS, omit_nulls=False, detail_fields=DETAILS))
+    assert list(full[0]) == ["id", "type", "timestamp", "notes", "amount", "diaper_type"]
+    assert full[2]["amount"] is None
+
+
+def test_stdlib_fallback_encodes_the_same(monkeypatch):
+    expected = encode_activities(COLUMNS, ROWS, omit_nulls=False, detail_fields=DETAILS)
+    monkeypatch.setattr(activity_serialization, "orjson", None)
+    assert encode_activities(COLUMNS, ROWS, omit_nulls=False, detail_fields=DETAILS) == expected
@@ -0,0 +1,53 @@
+from datetime import datetime, timezone
+from zoneinfo import ZoneInfo
+
+import pytest
+
+
+@pytest.fixture
+def db(public_server):
+    import database
+
+    session = database.SessionLocal()
+    yield session
+    session.close()
+
+
+# The public_server fixture logs 25 activities on 2025-01-01 between 00:00 and 12:00 UTC
+NOW = datetime(2025, 1, 1, 20, 0, tzinfo=timezone.utc)
+
+
+def test_summary_groups_by_day_type_and_subtype(db):
+    from activity_summary import summarize_activities
+
+    summary = summarize_activities(db, "pager", "pager-baby", 2, ZoneInfo("UTC"), now=NOW)
+    assert [day["date"] for day in summary["days"]] == ["2024-12-31", "2025-01-01"]
+    assert summary["days"][0]["types"] == {}
+    types = summary["days"][1]["types"]
+    assert types["feeding"]["count"] == 12 and types["feeding"]["amount"] == 48.0
+    assert types["feeding"]["first"] == "2025-01-01T00:00:00+00:00"
+    assert types["feeding"]["last"] == "2025-01-01T11:00:00+00:00"
+    assert types["diaper"]["subtypes"] == {"wet": {
+        "count": 13, "first": "2025-01-01T00:00:00+00:00", "last": "2025-01-01T12:00:00+00:00",
+        "amount": 0, "duration": 0, "left_breast": 0, "right_breast": 0,
+    }}
+    assert summary["last"] == {"feeding": "2025-01-01T11:00:00+00:00", "diaper": "2025-01-01T12:00:00+00:00"}
+    assert summary["latest_measurement"] is None
+
+
+def test_summary_buckets_by_local_day(db):
+    from activity_summary import summarize_activities
+
+    # 08:00 UTC is midnight in Los Angeles: hours 0-7 belong to Dec 31 there
+    summary = summarize_activities(db, "pager", "pager-baby", 2, ZoneInfo("America/Los_Angeles"), now=NOW)
+    dec31, jan1 = summary["days"]
+    assert (dec31["types"]["feeding"]["count"], dec31["types"]["diaper"]["count"]) == (8, 8)
+    assert (jan1["types"]["feeding"]["count"], jan1["types"]["diaper"]["count"]) == (4, 5)
+
+
+def test_summary_endpoint_validates_parameters(public_server):
+    params = {"baby_id": "pager-baby"}
+    assert public_server.get("/api/activities/summary", params={**params, "tz": "Mars/Base"}).status_code == 400
+    assert public_server.get("/api/activities/summary", params={**params, "days": 0}).status_code == 400
+    summary = public_server.get("/api/activities/summary", params={**params, "days": 3}).json()
+    assert len(summary["days"]) == 3 and summary["last"]["diaper"] == "2025-01-01T12:00:00+00:00"
@@ -0,0 +1,34 @@
+import ast
+from pathlib import Path
+
+SERVER = Path(__file__).parent.parent / "backend" / "server.py"
+
+# Open on purpose: account flows, the public deletion form, the static widget catalogue and the liveness probe.
+# Anything else that reports on the server (stats, metrics, breakers) must sit behind require_metrics_access.
+PUBLIC_ROUTES = {
+    "/auth/login", "/auth/manual-verify", "/auth/register", "/auth/request-password-reset",
+    "/auth/resend-verification", "/auth/reset-password", "/auth/verify-email/{token}",
+    "/dashboard/available-widgets", "/deletion-request", "/health",
+}
+
+
+def _routes():
+    tree = ast.parse(SERVER.read_text())
+    for node in tree.body:
+        if not isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            continue
+        for decorator in node.decorator_list:
+            if isinstance(decorator, ast.Call) and ast.unparse(decorator.func).startswith("api_router."):
+                yield decorator, node
+
+
+def _guarded(decorator, node):
+    dependencies = [kw.value for kw in decorator.keywords if kw.arg == "dependencies"]
+    defaults = node.args.defaults + [d for d in node.args.kw_defaults if d is not None]
+    source = " ".join(ast.unparse(value) for value in dependencies + defaults)
+    return "get_current_user" in source or "require_metrics_access" in source
+
+
+def test_every_backend_route_needs_a_user_or_the_metrics_token():
+    open_routes = {decorator.args[0].value for decorator, node in _routes() if not _guarded(decorator, node)}
+    assert open_routes == PUBLIC_ROUTES
@@ -0,0 +1,74 @@
+import pytest
+from sqlalchemy import create_engine, text
+
+from db_pool import PoolMetrics, apply_sqlite_profile, pool_options
+
+
+def test_pool_options_from_env(monkeypatch):
+    monkeypatch.setenv("DB_POOL_SIZE", "8")
+    monkeypatch.setenv("DB_POOL_PRE_PING", "false")
+    monkeypatch.setenv("DB_STATEMENT_TIMEOUT_MS", "5000")
+    options = pool_options("postgresql://u:p@db/app")
+    assert options["pool_size"] == 8
+    assert options["pool_pre_ping"] is False
+    assert options["pool_recycle"] == 280
+    assert options["connect_args"]["options"] == "-c statement_timeout=5000"
+
+    sqlite = pool_options("sqlite:///./baby_steps.db")
+    assert sqlite["connect_args"] == {"check_same_thread": False}
+    assert sqlite["pool_recycle"] == -1 and sqlite["pool_pre_ping"] is False
+
+
+def test_sqlite_profile_pragmas(tmp_path, monkeypatch):
+    monkeypatch.setenv("DB_SQLITE_BUSY_TIMEOUT_MS", "2500")
+    url = f"sqlite:///{tmp_path / 'profile.db'}"
+    engine = apply_sqlite_profile(create_engine(url, **pool_options(url)))
+    with engine.connect() as connection:
+        pragma = lambda name: connection.execute(text(f"PRAGMA {name}")).scalar()
+        assert pragma("journal_mode") == "wal"
+        assert pragma("synchronous") == 1  # NORMAL
+        assert pragma("busy_timeout") == 2500
+        assert pragma("mmap_size") == 256 * 1024 * 1024
+    engine.dispose()
+
+
+@pytest.fixture
+def metrics(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'pool.db'}", **pool_options("sqlite://"))
+    yield PoolMetrics().attach(engine)
+    engine.dispose()
+
+
+def test_pool_events_and_gauges(metrics):
+    assert metrics.round_trip() >= 0
+    with metrics.engine.connect() as connection:
+        assert metrics.gauges()["active"] == 1
+        connection.invalidate()
+    stats = metrics.stats()
+    assert stats["active"] == 0
+    assert stats["checkouts"] == 2
+    assert stats["invalidations"] == 1
+    assert stats["connects"] == 1
+
+
+def test_prometheus_exposition(metrics):
+    metrics.observe_checkout(0.003)
+    metrics.checkout_timed_out()
+    text = metrics.prometheus()
+    assert 'db_pool_checkout_seconds_bucket{le="0.005"} 1' in text
+    assert "db_pool_checkout_timeouts_total 1" in text
+    assert "db_pool_size 5" in text
+
+
+def test_health_hides_database_errors(public_server, monkeypatch):
+    import app
+
+    def unreachable():
+        raise RuntimeError("could not connect to server at db.internal:5432 as admin")
+
+    assert public_server.get("/api/health").json()["database"]["ok"] is True
+    monkeypatch.setattr(app.pool_metrics, "round_trip", unreachable)
+    response = public_server.get("/api/health")
+    assert response.status_code == 503
+    assert response.json()["status"] == "unhealthy" and response.json()["database"] == "unreachable"
+    assert "db.internal" not in response.text
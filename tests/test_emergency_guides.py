@@ -0,0 +1,46 @@
+import json
+
+import pytest
+
+from emergency_guides import GUIDES_PATH, EmergencyGuideStore
+
+
+@pytest.fixture(scope="module")
+def store():
+    return EmergencyGuideStore().load()
+
+
+def test_every_type_covers_every_age_band(store):
+    assert store.version
+    assert set(store.emergency_types) >= {"choking", "cpr", "general"}
+    for emergency_type in store.emergency_types:
+        for band in store.age_bands:
+            assert store.get(emergency_type, store.age_bands[band]["min_months"])
+
+
+def test_age_band_selects_technique(store):
+    infant = store.get("choking", 6)
+    child = store.get("choking", 18)
+    assert any("back blows" in step for step in infant["steps"])
+    assert any("abdominal thrusts" in step for step in child["steps"])
+
+
+def test_aliases_and_default_band(store):
+    assert store.get("Infant CPR", None) == store.get("cpr", 3)
+    assert store.get("CHOKING", None) is store.get("choking", 0)
+
+
+def test_unknown_type_misses(store):
+    misses = store.misses
+    assert store.get("snake bite", 6) is None
+    assert store.misses == misses + 1
+
+
+def test_incomplete_guide_file_is_rejected(tmp_path):
+    store = EmergencyGuideStore().load()
+    data = json.loads(GUIDES_PATH.read_text(encoding="utf-8"))
+    del data["guides"]["cpr"]["child"]
+    path = tmp_path / "guides.json"
+    path.write_text(json.dumps(data), encoding="utf-8")
+    with pytest.raises(ValueError):
+        store.load(path)
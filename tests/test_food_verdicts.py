@@ -0,0 +1,82 @@
+import json
+
+import pytest
+
+from food_verdicts import AVOID, CAUTION, SAFE, FoodVerdictStore, normalize_food, parse_verdict
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("SAFE: mashed banana is an ideal first food.", SAFE),
+    ("Safe with caution - cut grapes into quarters.", CAUTION),
+    ("NOT SAFE. Honey can cause infant botulism.", AVOID),
+    ("No, honey should never be given under 12 months.", AVOID),
+    ("Yes, cut into small pieces to avoid choking.", CAUTION),
+    ("Yes, avocado is a great first food.", SAFE),
+    # The old substring test read "no" into these
+    ("Avocado is safe. Note that you should know the signs of allergy.", CAUTION),
+    ("Steamed carrots are a safe, nourishing option.", SAFE),
+    ("It depends on your pediatrician's advice.", None),
+    # Negatives after the food was already called safe or qualified are caveats
+    ("Fully cooked eggs are safe around 6 months; avoid raw or runny yolks.", CAUTION),
+    ("Honey should never be given under 12 months.", AVOID),
+])
+def test_parse_verdict(text, expected):
+    assert parse_verdict(text) == expected
+
+
+def test_normalize_food():
+    assert normalize_food("Fresh Strawberries!") == normalize_food("fresh strawberry")
+    assert normalize_food("  Peanut   Butter ") == "peanut butter"
+
+
+@pytest.fixture
+def store(tmp_path):
+    entries = [
+        {"id": 1, "category": "Allergens", "age_range": "0–12 months",
+         "question": "Can babies eat honey?", "answer": "No, honey should never be given under 12 months."},
+        {"id": 2, "category": "Food Safety", "age_range": "0–24 months",
+         "question": "Can babies eat strawberries?", "answer": "Yes after 6 months; mash well to prevent choking."},
+        {"id": 3, "category": "Nutrition", "age_range": "13–18 months",
+         "question": "Are bananas safe for toddlers?", "answer": "Yes, bananas are soft and easy to eat."},
+        {"id": 4, "category": "Storage", "age_range": "0–24 months",
+         "question": "Can I freeze breast milk?", "answer": "Yes, for up to 6 months."},
+    ]
+    (tmp_path / "food_research.json").write_text(json.dumps(entries), encoding="utf-8")
+    store = FoodVerdictStore()
+    store.seed_from_knowledge_base(tmp_path)
+    return store
+
+
+def test_seeded_verdicts_respect_age_ranges(store):
+    assert store.get("Honey", 8)["verdict"] == AVOID
+    assert store.get("honey", 14) is None
+    assert store.get("strawberries", 9)["verdict"] == CAUTION
+    # "Yes" answers are not applied before solids start
+    assert store.get("strawberries", 2) is None
+    assert store.get("banana", 15)["verdict"] == SAFE
+    # Only food questions are seeded
+    assert store.stats()["verdicts"] == 5 + 6 + 1
+
+
+def test_put_answers_repeat_checks_from_memory(store):
+    assert store.get("kiwi", 10) is None
+    store.put("Kiwi", 10, CAUTION, "SAFE WITH CAUTION: cut into thin strips.")
+    verdict = store.get("kiwis", 10)
+    assert verdict["verdict"] == CAUTION
+    assert verdict["is_safe"] is True
+    assert verdict["source"] == "llm"
+    assert store.stats()["stored_from_llm"] == 1
+
+
+def test_llm_verdicts_only_cover_the_month_they_were_given_for():
+    store = FoodVerdictStore()
+    store.put("honey", 12, SAFE, "SAFE: honey is fine from 12 months.")
+    assert store.get("honey", 12)["verdict"] == SAFE
+    assert store.get("honey", 10) is None
+    assert store.get("honey", 11) is None
+    assert store.get("honey", 13) is None
+
+
+def test_seeded_avoid_wins_over_a_conflicting_llm_verdict(store):
+    store.put("honey", 11, SAFE, "Yes, honey is fine.")
+    assert store.get("honey", 11)["verdict"] == AVOID
@@ -0,0 +1,76 @@
+import pytest
+
+from kb_router import KnowledgeBaseIndex, KnowledgeBaseRouter, is_urgent, parse_age_range, tokenize
+
+ENTRIES = [
+    {"id": 1, "source": "food_research", "category": "Allergens", "age_range": "12–24 months",
+     "question": "Can babies eat honey?", "answer": "Only after 12 months."},
+    {"id": 2, "source": "food_research", "category": "Allergens", "age_range": "0–12 months",
+     "question": "Can babies eat honey?", "answer": "No - risk of infant botulism."},
+    {"id": 3, "source": "ai_assistant", "category": "Sleep", "age_range": "0–9 months",
+     "question": "How many naps does my baby need?", "answer": "Usually 2-4 naps."},
+    {"id": 4, "source": "ai_assistant", "category": "Health", "age_range": "4–12 months",
+     "question": "Do teething babies get fevers?", "answer": "Teething can cause a slight rise in temperature."},
+]
+
+
+def test_tokenize_drops_stop_words_and_stems():
+    assert tokenize("Can babies eat strawberries?") == ["eat", "strawberry"]
+    assert tokenize("my 6 month old") == []
+
+
+def test_parse_age_range():
+    assert parse_age_range("6–12 months") == (6, 12)
+    assert parse_age_range("All ages") is None
+
+
+def test_exact_match_prefers_matching_age_range():
+    index = KnowledgeBaseIndex(ENTRIES)
+    confidence, entry = index.search("can babies eat honey", age_months=6)[0]
+    assert entry["id"] == 2
+    assert confidence == 1.0
+
+
+def test_router_answers_confident_matches_and_escalates_the_rest():
+    router = KnowledgeBaseRouter(KnowledgeBaseIndex(ENTRIES), threshold=0.6)
+    decision = router.route("How many naps does a baby need?")
+    assert decision["entry"]["id"] == 3
+    assert "Usually 2-4 naps." in decision["answer"]
+
+    assert router.route("How do I reset my smartphone?") is None
+    router.record_llm(4.0, 800)
+
+    stats = router.stats()
+    assert stats["knowledge_base"] == 1
+    assert stats["llm"] == 1
+    assert stats["knowledge_base_share"] == 0.5
+    assert stats["estimated_llm_seconds_saved"] == 4.0
+    assert stats["estimated_tokens_saved"] == 800
+
+
+def test_router_without_index_always_escalates():
+    router = KnowledgeBaseRouter(threshold=0.5)
+    assert router.route("Can babies eat honey?") is None
+
+
+@pytest.mark.parametrize("message, urgent", [
+    ("my baby has a fever of 104", True),
+    ("her temperature is 38.5", True),
+    ("My baby isn\u2019t breathing", True),
+    ("my toddler is choking on a grape", True),
+    ("he swallowed a button battery", True),
+    ("there is blood in her diaper", True),
+    ("Is peanut butter a choking hazard?", False),
+    ("How long can breast milk stay at room temperature?", False),
+    ("It is 30 degrees outside, how should I dress my baby?", False),
+])
+def test_is_urgent(message, urgent):
+    assert is_urgent(message) is urgent
+
+
+def test_urgent_messages_always_escalate():
+    router = KnowledgeBaseRouter(KnowledgeBaseIndex(ENTRIES), threshold=0.5)
+    assert router.index.search("my baby has a fever of 104", age_months=4)[0][0] >= 0.5
+    assert router.route("my baby has a fever of 104", age_months=4) is None
+    stats = router.stats()
+    assert stats["urgent_escalations"] == 1 and stats["llm"] == 1
@@ -0,0 +1,163 @@
+import asyncio
+
+import pytest
+
+from llm_breaker import CLOSED, HALF_OPEN, OPEN, BreakerRegistry, CircuitBreaker, CircuitOpenError, hedged
+
+
+async def fail():
+    raise RuntimeError("provider error")
+
+
+async def succeed():
+    return "ok"
+
+
+def test_opens_on_error_rate_and_fails_fast():
+    async def scenario():
+        breaker = CircuitBreaker("gpt-5/meals_search", min_calls=4, error_rate=0.5)
+        for fn in (succeed, fail, succeed, fail):
+            try:
+                await breaker.call(fn)
+            except RuntimeError:
+                pass
+        assert breaker.state == OPEN
+
+        calls = []
+
+        async def tracked():
+            calls.append(1)
+            return "ok"
+
+        with pytest.raises(CircuitOpenError):
+            await breaker.call(tracked)
+        return breaker, calls
+
+    breaker, calls = asyncio.run(scenario())
+    assert calls == []
+    assert breaker.stats()["rejected"] == 1
+    assert breaker.stats()["transitions"] == {"closed->open": 1}
+
+
+def test_opens_on_p90_latency():
+    breaker = CircuitBreaker("gpt-5/food_safety_check", min_calls=5, p90_latency=2.0)
+    for latency in (0.5, 0.6, 0.7, 3.0, 4.0):
+        breaker.record(True, latency)
+    assert breaker.state == OPEN
+    assert "p90 latency" in breaker.open_reason
+
+
+def test_half_open_probe_closes_or_reopens():
+    breaker = CircuitBreaker("m/e", min_calls=1, error_rate=0.5, open_seconds=0)
+    breaker.record(False, 0.1)
+    assert breaker.state == OPEN
+
+    assert breaker.allow()
+    assert breaker.state == HALF_OPEN
+    # Only one probe at a time
+    assert not breaker.allow()
+    breaker.record(False, 0.1)
+    assert breaker.state == OPEN
+
+    assert breaker.allow()
+    breaker.record(True, 0.1)
+    assert breaker.state == CLOSED
+    assert breaker.stats()["transitions"] == {
+        "closed->open": 1, "open->half_open": 2, "half_open->open": 1, "half_open->closed": 1,
+    }
+
+
+def test_timeout_counts_as_failure():
+    async def scenario():
+        breaker = CircuitBreaker("m/e", min_calls=1, timeout=0.01)
+
+        async def slow():
+            await asyncio.sleep(1)
+
+        with pytest.raises(asyncio.TimeoutError):
+            await breaker.call(slow)
+        return breaker
+
+    assert asyncio.run(scenario()).state == OPEN
+
+
+def test_hedged_returns_the_faster_attempt():
+    async def scenario():
+        attempts = []
+
+        async def call():
+            attempts.append(1)
+            # First attempt stalls, the hedge answers quickly
+            await asyncio.sleep(1 if len(attempts) == 1 else 0.01)
+            return f"attempt {len(attempts)}"
+
+        result = await asyncio.wait_for(hedged(call, hedge_after=0.02), 0.5)
+        return result, attempts
+
+    result, attempts = asyncio.run(scenario())
+    assert result == "attempt 2"
+    assert len(attempts) == 2
+
+
+def test_hedge_not_started_for_fast_calls():
+    async def scenario():
+        attempts = []
+
+        async def call():
+            attempts.append(1)
+            return "fast"
+
+        return await hedged(call, hedge_after=0.5), attempts
+
+    result, attempts = asyncio.run(scenario())
+    assert result == "fast"
+    assert len(attempts) == 1
+
+
+def test_cancelling_the_caller_cancels_the_attempt():
+    async def scenario():
+        started = asyncio.Event()
+        attempts = []
+
+        async def call():
+            attempts.append(asyncio.current_task())
+            started.set()
+            await asyncio.sleep(1)
+
+        caller = asyncio.ensure_future(hedged(call, hedge_after=0.5))
+        await started.wait()
+        caller.cancel()
+        await asyncio.gather(caller, return_exceptions=True)
+        await asyncio.sleep(0)
+        # Checked inside the loop - asyncio.run() cancels leftover tasks on exit
+        return [attempt.cancelled() for attempt in attempts]
+
+    assert asyncio.run(scenario()) == [True]
+
+
+def test_hedged_survives_a_cancelled_attempt():
+    async def scenario():
+        attempts = []
+
+        async def call():
+            attempts.append(asyncio.current_task())
+            if len(attempts) == 2:
+                # e.g. a timeout elsewhere cancels the first attempt
+                attempts[0].cancel()
+                await asyncio.sleep(0.01)
+                return "hedge"
+            await asyncio.sleep(1)
+
+        return await asyncio.wait_for(hedged(call, hedge_after=0.02), 0.5)
+
+    assert asyncio.run(scenario()) == "hedge"
+
+
+def test_registry_keeps_one_breaker_per_model_and_endpoint(monkeypatch):
+    monkeypatch.setenv("LLM_BREAKER_MIN_CALLS", "3")
+    registry = BreakerRegistry()
+    assert registry.get("gpt-5", "meals_search") is registry.get("gpt-5", "meals_search")
+    assert registry.get("gpt-5", "meals_search") is not registry.get("gpt-5", "food_safety_check")
+    assert registry.get("gpt-5", "meals_search").min_calls == 3
+    assert registry.hedge_after is None
+    assert set(registry.stats()["breakers"]) == {"gpt-5/meals_search", "gpt-5/food_safety_check"}
@@ -0,0 +1,90 @@
+import asyncio
+
+from llm_cache import LLMResponseCache, age_bucket, make_cache_key, normalize_prompt
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_normalize_prompt_ignores_case_and_punctuation():
+    assert normalize_prompt("Is HONEY safe for 6-month old?") == "is honey safe for 6 month old"
+    assert normalize_prompt("  is honey   safe ") == "is honey safe"
+
+
+def test_age_bucket():
+    assert age_bucket(None) == "any"
+    assert age_bucket(0) == "0-3"
+    assert age_bucket(5) == "4-5"
+    assert age_bucket(6) == "6-6"
+    assert age_bucket(11) == "10-11"
+    assert age_bucket(12) == "12-12"
+    assert age_bucket(24) == "19-24"
+    assert age_bucket(30) == "25+"
+
+
+def test_key_shared_within_age_bucket():
+    assert make_cache_key("ai_chat", "m", "Honey?", 10) == make_cache_key("ai_chat", "m", "honey", 11)
+    assert make_cache_key("ai_chat", "m", "honey", 8) != make_cache_key("ai_chat", "m", "honey", 10)
+    # Safety thresholds: a 12-month-old's answer is never served to an 11-month-old
+    assert make_cache_key("ai_chat", "m", "honey", 11) != make_cache_key("ai_chat", "m", "honey", 12)
+    assert make_cache_key("ai_chat", "m", "honey", 5) != make_cache_key("ai_chat", "m", "honey", 6)
+    assert make_cache_key("ai_chat", "m", "honey", 6) != make_cache_key("meals_search", "m", "honey", 6)
+
+
+def test_get_or_call_caches_and_reports_savings():
+    cache = LLMResponseCache()
+    calls = []
+
+    async def call():
+        calls.append(1)
+        return "answer", 42
+
+    assert run(cache.get_or_call("ai_chat", "m", "is honey safe", 6, call)) == "answer"
+    assert run(cache.get_or_call("ai_chat", "m", "Is honey safe?", 6, call)) == "answer"
+    assert len(calls) == 1
+
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["saved_tokens"] == 42
+    assert stats["endpoints"]["ai_chat"]["hit_rate"] == 0.5
+
+
+def test_failed_calls_are_not_cached():
+    cache = LLMResponseCache()
+
+    async def failing():
+        raise RuntimeError("provider down")
+
+    try:
+        run(cache.get_or_call("ai_chat", "m", "q", None, failing))
+    except RuntimeError:
+        pass
+    assert cache.stats()["entries"] == 0
+
+
+def test_disabled_endpoint_bypasses_cache():
+    cache = LLMResponseCache(disabled_endpoints=["ai_chat"])
+    calls = []
+
+    async def call():
+        calls.append(1)
+        return "answer", 1
+
+    run(cache.get_or_call("ai_chat", "m", "q", None, call))
+    run(cache.get_or_call("ai_chat", "m", "q", None, call))
+    assert len(calls) == 2
+    assert cache.stats()["endpoints"]["ai_chat"]["bypassed"] == 2
+
+
+def test_lru_eviction_and_zero_ttl_opt_out():
+    cache = LLMResponseCache(max_entries=2, ttls={"ai_chat": 60, "meals_search": -1})
+    run(cache.set("ai_chat", "m", "a", None, "A"))
+    run(cache.set("ai_chat", "m", "b", None, "B"))
+    run(cache.get("ai_chat", "m", "a", None))
+    run(cache.set("ai_chat", "m", "c", None, "C"))
+    assert run(cache.get("ai_chat", "m", "b", None)) is None
+    assert run(cache.get("ai_chat", "m", "a", None)) == "A"
+    assert cache.evictions == 1
+    assert not cache.enabled_for("meals_search")
@@ -0,0 +1,98 @@
+import asyncio
+
+import pytest
+
+from llm_jobs import JobQueueFull, LLMJobQueue
+
+
+def test_job_runs_and_long_poll_returns_result():
+    async def scenario():
+        queue = LLMJobQueue(workers=2)
+        queue.start()
+
+        async def run():
+            await asyncio.sleep(0.01)
+            return {"response": "ok"}
+
+        job = queue.submit("ai_chat", "user-1", run)
+        assert job.status == "queued"
+        await queue.wait(queue.get(job.id, "user-1"), timeout=1)
+        await queue.stop()
+        return queue, job
+
+    queue, job = asyncio.run(scenario())
+    assert job.to_dict()["status"] == "succeeded"
+    assert job.result == {"response": "ok"}
+    assert queue.stats()["succeeded"] == 1
+    assert queue.stats()["queue_seconds_p50"] is not None
+
+
+def test_jobs_are_private_to_their_user():
+    async def scenario():
+        queue = LLMJobQueue()
+
+        async def run():
+            return 1
+
+        job = queue.submit("ai_chat", "user-1", run)
+        return queue.get(job.id, "user-2")
+
+    assert asyncio.run(scenario()) is None
+
+
+def test_failures_are_reported_on_the_job():
+    async def scenario():
+        queue = LLMJobQueue(workers=1)
+        queue.start()
+
+        async def run():
+            raise RuntimeError("provider timeout")
+
+        job = queue.submit("meals_search", "user-1", run)
+        await queue.wait(job, timeout=1)
+        await queue.stop()
+        return job
+
+    job = asyncio.run(scenario())
+    assert job.status == "failed"
+    assert job.error == "provider timeout"
+
+
+def test_depth_and_per_user_limits():
+    async def scenario():
+        queue = LLMJobQueue(max_depth=3, max_per_user=2)
+
+        async def run():
+            return None
+
+        queue.submit("ai_chat", "a", run)
+        queue.submit("ai_chat", "a", run)
+        with pytest.raises(JobQueueFull):
+            queue.submit("ai_chat", "a", run)
+        queue.submit("ai_chat", "b", run)
+        with pytest.raises(JobQueueFull):
+            queue.submit("ai_chat", "c", run)
+        return queue
+
+    assert asyncio.run(scenario()).stats()["rejected"] == 2
+
+
+def test_users_are_served_round_robin():
+    async def scenario():
+        queue = LLMJobQueue(workers=1)
+        order = []
+
+        def make(label):
+            async def run():
+                order.append(label)
+            return run
+
+        jobs = [queue.submit("ai_chat", "busy", make(f"busy-{n}")) for n in range(3)]
+        jobs.append(queue.submit("ai_chat", "quiet", make("quiet")))
+        queue.start()
+        for job in jobs:
+            await queue.wait(job, timeout=1)
+        await queue.stop()
+        return order
+
+    assert asyncio.run(scenario()) == ["busy-0", "quiet", "busy-1", "busy-2"]
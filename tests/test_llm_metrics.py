@@ -0,0 +1,74 @@
+import asyncio
+import time
+
+import pytest
+
+from llm_metrics import LLMMetrics, mark_enqueued, report_first_token, report_usage
+
+
+def test_track_records_latency_tokens_and_cost():
+    async def scenario():
+        metrics = LLMMetrics(prices={"test-model": (1.0, 2.0)})
+        async with metrics.track("ai_chat", "test-model"):
+            await asyncio.sleep(0.01)
+            report_usage(1000, 500)
+        return metrics
+
+    summary = asyncio.run(scenario()).summary()
+    endpoint = summary["endpoints"]["ai_chat"]
+    assert endpoint["calls"] == 1
+    assert endpoint["error_rate"] == 0.0
+    assert endpoint["tokens"] == 1500
+    assert endpoint["cost_usd"] == pytest.approx(0.002)
+    assert endpoint["latency_p50"] >= 0.01
+
+
+def test_outcomes_are_classified():
+    async def scenario():
+        metrics = LLMMetrics()
+        with pytest.raises(RuntimeError):
+            async with metrics.track("meals_search", "gpt-5"):
+                raise RuntimeError("provider error")
+        with pytest.raises(asyncio.TimeoutError):
+            async with metrics.track("meals_search", "gpt-5"):
+                raise asyncio.TimeoutError()
+        with pytest.raises(RuntimeError):
+            async with metrics.track("meals_search", "gpt-5") as call:
+                call.outcome = "rejected"
+                raise RuntimeError("circuit open")
+        return metrics
+
+    exposition = asyncio.run(scenario()).prometheus()
+    for outcome in ("error", "timeout", "rejected"):
+        assert f'llm_calls_total{{endpoint="meals_search",model="gpt-5",outcome="{outcome}"}} 1' in exposition
+    # Rejected calls never reached the provider and stay out of the latency histogram
+    assert 'llm_latency_seconds_count{endpoint="meals_search",model="gpt-5"} 2' in exposition
+
+
+def test_queue_wait_and_time_to_first_token():
+    async def scenario():
+        metrics = LLMMetrics()
+        mark_enqueued(time.monotonic() - 0.5)
+        async with metrics.track("ai_chat", "gpt-5-nano"):
+            await asyncio.sleep(0.01)
+            report_first_token()
+            await asyncio.sleep(0.05)
+        return metrics
+
+    recent = list(asyncio.run(scenario())._recent)[0]
+    assert recent["queue"] >= 0.5
+    assert recent["ttft"] < recent["total"]
+
+
+def test_histogram_buckets_are_cumulative():
+    async def scenario():
+        metrics = LLMMetrics()
+        for _ in range(3):
+            async with metrics.track("ai_chat", "gpt-5-nano"):
+                pass
+        return metrics
+
+    exposition = asyncio.run(scenario()).prometheus()
+    assert 'llm_latency_seconds_bucket{endpoint="ai_chat",model="gpt-5-nano",le="0.05"} 3' in exposition
+    assert 'llm_latency_seconds_bucket{endpoint="ai_chat",model="gpt-5-nano",le="+Inf"} 3' in exposition
+    assert "# TYPE llm_latency_seconds histogram" in exposition
@@ -0,0 +1,85 @@
+import asyncio
+
+import pytest
+
+from llm_singleflight import SingleFlight
+
+
+def test_concurrent_callers_share_one_call():
+    async def scenario():
+        group = SingleFlight()
+        calls = []
+
+        async def fetch():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return "shared"
+
+        results = await asyncio.gather(*[group.do("k", fetch) for _ in range(5)])
+        return group, calls, results
+
+    group, calls, results = asyncio.run(scenario())
+    assert results == ["shared"] * 5
+    assert len(calls) == 1
+    assert group.stats()["coalesced"] == 4
+    assert group.stats()["in_flight"] == 0
+
+
+def test_errors_propagate_to_every_waiter():
+    async def scenario():
+        group = SingleFlight()
+
+        async def fetch():
+            await asyncio.sleep(0.01)
+            raise RuntimeError("upstream failed")
+
+        return await asyncio.gather(*[group.do("k", fetch) for _ in range(3)], return_exceptions=True)
+
+    results = asyncio.run(scenario())
+    assert all(isinstance(r, RuntimeError) for r in results)
+
+
+def test_leader_cancellation_does_not_cancel_followers():
+    async def scenario():
+        group = SingleFlight()
+
+        async def fetch():
+            await asyncio.sleep(0.02)
+            return "done"
+
+        leader = asyncio.ensure_future(group.do("k", fetch))
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(group.do("k", fetch))
+        await asyncio.sleep(0)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await follower, group
+
+    result, group = asyncio.run(scenario())
+    assert result == "done"
+    assert group.stats()["abandoned_waiters"] == 1
+
+
+def test_orphaned_call_is_cancelled_when_configured():
+    async def scenario():
+        group = SingleFlight(cancel_orphans=True)
+        started = asyncio.Event()
+        finished = []
+
+        async def fetch():
+            started.set()
+            await asyncio.sleep(1)
+            finished.append(1)
+
+        waiter = asyncio.ensure_future(group.do("k", fetch))
+        await started.wait()
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+        await asyncio.sleep(0)
+        return group, finished
+
+    group, finished = asyncio.run(scenario())
+    assert finished == []
+    assert group.stats()["orphans_cancelled"] == 1
+    assert group.stats()["in_flight"] == 0
@@ -0,0 +1,88 @@
+import asyncio
+import json
+import random
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+import llm_stub_client
+from llm_stub_server import StubConfig, create_app, parse_distribution
+
+MESSAGES = [{"role": "system", "content": "You are helpful."}, {"role": "user", "content": "Is kiwi safe?"}]
+
+
+@pytest.fixture
+def stub():
+    return TestClient(create_app(StubConfig(time_scale=0, completion_tokens="fixed:40"), seed=1))
+
+
+def test_parse_distribution():
+    rng = random.Random(0)
+    assert parse_distribution("fixed:1.5")(rng) == 1.5
+    assert 0.5 <= parse_distribution("uniform:0.5,2")(rng) <= 2
+    assert parse_distribution("lognormal:median=1,sigma=0.5")(rng) > 0
+    assert parse_distribution("normal:mean=1,sd=5")(rng) >= 0
+    with pytest.raises(ValueError):
+        parse_distribution("pareto:1")
+
+
+def test_completion_is_openai_shaped_and_deterministic(stub):
+    first = stub.post("/v1/chat/completions", json={"model": "gpt-5", "messages": MESSAGES}).json()
+    second = stub.post("/v1/chat/completions", json={"model": "gpt-5", "messages": MESSAGES}).json()
+    assert first["object"] == "chat.completion"
+    assert first["choices"][0]["message"]["content"] == second["choices"][0]["message"]["content"]
+    usage = first["usage"]
+    assert usage["completion_tokens"] >= 40
+    assert usage["total_tokens"] == usage["prompt_tokens"] + usage["completion_tokens"]
+    stats = stub.get("/stats").json()
+    assert stats["requests"] == 2
+    assert stats["completion_tokens"] == 2 * usage["completion_tokens"]
+
+
+def test_max_completion_tokens_caps_length(stub):
+    body = {"model": "gpt-5-nano", "messages": MESSAGES, "max_completion_tokens": 5}
+    assert stub.post("/v1/chat/completions", json=body).json()["usage"]["completion_tokens"] <= 5
+
+
+def test_streaming_emits_chunks_usage_and_done(stub):
+    body = {"model": "gpt-5", "messages": MESSAGES, "stream": True, "stream_options": {"include_usage": True}}
+    with stub.stream("POST", "/v1/chat/completions", json=body) as response:
+        lines = [line for line in response.iter_lines() if line.startswith("data: ")]
+    assert lines[-1] == "data: [DONE]"
+    chunks = [json.loads(line[6:]) for line in lines[:-1]]
+    text = "".join(c["choices"][0]["delta"].get("content", "") for c in chunks if c["choices"])
+    assert text
+    assert chunks[-1]["usage"]["completion_tokens"] > 0
+    assert stub.get("/stats").json()["streamed"] == 1
+
+
+def test_error_injection_and_runtime_config(stub):
+    assert stub.post("/config", json={"error_rate": 1.0, "error_statuses": [503]}).status_code == 200
+    response = stub.post("/v1/chat/completions", json={"model": "gpt-5", "messages": MESSAGES})
+    assert response.status_code == 503
+    assert stub.get("/stats").json()["errors_injected"] == {"503": 1}
+    assert stub.post("/config", json={"ttft": "bogus"}).status_code == 400
+
+
+def test_safety_prompts_get_a_verdict_label(stub):
+    messages = [{"role": "user", "content": "Start your answer with SAFE, SAFE WITH CAUTION or NOT SAFE"}]
+    content = stub.post("/v1/chat/completions", json={"model": "gpt-5", "messages": messages}).json()
+    assert content["choices"][0]["message"]["content"].upper().startswith(("SAFE", "NOT SAFE"))
+
+
+@pytest.mark.parametrize("stream", ["false", "true"])
+def test_llm_chat_client_talks_to_stub(monkeypatch, stream):
+    app = create_app(StubConfig(time_scale=0, completion_tokens="fixed:20"))
+    monkeypatch.setenv("LLM_STUB_STREAM", stream)
+
+    async def scenario():
+        monkeypatch.setattr(llm_stub_client, "_http_loop", asyncio.get_running_loop())
+        monkeypatch.setattr(llm_stub_client, "_http", httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app), base_url="http://stub"
+        ))
+        chat = llm_stub_client.LlmChat(api_key="x", session_id="s", system_message="sys").with_model("openai", "gpt-5")
+        return await chat.send_message(llm_stub_client.UserMessage(text="hello"))
+
+    reply = asyncio.run(scenario())
+    assert isinstance(reply, str) and len(reply) > 20
@@ -0,0 +1,125 @@
+import pytest
+
+from meal_search import (
+    MealSearchIndex, allergen_mask, allergen_names, format_recipes, ingredient_words, parse_allergens,
+)
+
+ENTRIES = [
+    {"id": 1, "category": "Breakfast", "age_range": "4–6 months", "answer": [
+        {"name": "Banana Oatmeal", "ingredients": ["1/4 cup oats", "1/2 banana"], "instructions": "Cook oats."},
+        {"name": "Sweet Potato Puree", "ingredients": ["1/2 small sweet potato", "2 tbsp water"],
+         "instructions": "Steam and blend."},
+    ]},
+    {"id": 2, "category": "Dinner", "age_range": "9–12 months", "answer": [
+        {"name": "Chicken Potato Mash", "ingredients": ["2 tbsp shredded chicken", "1/4 boiled potatoes"],
+         "instructions": "Mash together."},
+        {"name": "Banana Pancakes", "ingredients": ["1 banana", "1 egg"], "instructions": "Fry lightly."},
+    ]},
+    # Repeated recipes in another question are indexed once
+    {"id": 3, "category": "Breakfast", "age_range": "4–6 months", "answer": [
+        {"name": "Banana Oatmeal", "ingredients": ["1/4 cup oats", "1/2 banana"], "instructions": "Cook oats."},
+    ]},
+]
+
+
+def names(result):
+    return [recipe["name"] for recipe in result["recipes"]]
+
+
+def test_ingredient_words_drop_quantities_and_preparation():
+    assert ingredient_words("1/2 small sweet potatoes") == ["sweet", "potato"]
+    assert ingredient_words("2 tbsp shredded chicken") == ["chicken"]
+
+
+def test_search_by_ingredient_age_and_category():
+    index = MealSearchIndex(ENTRIES)
+    assert len(index.recipes) == 4
+    assert names(index.search("banana")) == ["Banana Oatmeal", "Banana Pancakes"]
+    assert names(index.search("banana", age_months=10)) == ["Banana Pancakes"]
+    assert names(index.search("potato dinner")) == ["Chicken Potato Mash"]
+    assert names(index.search("breakfast ideas")) == ["Banana Oatmeal", "Sweet Potato Puree"]
+    assert names(index.search("", ingredients=["egg"])) == ["Banana Pancakes"]
+
+
+def test_unknown_foods_return_nothing_rather_than_everything():
+    result = MealSearchIndex(ENTRIES).search("kombucha", age_months=5)
+    assert result["recipes"] == [] and result["unmatched_words"] == ["kombucha"]
+
+
+def test_general_queries_mix_categories_and_page():
+    index = MealSearchIndex(ENTRIES)
+    first = index.search("meal ideas", limit=2)
+    assert [recipe["category"] for recipe in first["recipes"]] == ["Breakfast", "Dinner"]
+    assert first["total"] == 4
+    assert len(index.search("meal ideas", limit=2, offset=2)["recipes"]) == 2
+    assert "**Banana Oatmeal** (Breakfast, 4–6 months)" in format_recipes(first["recipes"])
+
+
+def test_allergen_tagging_follows_synonyms_not_substrings():
+    assert allergen_names(allergen_mask(["1/4 cup plain yogurt", "1 scrambled egg"])) == ["dairy", "egg"]
+    assert allergen_names(allergen_mask(["1 tbsp peanut butter"])) == ["peanut"]
+    assert allergen_mask(["2 tbsp breast milk", "1/4 cup butternut squash"]) == 0
+    assert parse_allergens(["Eggs", "gluten", ""]) == parse_allergens(["egg", "wheat"])
+    # Dish and phrase synonyms: rolls and sandwiches are wheat, chicken salad has mayo, Roll-Ups are neither
+    assert allergen_names(allergen_mask(["Small dinner rolls"])) == ["wheat"]
+    assert allergen_names(allergen_mask(["Chicken salad"])) == ["egg"]
+    assert allergen_mask(["Turkey Roll-Ups", "Turkey slices"]) == 0
+    with pytest.raises(ValueError, match="Unknown allergen"):
+        parse_allergens(["kryptonite"])
+
+
+def test_search_excludes_allergens_and_ingredients():
+    index = MealSearchIndex(ENTRIES)
+    # Dish names count too: pancakes usually carry egg, dairy and wheat
+    assert index.recipes[3]["allergens"] == ["dairy", "egg", "wheat"]
+    result = index.search("banana", exclude_allergens=parse_allergens(["egg"]))
+    assert names(result) == ["Banana Oatmeal"] and result["excluded_allergens"] == ["egg"]
+    assert names(index.search("meal ideas", exclude_ingredients=["sweet potatoes", "chicken"])) == [
+        "Banana Oatmeal", "Banana Pancakes"]
+
+
+def test_babies_below_the_youngest_range_get_milk_feeds():
+    index = MealSearchIndex(ENTRIES)
+    result = index.search("banana", age_months=2)
+    assert names(result) == ["Breast Milk or Formula"] and result["milk_feeds_only"]
+    assert not index.search("banana", age_months=5)["milk_feeds_only"]
+
+
+def test_loads_the_shipped_meal_planner():
+    index = MealSearchIndex().load()
+    assert len(index.recipes) > 500
+    assert index.search("lentils", age_months=8)["recipes"]
+
+
+def test_excluding_wheat_or_gluten_removes_sliders_on_dinner_rolls():
+    index = MealSearchIndex().load()
+    assert "Mini Sliders" in names(index.search("sliders", 18))
+    for excluded in (["wheat"], ["gluten"]):
+        assert "Mini Sliders" not in names(index.search("sliders", 18, exclude_allergens=parse_allergens(excluded)))
+
+
+def test_public_server_meal_search(public_server):
+    body = public_server.post("/api/meals/search", json={"query": "banana breakfast", "baby_age_months": 5}).json()
+    assert body["matched"] and body["source"] == "meal_planner"
+    assert all("banana" in " ".join(meal["ingredients"]).lower() for meal in body["results"])
+    assert isinstance(body["results"][0]["instructions"], list)
+
+    general = public_server.post("/api/meals/search", json={"query": "kombucha", "baby_age_months": 5}).json()
+    assert not general["matched"] and general["results"]
+    assert public_server.post("/api/meals/search", json={"query": "x", "limit": "many"}).status_code == 400
+
+
+def test_public_server_meal_search_exclusions(public_server):
+    request = {"query": "breakfast", "baby_age_months": 12, "exclude_allergens": ["egg", "dairy"], "limit": 20}
+    body = public_server.post("/api/meals/search", json=request).json()
+    assert body["results"] and body["excluded_allergens"] == ["dairy", "egg"]
+    assert not any(set(meal["allergens"]) & {"dairy", "egg"} for meal in body["results"])
+    unknown = public_server.post("/api/meals/search", json={"query": "x", "exclude_allergens": ["kryptonite"]})
+    assert unknown.status_code == 400
+
+
+def test_public_server_meal_search_for_a_newborn(public_server):
+    body = public_server.post("/api/meals/search", json={"query": "banana", "baby_age_months": 2}).json()
+    assert not body["matched"]
+    assert [meal["name"] for meal in body["results"]] == ["Breast Milk or Formula"]
+    assert public_server.post("/api/meals/search", json={"query": "x", "baby_age_months": "two"}).status_code == 400
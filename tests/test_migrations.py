@@ -0,0 +1,81 @@
+import json
+
+from sqlalchemy import create_engine, inspect, text
+
+import migrations
+from migrations import LATER_MIGRATIONS, MIGRATIONS, migrate, status
+
+LEGACY_ACTIVITIES = """
+CREATE TABLE activities (
+    id VARCHAR PRIMARY KEY, type VARCHAR NOT NULL, notes TEXT,
+    baby_id VARCHAR NOT NULL, user_id VARCHAR NOT NULL, timestamp VARCHAR, created_at DATETIME,
+    feeding_type VARCHAR, amount FLOAT, duration INTEGER, diaper_type VARCHAR
+)
+"""
+LEGACY_ROWS = """
+INSERT INTO activities (id, type, baby_id, user_id, timestamp, feeding_type, amount, diaper_type) VALUES
+    ('f1', 'feeding', 'b', 'u', '2025-01-01 08:00:00', 'bottle', 4.5, NULL),
+    ('d1', 'diaper', 'b', 'u', '2025-01-01 09:00:00', NULL, NULL, 'wet'),
+    ('s1', 'sleep', 'b', 'u', '2025-01-01 10:00:00', NULL, NULL, NULL)
+"""
+
+
+def test_migrates_legacy_schema_once(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    with engine.begin() as connection:
+        connection.execute(text(LEGACY_ACTIVITIES))
+        connection.execute(text(LEGACY_ROWS))
+
+    assert migrate(engine) == [m.name for m in MIGRATIONS]
+    columns = {c["name"] for c in inspect(engine).get_columns("activities")}
+    assert "details" in columns
+    # Legacy columns stay until the contract migration, for instances still on the old release
+    assert {"feeding_type", "amount", "duration", "diaper_type"} <= columns
+    with engine.connect() as connection:
+        details = dict(connection.execute(text("SELECT id, details FROM activities")).fetchall())
+    assert json.loads(details["f1"]) == {"feeding_type": "bottle", "amount": 4.5}
+    assert json.loads(details["d1"]) == {"diaper_type": "wet"}
+    assert details["s1"] is None
+    indexes = {i["name"]: i["column_names"] for i in inspect(engine).get_indexes("activities")}
+    assert indexes["ix_activities_user_baby_type_ts"] == ["user_id", "baby_id", "type", "timestamp"]
+    assert indexes["ix_activities_baby_ts"] == ["baby_id", "timestamp"]
+
+    assert migrate(engine) == []
+    assert all(done for _, _, done in status(engine))
+
+
+def test_details_copy_in_batches_then_legacy_columns_drop(tmp_path, monkeypatch):
+    monkeypatch.setattr(migrations, "DETAILS_BATCH_SIZE", 1)
+    engine = create_engine(f"sqlite:///{tmp_path / 'rolling.db'}")
+    with engine.begin() as connection:
+        connection.execute(text(LEGACY_ACTIVITIES))
+        connection.execute(text(LEGACY_ROWS))
+    migrate(engine)
+    # An instance still on the previous release writes a legacy-only row after the copy
+    with engine.begin() as connection:
+        connection.execute(text(
+            "INSERT INTO activities (id, type, baby_id, user_id, timestamp, duration) "
+            "VALUES ('s2', 'sleep', 'b', 'u', '2025-01-01 11:00:00', 45)"
+        ))
+
+    assert migrate(engine, MIGRATIONS + LATER_MIGRATIONS) == ["drop_legacy_activity_columns"]
+    columns = {c["name"] for c in inspect(engine).get_columns("activities")}
+    assert not {"feeding_type", "amount", "duration", "diaper_type"} & columns
+    with engine.connect() as connection:
+        details = dict(connection.execute(text("SELECT id, details FROM activities")).fetchall())
+    assert json.loads(details["f1"]) == {"feeding_type": "bottle", "amount": 4.5}
+    assert json.loads(details["s2"]) == {"duration": 45}
+
+
+def test_activities_query_uses_composite_index(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'plan.db'}")
+    with engine.begin() as connection:
+        connection.execute(text(LEGACY_ACTIVITIES))
+    migrate(engine)
+    with engine.connect() as connection:
+        plan = " ".join(str(row[-1]) for row in connection.execute(text(
+            "EXPLAIN QUERY PLAN SELECT * FROM activities WHERE user_id = 'u' AND baby_id = 'b' "
+            "AND type = 'feeding' ORDER BY timestamp DESC LIMIT 20"
+        )))
+    assert "ix_activities_user_baby_type_ts" in plan
+    assert "TEMP B-TREE" not in plan
@@ -0,0 +1,111 @@
+import pytest
+
+
+@pytest.fixture
+def client(public_server):
+    return public_server
+
+
+def test_keyset_pages_cover_every_row_once(client):
+    full = [a["id"] for a in client.get("/api/activities", params={"baby_id": "pager-baby"}).json()]
+    seen, cursor = [], None
+    while True:
+        params = {"baby_id": "pager-baby", "limit": 10, **({"cursor": cursor} if cursor else {})}
+        response = client.get("/api/activities", params=params)
+        page = response.json()
+        assert len(page) <= 10
+        seen += [a["id"] for a in page]
+        cursor = response.headers.get("x-next-cursor")
+        if not cursor:
+            break
+    assert seen == full
+    assert len(seen) == 25
+
+
+def test_fields_projection_and_null_omission(client):
+    rows = client.get("/api/activities", params={"fields": "type,amount", "type": "feeding"}).json()
+    assert rows and all(set(row) == {"id", "timestamp", "type", "amount"} for row in rows)
+
+    diapers = client.get("/api/activities", params={"type": "diaper", "limit": 1}).json()
+    assert "amount" not in diapers[0] and diapers[0]["diaper_type"] == "wet"
+    full = client.get("/api/activities", params={"type": "diaper", "limit": 1, "omit_nulls": "false"}).json()
+    assert full[0]["amount"] is None and len(full[0]) == 19
+
+
+def test_bad_fields_and_cursor_are_rejected(client):
+    assert client.get("/api/activities", params={"fields": "type,password"}).status_code == 400
+    assert client.get("/api/activities", params={"cursor": "not-a-cursor"}).status_code == 400
+
+
+@pytest.mark.parametrize("limit", [-1, 0, 501, "ten"])
+def test_out_of_range_limit_is_rejected(client, limit):
+    assert client.get("/api/activities", params={"limit": limit}).status_code == 422
+
+
+def test_latest_returns_newest_rows_per_type(client):
+    latest = client.get(
+        "/api/activities/latest", params={"baby_id": "pager-baby", "types": "feeding,diaper,sleep", "per_type": 3}
+    ).json()
+    assert list(latest) == ["feeding", "diaper", "sleep"] and latest["sleep"] == []
+    for activity_type in ("feeding", "diaper"):
+        page = client.get("/api/activities", params={"baby_id": "pager-baby", "type": activity_type, "limit": 3}).json()
+        assert latest[activity_type] == page
+    assert latest["feeding"][0]["amount"] == 4.0
+
+    every_type = client.get("/api/activities/latest", params={"baby_id": "pager-baby", "per_type": 1}).json()
+    assert sorted(every_type) == ["diaper", "feeding"]
+    assert client.get("/api/activities/latest", params={"baby_id": "pager-baby", "per_type": 0}).status_code == 400
+
+
+@pytest.fixture
+def bulk_baby(client):
+    import database
+
+    db = database.SessionLocal()
+    db.add(database.Baby(id="bulk-baby", name="Bulk", birth_date="2024-01-01", user_id="pager"))
+    db.commit()
+    yield "bulk-baby"
+    db.query(database.Activity).filter(database.Activity.baby_id == "bulk-baby").delete()
+    db.query(database.Baby).filter(database.Baby.id == "bulk-baby").delete()
+    db.commit()
+    db.close()
+
+
+def test_bulk_import_reports_per_item_outcomes(client, bulk_baby):
+    batch = [
+        {"id": "bulk-1", "type": "feeding", "baby_id": bulk_baby, "amount": 3.5,
+         "timestamp": "2025-02-01T09:30:00-05:00"},
+        {"id": "bulk-2", "type": "diaper", "baby_id": bulk_baby, "diaper_type": "dirty"},
+        {"type": "sleep", "baby_id": "someone-elses-baby", "duration": 30},
+        {"type": "feeding", "baby_id": bulk_baby, "amount": "lots"},
+        {"id": "bulk-1", "type": "feeding", "baby_id": bulk_baby},
+    ]
+    body = client.post("/api/activities/bulk", json={"activities": batch}).json()
+    assert body["created"] == 2
+    assert [r["status"] for r in body["results"]] == ["created", "created", "rejected", "rejected", "duplicate"]
+
+    stored = client.get("/api/activities", params={"baby_id": bulk_baby}).json()
+    assert [a["id"] for a in stored][-1] == "bulk-1"
+    assert stored[-1]["timestamp"] == "2025-02-01T14:30:00+00:00" and stored[-1]["amount"] == 3.5
+
+    # Replaying the same batch stores nothing new
+    replay = client.post("/api/activities/bulk", json={"activities": batch[:2]}).json()
+    assert replay["created"] == 0 and {r["status"] for r in replay["results"]} == {"duplicate"}
+
+
+def test_bulk_import_rejects_ids_owned_by_another_user(client, bulk_baby):
+    import database
+
+    db = database.SessionLocal()
+    db.add(database.Activity(id="foreign-1", type="diaper", baby_id="other-baby", user_id="other-user"))
+    db.commit()
+    try:
+        body = client.post("/api/activities/bulk", json={"activities": [
+            {"id": "foreign-1", "type": "feeding", "baby_id": bulk_baby, "amount": 2.0},
+        ]}).json()
+        assert body["created"] == 0
+        assert body["results"] == [{"index": 0, "status": "rejected", "error": "Activity ID is not available"}]
+    finally:
+        db.query(database.Activity).filter(database.Activity.id == "foreign-1").delete()
+        db.commit()
+        db.close()
@@ -0,0 +1,75 @@
+import pytest
+from jose import jwt
+from sqlalchemy import event
+
+
+@pytest.fixture
+def statements():
+    import database
+
+    seen = []
+
+    def capture(conn, cursor, statement, *args):
+        seen.append(statement)
+
+    event.listen(database.engine, "before_cursor_execute", capture)
+    yield seen
+    event.remove(database.engine, "before_cursor_execute", capture)
+
+
+def test_login_token_carries_user_id(public_server):
+    import app
+
+    response = public_server.post("/api/auth/login", json={"email": "pager@babysteps.com", "password": "pw"})
+    claims = jwt.decode(response.json()["access_token"], app.SECRET_KEY, algorithms=[app.ALGORITHM])
+    assert claims["uid"] == "pager"
+    assert claims["sub"] == "pager@babysteps.com"
+
+
+def test_uid_token_skips_the_user_lookup(public_server, statements):
+    import app
+
+    token = app.create_access_token({"sub": "pager@babysteps.com", "uid": "pager"})
+    response = public_server.get("/api/babies", headers={"Authorization": f"Bearer {token}"})
+    assert [baby["id"] for baby in response.json()] == ["pager-baby"]
+    assert not [s for s in statements if "FROM users" in s]
+
+
+def test_email_only_token_still_resolves(public_server, statements):
+    response = public_server.get("/api/babies")
+    assert [baby["id"] for baby in response.json()] == ["pager-baby"]
+    assert len([s for s in statements if "FROM users" in s]) == 1
+
+    import app
+    stranger = app.create_access_token({"sub": "nobody@babysteps.com"})
+    assert public_server.get("/api/babies", headers={"Authorization": f"Bearer {stranger}"}).status_code == 404
+
+
+def test_writes_reject_a_deleted_users_token(public_server, statements):
+    import app
+
+    ghost = {"Authorization": f"Bearer {app.create_access_token({'sub': 'ghost@babysteps.com', 'uid': 'ghost'})}"}
+    # Reads trust the uid claim until the token expires; writes confirm the user still exists
+    assert public_server.get("/api/babies", headers=ghost).json() == []
+    baby = {"name": "Ghost", "birth_date": "2024-01-01"}
+    assert public_server.post("/api/babies", json=baby, headers=ghost).status_code == 401
+    activity = {"type": "feeding", "baby_id": "pager-baby"}
+    assert public_server.post("/api/activities", json=activity, headers=ghost).status_code == 401
+    assert public_server.get("/api/babies", headers=ghost).json() == []
+
+    pager = {"Authorization": f"Bearer {app.create_access_token({'sub': 'pager@babysteps.com', 'uid': 'pager'})}"}
+    statements.clear()
+    assert public_server.put("/api/babies/pager-baby", json={"name": "Page", "birth_date": "2024-01-01"}, headers=pager).status_code == 200
+    assert len([s for s in statements if "FROM users" in s]) == 1
+
+
+@pytest.mark.parametrize("path", ["/api/db/pool", "/api/db/metrics", "/api/startup", "/api/llm/metrics",
+                                  "/api/llm/metrics/summary", "/api/food/research/routing"])
+def test_operational_endpoints_need_a_user_or_the_metrics_token(public_server, monkeypatch, path):
+    import app
+
+    assert public_server.get(path, headers={"Authorization": ""}).status_code in (401, 403)
+    assert public_server.get(path, headers={"Authorization": "Bearer scrape"}).status_code == 401
+    monkeypatch.setattr(app, "METRICS_TOKEN", "scrape")
+    assert public_server.get(path, headers={"Authorization": "Bearer scrape"}).status_code == 200
+    assert public_server.get(path).status_code == 200
@@ -0,0 +1,30 @@
+import ast
+from pathlib import Path
+
+APP = Path(__file__).parent.parent / "public-server" / "app.py"
+
+
+def _handlers():
+    tree = ast.parse(APP.read_text())
+    for node in tree.body:
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)) and any(
+            isinstance(d, ast.Call) and getattr(d.func, "attr", None) in ("get", "post", "put", "delete")
+            for d in node.decorator_list
+        ):
+            yield node
+
+
+def test_session_handlers_run_in_the_threadpool():
+    # A sync SQLAlchemy Session inside `async def` blocks the event loop for every query
+    uses_session = [
+        node for node in _handlers()
+        if any(ast.unparse(arg.annotation or ast.Constant(None)) == "Session" for arg in node.args.args)
+    ]
+    assert len(uses_session) >= 11
+    assert [node.name for node in uses_session if isinstance(node, ast.AsyncFunctionDef)] == []
+
+
+def test_llm_handlers_stay_async():
+    handlers = {node.name: node for node in _handlers()}
+    for name in ("food_research", "meal_search", "research", "ai_chat"):
+        assert isinstance(handlers[name], ast.AsyncFunctionDef)
@@ -0,0 +1,44 @@
+import pytest
+
+
+def test_curated_answers_skip_the_llm(public_server):
+    response = public_server.post("/api/food/research", json={"query": "Is honey safe for babies?", "baby_age_months": 8})
+    body = response.json()
+    assert "botulism" in body["answer"]
+    assert body["safety_level"] == "avoid"
+    assert body["metadata"]["route"] == "knowledge_base"
+    assert body["metadata"]["confidence"] >= body["metadata"]["threshold"]
+
+    stats = public_server.get("/api/food/research/routing").json()
+    assert stats["indexed_entries"] > 0 and stats["knowledge_base"] >= 1
+
+
+def test_unmatched_queries_escalate(public_server):
+    # No EMERGENT_LLM_KEY in the test environment, so escalation ends at the fallback answers
+    body = public_server.post("/api/food/research", json={"query": "kombucha", "baby_age_months": 8}).json()
+    assert body["safety_level"] == "consult_doctor"
+    assert body["metadata"]["route"] == "fallback" and body["metadata"]["confidence"] is None
+
+
+@pytest.mark.parametrize("answer, level", [
+    ("No, honey should never be given under 12 months.", "avoid"),
+    ("Yes, avocado is a great first food.", "safe"),
+    ("Yes after 6 months; mash well to prevent choking.", "caution"),
+    ("Fully cooked eggs are safe around 6 months; avoid raw or runny yolks.", "caution"),
+    ("Use within 24 hours of refrigeration.", "consult_doctor"),
+    # A "never" caveat after a clear yes does not flip the answer
+    ("Yes, mashed avocado is great \u2014 never leave baby unattended while eating.", "safe"),
+    ("Honey should never be given to babies under 12 months.", "avoid"),
+    ("Only pasteurized varieties; avoid unpasteurized cheeses.", "caution"),
+])
+def test_kb_safety_level(answer, level):
+    from app import kb_safety_level
+
+    assert kb_safety_level(answer) == level
+
+
+def test_bad_age_is_a_400(public_server):
+    response = public_server.post("/api/food/research", json={"query": "honey", "baby_age_months": "eight"})
+    assert response.status_code == 400
+    body = public_server.post("/api/food/research", json={"query": "Is honey safe for babies?", "baby_age_months": "8"}).json()
+    assert body["safety_level"] == "avoid"
@@ -0,0 +1,54 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+PUBLIC_SERVER = Path(__file__).parent.parent / "public-server"
+# Generous for CI machines; a regression like an eager SDK import or DB work at import blows well past it
+IMPORT_BUDGET_SECONDS = float(os.environ.get("STARTUP_IMPORT_BUDGET_SECONDS", 3.0))
+
+PROBE = """
+import asyncio, json, sys, time
+started = time.perf_counter()
+import app
+import_seconds = time.perf_counter() - started
+eager = "emergentintegrations" in sys.modules
+import llm_integration
+llm = asyncio.run(llm_integration.load_llm_integration())
+print(json.dumps({"import_seconds": import_seconds, "eager": eager, "available": llm.available,
+                  "lazy": "emergentintegrations" in sys.modules}))
+"""
+
+
+def test_app_import_is_cheap_and_defers_the_ai_stack(tmp_path):
+    # A stand-in emergentintegrations package, to see when it gets imported
+    chat = tmp_path / "emergentintegrations" / "llm"
+    chat.mkdir(parents=True)
+    (tmp_path / "emergentintegrations" / "__init__.py").write_text("")
+    (chat / "__init__.py").write_text("")
+    (chat / "chat.py").write_text("class LlmChat: pass\nclass UserMessage: pass\n")
+
+    database = tmp_path / "cold.db"
+    env = {
+        **os.environ,
+        "PYTHONPATH": str(tmp_path),
+        "DATABASE_URL": f"sqlite:///{database}",
+        "EMERGENT_LLM_KEY": "test-key",
+    }
+    env.pop("LLM_STUB_URL", None)
+    result = subprocess.run(
+        [sys.executable, "-c", PROBE], cwd=PUBLIC_SERVER, env=env, capture_output=True, text=True, check=True
+    )
+    probe = json.loads(result.stdout.strip().splitlines()[-1])
+
+    assert not probe["eager"], "app.py imported the AI stack at import time"
+    assert probe["lazy"] and probe["available"]
+    assert not database.exists(), "app.py touched the database at import time"
+    assert probe["import_seconds"] < IMPORT_BUDGET_SECONDS
+
+
+def test_startup_report_lists_init_phases(public_server):
+    report = public_server.get("/api/startup").json()
+    assert {"imports", "routes", "init_database", "init_demo_data"} <= set(report["phases_ms"])
+    assert report["total_ms"] >= report["phases_ms"]["imports"]
@@ -0,0 +1,44 @@
+import json
+import logging
+
+from structured_logging import JsonFormatter, SamplingFilter, TextFormatter, request_id_var
+
+
+def _record(level=logging.INFO, **extra):
+    record = logging.makeLogRecord({"name": "babysteps", "levelno": level, "levelname": logging.getLevelName(level),
+                                    "msg": "Login succeeded", **extra})
+    record.request_id = request_id_var.get()
+    return record
+
+
+def test_json_formatter_includes_request_id_and_extra_fields():
+    context = request_id_var.set("req-1")
+    try:
+        line = json.loads(JsonFormatter().format(_record(user_id="u1", skipped=None)))
+    finally:
+        request_id_var.reset(context)
+    assert line["msg"] == "Login succeeded"
+    assert line["request_id"] == "req-1"
+    assert line["user_id"] == "u1"
+    assert "skipped" not in line
+    assert "user_id=u1" in TextFormatter().format(_record(user_id="u1"))
+
+
+def test_sampling_keeps_warnings():
+    never = SamplingFilter(0.0)
+    assert not never.filter(_record(logging.INFO))
+    assert never.filter(_record(logging.WARNING))
+    assert SamplingFilter(1.0).filter(_record(logging.INFO))
+
+
+def test_requests_get_an_id_and_one_access_line(public_server, monkeypatch):
+    import app
+
+    lines = []
+    monkeypatch.setattr(app.access_logger, "handle", lines.append)
+    response = public_server.get("/api/babies", headers={"X-Request-ID": "abc123"})
+    assert response.headers["x-request-id"] == "abc123"
+    assert public_server.get("/api/health").headers["x-request-id"]
+
+    first = lines[0]
+    assert first.path == "/api/babies" and first.status == 200 and first.duration_ms >= 0